@@ -0,0 +1,113 @@
+"""
+Time multilayer community detection against the number of layers.
+
+Usage:
+    python -m benchmarks.bench_layer_scaling --layers 60 120 240 480 840 --repeats 3
+    python -m benchmarks.bench_layer_scaling --leiden-max-layers 0    # chain_dp only
+
+A participant-level network stacks up to 7 sessions of ~120 blocks, so the
+solvers have to handle several hundred layers. Synthetic blocks are stacked
+to each layer count, with a weaker coupling every 120 layers as between
+sessions. Per layer count the table reports the best time of `--repeats`
+runs of the chain_dp engine with per-pair couplings and with one scalar
+coupling, of a single Leiden restart (up to `--leiden-max-layers`), and the
+time per layer. The exit code is 1 if chain_dp's reported quality differs
+from `multilayer_modularity` of its partition, or a Leiden restart beats
+the exact chain_dp optimum.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Callable
+
+import numpy as np
+
+from src.chunking import (
+    SEQUENCE_TYPES,
+    _chain_dp_partition,
+    _leiden_temporal_from,
+    _session_couplings,
+    chain_graph_factory,
+    compute_chain_weights,
+    extract_ikis,
+    multilayer_modularity,
+)
+from src.synthetic import generate_srt_frame
+
+SESSION_BLOCKS = 120
+
+
+def best_of(fn: Callable[[], Any], repeats: int) -> tuple[float, Any]:
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def stacked_ikis(n_layers: int, random_state: int) -> np.ndarray:
+    df = generate_srt_frame(n_blocks=2 * n_layers, random_state=random_state)
+    blocks = [ikis for seq in SEQUENCE_TYPES for _, ikis in sorted(extract_ikis(df, seq).items())]
+    matrix = np.vstack(blocks)
+    if matrix.shape[0] < n_layers:
+        raise SystemExit(f"Synthetic data gave {matrix.shape[0]} blocks, fewer than {n_layers}.")
+    return matrix[:n_layers]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--layers", type=int, nargs="+", default=[60, 120, 240, 480, 840])
+    parser.add_argument("--gamma", type=float, default=0.9)
+    parser.add_argument("--coupling", type=float, default=0.03)
+    parser.add_argument("--session-coupling", type=float, default=0.01)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--leiden-max-layers", type=int, default=480)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    failures = []
+    print(
+        f"{'layers':>7} {'dp per-pair':>12} {'dp scalar':>10} {'dp/layer':>9} "
+        f"{'leiden':>9} {'leiden/layer':>13} {'q dp':>10} {'q leiden':>10}"
+    )
+    for n_layers in args.layers:
+        iki_matrix = stacked_ikis(n_layers, args.seed)
+        weights = compute_chain_weights(iki_matrix)
+        sizes = [SESSION_BLOCKS] * (n_layers // SESSION_BLOCKS) + [n_layers % SESSION_BLOCKS]
+        couplings = _session_couplings([s for s in sizes if s], args.coupling, args.session_coupling)
+        _chain_dp_partition(weights[:2], args.gamma, args.coupling)  # fill the segmentation caches
+
+        dp_seconds, (memberships, dp_quality) = best_of(
+            lambda: _chain_dp_partition(weights, args.gamma, couplings), args.repeats
+        )
+        scalar_seconds, _ = best_of(lambda: _chain_dp_partition(weights, args.gamma, args.coupling), args.repeats)
+        scored = multilayer_modularity(iki_matrix, np.asarray(memberships), args.gamma, couplings)
+        if not np.isclose(scored, dp_quality):
+            failures.append(f"{n_layers} layers: chain_dp quality {dp_quality:.6f} != scored {scored:.6f}")
+
+        leiden_cell, leiden_layer_cell, leiden_quality_cell = "-", "-", "-"
+        if n_layers <= args.leiden_max_layers:
+            graphs = chain_graph_factory(weights.shape[1] + 1).graphs(weights)
+            leiden_seconds, (_, leiden_quality) = best_of(
+                lambda: _leiden_temporal_from(graphs, args.gamma, couplings, seed=args.seed), args.repeats
+            )
+            leiden_cell = f"{leiden_seconds:8.3f}s"
+            leiden_layer_cell = f"{leiden_seconds / n_layers * 1e3:11.2f}ms"
+            leiden_quality_cell = f"{leiden_quality:10.3f}"
+            # Leiden is not limited to contiguous chunks, but on chain layers those are optimal.
+            if leiden_quality > dp_quality + 1e-6 * max(abs(dp_quality), 1.0):
+                failures.append(f"{n_layers} layers: Leiden {leiden_quality:.6f} beats chain_dp {dp_quality:.6f}")
+        print(
+            f"{n_layers:7d} {dp_seconds * 1e3:10.2f}ms {scalar_seconds * 1e3:8.2f}ms "
+            f"{dp_seconds / n_layers * 1e6:7.1f}us {leiden_cell:>9} {leiden_layer_cell:>13} "
+            f"{dp_quality:10.3f} {leiden_quality_cell:>10}"
+        )
+    for line in failures:
+        print(f"FAIL {line}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,74 @@
+"""
+Benchmark batched single-trial modularity against the per-block igraph path.
+
+Usage:
+    python -m benchmarks.bench_modularity --n-blocks 50 500 5000
+
+For random IKI matrices of each size (7 IKIs per block, random contiguous
+chunk labels), times `compute_single_trial_modularity` on `build_trial_network`
+graphs block by block versus one `compute_single_trial_modularity_batch` call,
+and checks that both agree.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from src.chunking import (
+    build_trial_network,
+    compute_single_trial_modularity,
+    compute_single_trial_modularity_batch,
+)
+
+
+def bench(n_blocks: int, n_ikis: int = 7, repeats: int = 3, seed: int = 0) -> dict[str, float]:
+    rng = np.random.default_rng(seed)
+    iki_matrix = rng.gamma(shape=4.0, scale=0.1, size=(n_blocks, n_ikis))
+    labels = np.cumsum(rng.random((n_blocks, n_ikis)) < 0.3, axis=1)
+
+    per_block = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        q_ref = np.array(
+            [
+                compute_single_trial_modularity(labels[b], build_trial_network(iki_matrix[b]))
+                for b in range(n_blocks)
+            ]
+        )
+        per_block = min(per_block, time.perf_counter() - start)
+
+    batched = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        q_batch = compute_single_trial_modularity_batch(iki_matrix, labels)["q_single_trial"]
+        batched = min(batched, time.perf_counter() - start)
+
+    return {
+        "n_blocks": n_blocks,
+        "seconds_per_block_igraph": per_block,
+        "seconds_batched": batched,
+        "speedup": per_block / batched,
+        "max_abs_diff": float(np.max(np.abs(q_ref - q_batch))),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n-blocks", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    for n_blocks in args.n_blocks:
+        row = bench(n_blocks, repeats=args.repeats)
+        print(
+            f"n_blocks={row['n_blocks']:>6} igraph={row['seconds_per_block_igraph'] * 1e3:9.2f} ms "
+            f"batched={row['seconds_batched'] * 1e3:7.3f} ms speedup={row['speedup']:7.1f}x "
+            f"max_abs_diff={row['max_abs_diff']:.1e}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
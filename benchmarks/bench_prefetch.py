@@ -0,0 +1,93 @@
+"""
+Measure how much file reading the prefetch reader hides behind compute.
+
+Usage:
+    python -m benchmarks.bench_prefetch --input-dir SRT --limit 40 --depths 0 2 4
+
+Runs a serial `run_batch_analysis` (no cache) once per prefetch depth on the
+same files and reports wall time and the `io` stats of
+`chunking_timings.json`: read seconds, seconds the analysis waited for a
+file, and the hidden share (read time the analysis did not wait for).
+Parsing is CPU-bound, so on a single core hidden reads still compete with
+the analysis for the CPU; the wall time shows the net effect. Without
+`--input-dir` a synthetic corpus is used. Also times `--log-messages` progress lines written with one `open`
+per message against `writers.LogWriter`.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from src.chunking import run_batch_analysis
+from src.synthetic import generate_srt_corpus
+from src.writers import LogWriter
+
+
+def bench_logging(work_dir: Path, n_messages: int) -> tuple[float, float]:
+    message = "[12/2067] ok file='VR_ML_019_Example_20230803_FRA_4_fertig.csv' success=12 failed=0"
+    start = time.perf_counter()
+    for _ in range(n_messages):
+        with (work_dir / "per_message.log").open("a", encoding="utf-8") as f:
+            f.write(message + "\n")
+    per_message = time.perf_counter() - start
+    start = time.perf_counter()
+    with LogWriter(work_dir / "buffered.log") as log:
+        for _ in range(n_messages):
+            log.write(message)
+    return per_message, time.perf_counter() - start
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input-dir", default=None, help="SRT folder (default: synthetic corpus).")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--depths", type=int, nargs="+", default=[0, 2])
+    parser.add_argument("--engine", default="chain_dp", help="Community-detection engine of the batch runs.")
+    parser.add_argument("--n-permutations", type=int, default=10)
+    parser.add_argument("--log-messages", type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        input_dir = args.input_dir
+        if input_dir is None:
+            input_dir = work_dir / "corpus"
+            generate_srt_corpus(input_dir, n_files=args.limit, n_blocks=(120, 360))
+        # Untimed warm-up: module imports and the page cache would otherwise favour later runs.
+        run_batch_analysis(
+            input_dir=input_dir, output_dir=work_dir / "warmup", limit=2, engine=args.engine, use_cache=False
+        )
+        for depth in args.depths:
+            out = work_dir / f"out_{depth}"
+            start = time.perf_counter()
+            run_batch_analysis(
+                input_dir=input_dir,
+                output_dir=out,
+                limit=args.limit,
+                engine=args.engine,
+                n_permutations=args.n_permutations,
+                use_cache=False,
+                prefetch=depth,
+            )
+            wall = time.perf_counter() - start
+            io = json.loads((out / "chunking_timings.json").read_text(encoding="utf-8"))["io"]
+            line = f"prefetch={depth}: wall={wall:.2f}s"
+            if io:
+                line += (
+                    f" read={io['load_seconds']:.2f}s waited={io['wait_seconds']:.2f}s "
+                    f"hidden={io['hidden_seconds']:.2f}s ({io['hidden_share']:.0%})"
+                )
+            print(line)
+        per_message, buffered = bench_logging(work_dir, args.log_messages)
+    print(
+        f"log {args.log_messages} lines: open per message={per_message * 1e3:.1f}ms "
+        f"LogWriter={buffered * 1e3:.1f}ms ({per_message / buffered:.1f}x)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,164 @@
+"""
+Compare ragged (variable-length) IKI processing with the fixed-length path.
+
+Usage:
+    python -m benchmarks.bench_ragged --blocks 360 --repeats 3
+    python -m benchmarks.bench_ragged --lengths 8 10 12 --permutations 10
+
+Three synthetic sessions of `--blocks` blocks are analysed: fixed 8-press
+sequences, fixed sequences of the longest `--lengths` value, and a mix of
+all `--lengths`. The mixed session is extracted with partially correct
+blocks kept, so its blocks have several different IKI counts and run
+through the ragged code paths. Per session the table reports the best of
+`--repeats` runs per stage (extraction, chain weights, chain_dp, chunk
+metrics, null model) and the bytes of the stored IKIs, as a `RaggedIKIs`
+and as the former dict of per-block arrays. The chain_dp cost per layer
+grows with 2 ** n_ikis states (squared for the pairs a transition may
+compare, fewer after pruning at the small default coupling), so the mixed
+session should fall between the two fixed-length ones.
+
+The exit code is 1 if forcing the ragged path on fixed-length data does not
+reproduce the dense results exactly (weights, chain_dp partition and
+quality, multilayer modularity, chunk metrics), or if chain_dp's quality on
+the mixed session differs from `multilayer_modularity` of its partition.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from typing import Any, Callable
+
+import numpy as np
+
+from src.chunking import (
+    _chain_dp_memberships,
+    _chain_dp_partition,
+    _ragged_chain_dp_states,
+    compute_chain_weights,
+    compute_chunk_metrics,
+    compute_single_trial_modularity_batch,
+    extract_ikis,
+    multilayer_modularity,
+    statistical_validation,
+)
+from src.ragged import RaggedArray, RaggedIKIs, pad_rows
+from src.synthetic import generate_srt_frame
+
+GAMMA = 0.9
+COUPLING = 0.03
+
+
+def best_of(fn: Callable[[], Any], repeats: int) -> tuple[float, Any]:
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def dict_nbytes(ikis: RaggedIKIs) -> int:
+    """Bytes of the same IKIs as a {block: array} dict: the arrays, their headers and the dict itself."""
+    arrays = {block: np.array(ikis[block]) for block in ikis}
+    return sys.getsizeof(arrays) + sum(sys.getsizeof(b) + sys.getsizeof(a) for b, a in arrays.items())
+
+
+def profile(ikis: RaggedIKIs, repeats: int, n_permutations: int) -> dict[str, Any]:
+    """Time the stages after extraction, each on the representation `run_full_analysis` uses."""
+    data = ikis.dense() if ikis.is_uniform else ikis
+    weights = compute_chain_weights(data)
+    _chain_dp_partition(weights, GAMMA, COUPLING)  # fill the segmentation caches
+    timings = {}
+    timings["weights"], _ = best_of(lambda: compute_chain_weights(data), repeats)
+    timings["chain_dp"], (memberships, quality) = best_of(
+        lambda: _chain_dp_partition(weights, GAMMA, COUPLING), repeats
+    )
+    labels = pad_rows(memberships)
+    timings["metrics"], _ = best_of(lambda: compute_chunk_metrics(ikis, labels, width=ikis.width), repeats)
+    timings["null"], _ = best_of(
+        lambda: statistical_validation(ikis, n_permutations=n_permutations, engine="chain_dp", random_state=0), 1
+    )
+    return {"timings": timings, "labels": labels, "quality": quality}
+
+
+def forced_ragged_mismatches(ikis: RaggedIKIs) -> list[str]:
+    """Run fixed-length IKIs through the ragged code paths and list every result that differs."""
+    failures = []
+    dense = ikis.dense()
+    ragged = RaggedArray(ikis.values, ikis.offsets)
+    dense_weights = compute_chain_weights(dense)
+    ragged_weights = compute_chain_weights(ragged)
+    if not np.array_equal(dense_weights.ravel(), ragged_weights.values):
+        failures.append("chain weights differ")
+    memberships, quality = _chain_dp_partition(dense_weights, GAMMA, COUPLING)
+    states, ragged_quality = _ragged_chain_dp_states(ragged_weights, GAMMA, COUPLING)
+    if ragged_quality != quality:
+        failures.append(f"chain_dp quality differs: {quality!r} vs ragged {ragged_quality!r}")
+    if _chain_dp_memberships(states, ragged.lengths) != memberships:
+        failures.append("chain_dp partition differs")
+    labels = np.asarray(memberships)
+    if multilayer_modularity(dense, labels, GAMMA, COUPLING, normalize=True) != multilayer_modularity(
+        ragged, labels, GAMMA, COUPLING, normalize=True
+    ):
+        failures.append("multilayer modularity differs")
+    dense_q = compute_single_trial_modularity_batch(dense, labels)["q_single_trial"]
+    ragged_q = compute_single_trial_modularity_batch(ragged, labels)["q_single_trial"]
+    if not np.array_equal(dense_q, ragged_q):
+        failures.append("single-trial modularity differs")
+    as_dict = {block: np.array(ikis[block]) for block in ikis}
+    if not compute_chunk_metrics(as_dict, labels).equals(compute_chunk_metrics(ikis, labels)):
+        failures.append("chunk metrics differ between dict and RaggedIKIs input")
+    return failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--blocks", type=int, default=360)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[8, 10, 12])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--permutations", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sessions = {
+        "fixed 8": [8],
+        f"fixed {max(args.lengths)}": [max(args.lengths)],
+        "mixed " + "/".join(str(n) for n in sorted(args.lengths)): sorted(args.lengths),
+    }
+    failures = []
+    print(
+        f"{'session':>16} {'blocks':>6} {'n_ikis':>7} {'extract':>9} {'weights':>9} {'chain_dp':>9} "
+        f"{'dp/layer':>9} {'metrics':>9} {'null':>8} {'ragged B':>9} {'dict B':>8}"
+    )
+    for name, lengths in sessions.items():
+        df = generate_srt_frame(n_blocks=args.blocks, random_state=args.seed, sequence_lengths=lengths)
+        extract_seconds, ikis = best_of(
+            lambda: extract_ikis(df, "blue", expected_presses_per_block=max(lengths), min_presses=min(lengths)),
+            args.repeats,
+        )
+        if len(ikis) < 2:
+            raise SystemExit(f"{name}: synthetic data gave {len(ikis)} blocks; raise --blocks.")
+        result = profile(ikis, args.repeats, args.permutations)
+        timings = result["timings"]
+        timings["extract"] = extract_seconds
+        n_ikis = f"{ikis.lengths.min()}-{ikis.lengths.max()}" if not ikis.is_uniform else str(ikis.width)
+        print(
+            f"{name:>16} {len(ikis):6d} {n_ikis:>7} {timings['extract'] * 1e3:7.2f}ms "
+            f"{timings['weights'] * 1e3:7.2f}ms {timings['chain_dp'] * 1e3:7.1f}ms "
+            f"{timings['chain_dp'] / len(ikis) * 1e3:7.2f}ms {timings['metrics'] * 1e3:7.2f}ms "
+            f"{timings['null']:7.2f}s {ikis.nbytes:9d} {dict_nbytes(ikis):8d}"
+        )
+        if ikis.is_uniform:
+            failures.extend(f"{name}: {line}" for line in forced_ragged_mismatches(ikis))
+        else:
+            scored = multilayer_modularity(ikis, result["labels"], GAMMA, COUPLING)
+            if not np.isclose(scored, result["quality"]):
+                failures.append(f"{name}: chain_dp quality {result['quality']:.6f} != scored {scored:.6f}")
+    for line in failures:
+        print(f"FAIL {line}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
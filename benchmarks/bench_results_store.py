@@ -0,0 +1,140 @@
+"""
+Compare results-store queries with re-reading the batch CSV outputs.
+
+Usage:
+    python -m benchmarks.bench_results_store --n-files 40 --repeats 5
+    python -m benchmarks.bench_results_store --output-dir outputs --master-table mastertable.xlsx
+
+Without `--output-dir`, a synthetic corpus of `--n-files` files is analysed
+(chain_dp engine, all sequences) to produce outputs with a trials table.
+The outputs are imported into a fresh store, then a per-participant
+trajectory, a per-participant trial table and a group comparison are timed
+(best of `--repeats`) both as store queries and the way notebooks did it:
+parse the CSV and match participants with a regex on `source_file`. The
+exit code is 1 if a store query returns different rows than the CSV route.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from src.chunking import run_batch_analysis
+from src.results_store import TRAJECTORY_METRICS, ResultsStore
+from src.synthetic import generate_srt_corpus
+
+
+def best_of(fn: Callable[[], Any], repeats: int) -> tuple[float, Any]:
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def csv_trajectory(output_dir: Path, participant: str) -> pd.DataFrame:
+    summary = pd.read_csv(output_dir / "chunking_summary.csv")
+    names = summary["source_file"].str.extract(r"([^/\\]+)_(\d{8,})_FRA_(\d+)", flags=re.IGNORECASE)
+    rows = summary[(names[0] == participant) & (summary["sequence_type"] == "blue")]
+    return rows.assign(date=names[1], session=names[2].astype(int)).sort_values(["date", "session"])
+
+
+def csv_trials(output_dir: Path, participant: str) -> pd.DataFrame:
+    trials = pd.read_csv(output_dir / "chunking_trials.csv")
+    pattern = rf"[/\\]{re.escape(participant)}_\d{{8,}}_FRA_"
+    return trials[trials["source_file"].str.contains(pattern) & (trials["sequence_type"] == "blue")]
+
+
+def csv_group_comparison(output_dir: Path) -> pd.DataFrame:
+    summary = pd.read_csv(output_dir / "chunking_summary.csv")
+    session = summary["source_file"].str.extract(r"_FRA_(\d+)", flags=re.IGNORECASE)[0].astype(int)
+    blue = summary.assign(session=session)[summary["sequence_type"] == "blue"]
+    return blue.groupby("session")["mean_q_single_trial"].agg(["size", "mean", "std", "median"])
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output-dir", default=None, help="Batch outputs to import (default: synthetic run).")
+    parser.add_argument("--master-table", default=None)
+    parser.add_argument("--n-files", type=int, default=40)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        if args.output_dir is None:
+            generate_srt_corpus(work_dir / "corpus", n_files=args.n_files, n_blocks=60)
+            output_dir = work_dir / "outputs"
+            run_batch_analysis(
+                input_dir=work_dir / "corpus",
+                output_dir=output_dir,
+                sequence_type="all",
+                engine="chain_dp",
+                n_permutations=5,
+                use_cache=False,
+            )
+        else:
+            output_dir = Path(args.output_dir)
+        has_trials = (output_dir / "chunking_trials.csv").exists()
+
+        start = time.perf_counter()
+        with ResultsStore(work_dir / "results.sqlite") as store:
+            store.add_run(output_dir, master_table=args.master_table)
+            import_seconds = time.perf_counter() - start
+            files = store.files()
+            participant = files["participant"].value_counts().index[0]
+            n_summary = len(store.summaries(sequence_type=None))
+            print(f"import: {import_seconds:.2f}s ({len(files)} files, {n_summary} summary rows)")
+            print(f"participant: {participant}")
+
+            cases = [
+                (
+                    "trajectory",
+                    lambda: store.participant_trajectory(participant),
+                    lambda: csv_trajectory(output_dir, participant),
+                ),
+                (
+                    "group comparison[session]",
+                    lambda: store.group_comparison(by="session"),
+                    lambda: csv_group_comparison(output_dir),
+                ),
+            ]
+            if has_trials:
+                cases.append(
+                    (
+                        "participant trials",
+                        lambda: store.trials(participant=participant),
+                        lambda: csv_trials(output_dir, participant),
+                    )
+                )
+            print(f"{'query':<28} {'store':>10} {'csv':>10} {'speed-up':>9}")
+            for name, from_store, from_csv in cases:
+                store_seconds, ours = best_of(from_store, args.repeats)
+                csv_seconds, theirs = best_of(from_csv, args.repeats)
+                print(
+                    f"{name:<28} {store_seconds * 1e3:8.2f}ms {csv_seconds * 1e3:8.2f}ms "
+                    f"{csv_seconds / store_seconds:8.1f}x"
+                )
+                if len(ours) != len(theirs):
+                    failures.append(f"{name}: {len(ours)} rows from the store, {len(theirs)} from the CSV")
+                elif name == "trajectory" and not np.allclose(
+                    ours[list(TRAJECTORY_METRICS)].to_numpy(float),
+                    theirs[list(TRAJECTORY_METRICS)].to_numpy(float),
+                    equal_nan=True,
+                ):
+                    failures.append(f"{name}: metrics differ")
+    for line in failures:
+        print(f"FAIL {line}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,92 @@
+"""
+Measure CLI start-up time and check that light commands skip the graph stack.
+
+Usage:
+    python -m benchmarks.bench_startup --repeats 5
+
+Each command runs `--repeats` times in a fresh interpreter (best and median
+wall-clock seconds are reported), then once more under `-X importtime` to
+list which of igraph, leidenalg and scipy it imported. `summarize`,
+`cache` and `store` run against a small synthetic batch output. The exit
+code is 1 if a command marked light imports any graph-stack module.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+GRAPH_STACK = ("igraph", "leidenalg", "scipy")
+
+
+def command_cases(output_dir: Path) -> list[tuple[str, list[str], bool]]:
+    """(name, interpreter arguments, light) for every benchmarked command."""
+    out = str(output_dir)
+    return [
+        ("python (no imports)", ["-c", "pass"], True),
+        ("import src.chunking", ["-c", "import src.chunking"], True),
+        ("import graph stack", ["-c", "import igraph, leidenalg, scipy.stats, scipy.optimize"], False),
+        ("--help", ["-m", "src", "--help"], True),
+        ("run --help", ["-m", "src", "run", "--help"], True),
+        ("summarize", ["-m", "src", "summarize", "--output-dir", out], True),
+        ("cache info", ["-m", "src", "cache", "info", "--cache-dir", str(output_dir / "cache")], True),
+        ("store runs", ["-m", "src", "store", "--db", str(output_dir / "results.sqlite"), "runs"], True),
+    ]
+
+
+def imported_graph_modules(args: list[str]) -> list[str]:
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", *args], capture_output=True, text=True, check=True
+    ).stderr
+    names = {line.rsplit("|", 1)[-1].strip() for line in stderr.splitlines() if line.startswith("import time:")}
+    return sorted(m for m in GRAPH_STACK if m in names)
+
+
+def time_command(args: list[str], repeats: int) -> list[float]:
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], capture_output=True, check=True)
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    from src.chunking import run_batch_analysis
+    from src.synthetic import generate_srt_corpus
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        generate_srt_corpus(work_dir / "corpus", n_files=2, n_blocks=30)
+        run_batch_analysis(
+            input_dir=work_dir / "corpus",
+            output_dir=work_dir / "outputs",
+            engine="chain_dp",
+            n_permutations=5,
+        )
+        print(f"{'command':<24} {'best':>8} {'median':>8}  graph stack")
+        for name, command, light in command_cases(work_dir / "outputs"):
+            seconds = time_command(command, args.repeats)
+            modules = imported_graph_modules(command)
+            print(
+                f"{name:<24} {min(seconds):7.3f}s {statistics.median(seconds):7.3f}s  "
+                f"{', '.join(modules) or '-'}"
+            )
+            if light and modules:
+                failures.append(f"{name} imported {', '.join(modules)}")
+    for line in failures:
+        print(f"FAIL {line}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,218 @@
+"""
+Benchmark suite for the chunking pipeline on synthetic SRT data.
+
+Usage:
+    python -m benchmarks.bench_suite --output bench.json
+    python -m benchmarks.bench_suite --baseline bench.json --threshold 1.5
+
+Writes a synthetic corpus (see `src.synthetic`) to a temporary directory,
+times each public function of `src.chunking` on one file (best of
+`--repeats`) and `run_batch_analysis` at every corpus size in `--sizes`, and
+records the results as JSON. With `--baseline`, every benchmark is compared
+with the baseline run; the exit code is 1 if any is slower than
+`threshold x baseline` (per-benchmark ratios may be given in a
+`--thresholds` JSON file) by more than `--min-seconds`.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+from src.chunking import (
+    build_trial_network,
+    chain_graph_factory,
+    compute_chain_weights,
+    compute_chunk_metrics,
+    compute_single_trial_modularity,
+    compute_single_trial_modularity_batch,
+    consensus_partition,
+    extract_ikis,
+    extract_ikis_batch,
+    load_srt_file,
+    module_allegiance,
+    multilayer_modularity,
+    run_batch_analysis,
+    run_full_analysis,
+    run_multilayer_community_detection,
+    run_parameter_sweep,
+    statistical_validation,
+    unpack_trial_arrays,
+)
+from src.synthetic import generate_srt_corpus
+
+
+def best_of(fn: Callable[[], Any], repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def function_benchmarks(path: Path, repeats: int, n_iter: int) -> dict[str, float]:
+    df = load_srt_file(path)
+    ikis = extract_ikis(df, "blue")
+    block_ids = sorted(ikis)
+    iki_matrix = np.vstack([ikis[b] for b in block_ids])
+    graphs = [build_trial_network(ikis[b]) for b in block_ids]
+    dp = run_multilayer_community_detection(graphs, engine="chain_dp")
+    partition_map = {b: dp["best_memberships"][i] for i, b in enumerate(block_ids)}
+    labels = np.asarray(dp["best_memberships"])
+    metrics = compute_chunk_metrics(ikis, partition_map)
+    tagged = df.assign(source_file=path.name)
+    restarts = np.random.default_rng(0).integers(0, 3, size=(100, len(block_ids), labels.shape[1]))
+    allegiance = module_allegiance(restarts)
+    chain_weights = compute_chain_weights(iki_matrix)
+    factory = chain_graph_factory(iki_matrix.shape[1])
+
+    cases: dict[str, Callable[[], Any]] = {
+        "load_srt_file": lambda: load_srt_file(path),
+        "extract_ikis": lambda: extract_ikis(df, "blue"),
+        "extract_ikis_batch": lambda: extract_ikis_batch(tagged),
+        "build_trial_network": lambda: [build_trial_network(ikis[b]) for b in block_ids],
+        "ChainGraphFactory.graphs": lambda: factory.graphs(chain_weights),
+        "ChainGraphFactory.reweight": lambda: factory.reweight(graphs, chain_weights),
+        "compute_chain_weights": lambda: compute_chain_weights(iki_matrix),
+        "run_multilayer_community_detection[leiden]": lambda: run_multilayer_community_detection(
+            graphs, n_iter=n_iter, random_state=0
+        ),
+        "run_multilayer_community_detection[chain_dp]": lambda: run_multilayer_community_detection(
+            graphs, engine="chain_dp"
+        ),
+        "compute_single_trial_modularity": lambda: [
+            compute_single_trial_modularity(labels[i], graphs[i]) for i in range(len(graphs))
+        ],
+        "compute_single_trial_modularity_batch": lambda: compute_single_trial_modularity_batch(iki_matrix, labels),
+        "compute_chunk_metrics": lambda: compute_chunk_metrics(ikis, partition_map),
+        "unpack_trial_arrays": lambda: unpack_trial_arrays(metrics),
+        "multilayer_modularity[100 partitions]": lambda: multilayer_modularity(iki_matrix, restarts),
+        "module_allegiance[100 restarts]": lambda: module_allegiance(restarts),
+        "consensus_partition": lambda: consensus_partition(allegiance),
+        "compute_chunk_metrics[allegiance]": lambda: compute_chunk_metrics(
+            ikis, partition_map, all_memberships=restarts
+        ),
+        "statistical_validation[chain_dp]": lambda: statistical_validation(
+            ikis, n_permutations=20, random_state=0, engine="chain_dp", empirical=dp
+        ),
+        "statistical_validation[leiden]": lambda: statistical_validation(
+            ikis, n_permutations=n_iter, random_state=0, empirical=dp
+        ),
+        "run_full_analysis[chain_dp]": lambda: run_full_analysis(
+            path, n_permutations=20, random_state=0, engine="chain_dp", data=df
+        ),
+        "run_full_analysis[leiden]": lambda: run_full_analysis(
+            path, n_iter=n_iter, n_permutations=n_iter, random_state=0, data=df
+        ),
+        "run_parameter_sweep[chain_dp]": lambda: run_parameter_sweep(
+            path, [0.7, 0.8, 0.9, 1.0, 1.1], [0.01, 0.02, 0.03, 0.05, 0.1], engine="chain_dp", data=df
+        ),
+    }
+    results = {}
+    for name, fn in cases.items():
+        results[name] = best_of(fn, repeats)
+        print(f"{name:<48} {results[name] * 1e3:10.2f} ms")
+    return results
+
+
+def batch_benchmarks(corpus: list[Path], sizes: list[int], work_dir: Path, n_iter: int) -> dict[str, float]:
+    results = {}
+    for size in sizes:
+        input_dir = work_dir / f"batch_{size}"
+        input_dir.mkdir()
+        for path in corpus[:size]:
+            (input_dir / path.name).symlink_to(path)
+        start = time.perf_counter()
+        run_batch_analysis(
+            input_dir=input_dir,
+            output_dir=work_dir / f"out_{size}",
+            n_iter=n_iter,
+            n_permutations=n_iter,
+            use_cache=False,
+        )
+        name = f"run_batch_analysis[files={size}]"
+        results[name] = time.perf_counter() - start
+        print(f"{name:<48} {results[name]:10.2f} s")
+    return results
+
+
+def find_regressions(
+    current: dict[str, float],
+    baseline: dict[str, float],
+    threshold: float,
+    thresholds: dict[str, float],
+    min_seconds: float,
+) -> list[str]:
+    regressions = []
+    for name, seconds in current.items():
+        if name not in baseline:
+            continue
+        limit = thresholds.get(name, threshold) * baseline[name]
+        if seconds > limit and seconds - baseline[name] > min_seconds:
+            regressions.append(
+                f"{name}: {seconds:.4f}s vs baseline {baseline[name]:.4f}s "
+                f"({seconds / baseline[name]:.2f}x > {thresholds.get(name, threshold):.2f}x)"
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 8], help="Corpus sizes for run_batch_analysis.")
+    parser.add_argument("--n-blocks", type=int, default=120, help="Blocks per synthetic file.")
+    parser.add_argument("--n-iter", type=int, default=3, help="Leiden restarts / permutations in benchmarks.")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="JSON file for the results.")
+    parser.add_argument("--baseline", default=None, help="Results JSON of a previous run to compare against.")
+    parser.add_argument("--threshold", type=float, default=1.5, help="Allowed slowdown ratio.")
+    parser.add_argument("--thresholds", default=None, help="JSON file of per-benchmark slowdown ratios.")
+    parser.add_argument("--min-seconds", type=float, default=0.005, help="Ignore slowdowns below this.")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        corpus = generate_srt_corpus(
+            work_dir / "corpus", n_files=max(args.sizes), n_blocks=args.n_blocks, random_state=args.seed
+        )
+        results = function_benchmarks(corpus[0], args.repeats, args.n_iter)
+        results.update(batch_benchmarks(corpus, args.sizes, work_dir, args.n_iter))
+
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "sizes": args.sizes,
+            "n_blocks": args.n_blocks,
+            "n_iter": args.n_iter,
+            "repeats": args.repeats,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.baseline is None:
+        return 0
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))["results"]
+    thresholds = json.loads(Path(args.thresholds).read_text(encoding="utf-8")) if args.thresholds else {}
+    regressions = find_regressions(results, baseline, args.threshold, thresholds, args.min_seconds)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    print(f"compared={len(set(results) & set(baseline))} regressions={len(regressions)}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,164 @@
+"""
+Check the vectorised `extract_ikis` against the original per-block implementation.
+
+Usage:
+    python -m benchmarks.check_extract_ikis --input-dir SRT
+
+For every file and sequence, compares `extract_ikis` with the original
+groupby-based implementation (kept below as the reference), then checks that
+one `extract_ikis_batch` call on all files concatenated gives the same
+matrices. A small hand-made frame checks `min_presses`: a block missing
+only its last press keeps its IKIs at their positions, and blocks with an
+interior or leading miss are dropped instead of having later IKIs shifted
+left. Reports timings; the exit code is 1 on any mismatch.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.chunking import (
+    EXPECTED_PRESSES_PER_BLOCK,
+    SEQUENCE_TYPES,
+    extract_ikis,
+    extract_ikis_batch,
+    load_srt_file,
+)
+from src.ingest import ANALYSIS_COLUMNS, is_srt_csv
+
+
+def extract_ikis_reference(
+    df: pd.DataFrame,
+    sequence_type: str = "blue",
+    expected_presses_per_block: int = EXPECTED_PRESSES_PER_BLOCK,
+) -> dict[int, np.ndarray]:
+    """The groupby-based `extract_ikis` as it was before vectorisation."""
+    seq = sequence_type.lower().strip()
+    filtered = df[(df["isHit"] == 1) & (df["sequence"] == seq)].copy()
+
+    ikis_by_block: dict[int, np.ndarray] = {}
+    for block_number, block_df in filtered.groupby("BlockNumber"):
+        block_df = block_df.sort_values("EventNumber")
+        times = block_df["Time Since Block start"].to_numpy(dtype=float)
+        if times.size != expected_presses_per_block:
+            continue
+        ikis = np.diff(times)
+        if ikis.size != expected_presses_per_block - 1:
+            continue
+        if np.any(ikis <= 0):
+            continue
+        ikis_by_block[int(block_number)] = ikis
+
+    if not ikis_by_block:
+        return {}
+
+    block_ids = sorted(ikis_by_block)
+    matrix = np.vstack([ikis_by_block[b] for b in block_ids])
+    means = matrix.mean(axis=0)
+    stds = matrix.std(axis=0, ddof=0)
+    stds = np.where(stds == 0, np.nan, stds)
+    z_scores = np.abs((matrix - means) / stds)
+    keep_mask = np.nan_to_num(z_scores, nan=0.0) <= 3.0
+    keep_rows = keep_mask.all(axis=1)
+    return {block_id: ikis_by_block[block_id] for keep, block_id in zip(keep_rows, block_ids) if keep}
+
+
+def same_ikis(a: dict[int, np.ndarray], b: dict[int, np.ndarray]) -> bool:
+    return list(a) == list(b) and all(np.array_equal(a[k], b[k]) for k in a)
+
+
+def partial_block_failures() -> list[str]:
+    """Check which partially correct blocks `min_presses` keeps, and where their IKIs end up."""
+    # Press times of GR_01_Fr_01_20250206_FRA_1, green block 16; its fifth press (event 125) was missed.
+    times = [6.047546, 7.280212, 8.329468, 9.278809, 11.129700, 15.393310, 16.827030, 17.842410]
+    patterns = {1: [1] * 8, 2: [1] * 7 + [0], 3: [1, 1, 1, 1, 0, 1, 1, 1], 4: [0] + [1] * 7}
+    df = pd.DataFrame(
+        [
+            {
+                "BlockNumber": block,
+                "EventNumber": (block - 1) * 8 + i + 1,
+                "Time Since Block start": t,
+                "isHit": hit,
+                "sequence": "green",
+            }
+            for block, hits in patterns.items()
+            for i, (t, hit) in enumerate(zip(times, hits))
+        ]
+    )
+    ikis = extract_ikis(df, "green", min_presses=5)
+    failures = []
+    if list(ikis) != [1, 2]:
+        failures.append(f"min_presses kept blocks {list(ikis)}, expected [1, 2]")
+    elif not np.array_equal(ikis[2], np.diff(times)[:6]):
+        failures.append(f"block missing its last press has IKIs {ikis[2]}, expected {np.diff(times)[:6]}")
+    return failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input-dir", default="SRT")
+    parser.add_argument("--pattern", default="*.csv")
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    files = sorted(p for p in Path(args.input_dir).glob(args.pattern) if is_srt_csv(p))[: args.limit]
+    if not files:
+        raise FileNotFoundError(f"No files found: {Path(args.input_dir) / args.pattern}")
+
+    frames = {}
+    for path in files:
+        try:
+            frames[path.name] = load_srt_file(path, columns=ANALYSIS_COLUMNS)
+        except (ValueError, OSError) as exc:
+            print(f"skip {path.name}: {exc}")
+
+    mismatches = 0
+    expected: dict[tuple[str, str], dict[int, np.ndarray]] = {}
+    seconds = {"reference": 0.0, "vectorised": 0.0}
+    for name, df in frames.items():
+        for seq in SEQUENCE_TYPES:
+            start = time.perf_counter()
+            ref = extract_ikis_reference(df, seq)
+            seconds["reference"] += time.perf_counter() - start
+            start = time.perf_counter()
+            new = extract_ikis(df, seq)
+            seconds["vectorised"] += time.perf_counter() - start
+            if not same_ikis(ref, new):
+                mismatches += 1
+                print(f"MISMATCH {name} {seq}")
+            if ref:
+                expected[(name, seq)] = ref
+
+    combined = pd.concat([df.assign(source_file=name) for name, df in frames.items()], ignore_index=True)
+    start = time.perf_counter()
+    batch = extract_ikis_batch(combined)
+    seconds["batch"] = time.perf_counter() - start
+    if list(sorted(batch)) != list(sorted(expected)):
+        mismatches += 1
+        print(f"MISMATCH batch keys: {len(batch)} vs {len(expected)}")
+    else:
+        for key, ref in expected.items():
+            if not same_ikis(ref, batch[key]):
+                mismatches += 1
+                print(f"MISMATCH batch {key}")
+
+    for line in partial_block_failures():
+        mismatches += 1
+        print(f"MISMATCH {line}")
+
+    n_pairs = len(frames) * len(SEQUENCE_TYPES)
+    print(
+        f"files={len(frames)} pairs={n_pairs} mismatches={mismatches} "
+        f"reference={seconds['reference']:.2f}s vectorised={seconds['vectorised']:.2f}s "
+        f"batch_one_call={seconds['batch']:.3f}s "
+        f"speedup={seconds['reference'] / max(seconds['vectorised'], 1e-12):.1f}x"
+    )
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
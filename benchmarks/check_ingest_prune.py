@@ -0,0 +1,61 @@
+"""
+Check that a narrow-pattern re-ingest keeps the entries outside the pattern.
+
+Usage:
+    python -m benchmarks.check_ingest_prune --files 6
+
+Writes a synthetic corpus, ingests all of it, then re-ingests with a pattern
+that matches one file: every other entry and fragment must survive. Then one
+CSV outside the pattern is deleted and the narrow re-ingest is repeated:
+exactly that entry must be removed. The exit code is 1 on any failure.
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from src.ingest import SRTDataset, normalize_file_name
+from src.synthetic import generate_srt_corpus
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=6)
+    parser.add_argument("--blocks", type=int, default=20)
+    args = parser.parse_args(argv)
+    if args.files < 2:
+        raise SystemExit("Need at least 2 files.")
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        input_dir, dataset_dir = Path(tmp) / "SRT", Path(tmp) / "dataset"
+        paths = generate_srt_corpus(input_dir, n_files=args.files, n_blocks=args.blocks)
+        dataset = SRTDataset(dataset_dir)
+        dataset.update(input_dir)
+        everything = set(dataset.manifest)
+
+        narrow = paths[0].name
+        report = SRTDataset(dataset_dir).update(input_dir, pattern=narrow)
+        dataset = SRTDataset(dataset_dir)
+        if report["removed"] or set(dataset.manifest) != everything:
+            failures.append(f"narrow re-ingest removed {sorted(everything - set(dataset.manifest))}")
+        missing_fragments = [n for n, e in dataset.manifest.items() if not (dataset_dir / e["fragment"]).exists()]
+        if missing_fragments:
+            failures.append(f"fragments deleted for {missing_fragments}")
+
+        deleted = normalize_file_name(paths[-1].name)
+        paths[-1].unlink()
+        report = SRTDataset(dataset_dir).update(input_dir, pattern=narrow)
+        left = set(SRTDataset(dataset_dir).manifest)
+        if report["removed"] != 1 or left != everything - {deleted}:
+            failures.append(f"after deleting {deleted}: removed={report['removed']}, kept {len(left)} entries")
+
+    print(f"files={args.files} failures={len(failures)}")
+    for line in failures:
+        print(f"FAIL {line}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
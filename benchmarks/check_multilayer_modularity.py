@@ -0,0 +1,127 @@
+"""
+Check `multilayer_modularity` against leidenalg and measure its throughput.
+
+Usage:
+    python -m benchmarks.check_multilayer_modularity --input-dir SRT --n-files 10
+
+For each file (synthetic files when `--input-dir` is not given), random
+label matrices are scored by `multilayer_modularity` and by leidenalg
+partition objects built on the same temporal layers, and the qualities
+reported by `run_multilayer_community_detection` (both engines) are
+re-scored. Then `--n-partitions` random partitions are scored in one batched
+call. The exit code is 1 if any difference exceeds `--tolerance`.
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import leidenalg as la
+import numpy as np
+
+from src.chunking import (
+    DEFAULT_COUPLING,
+    DEFAULT_GAMMA,
+    build_trial_network,
+    extract_ikis,
+    load_srt_file,
+    multilayer_modularity,
+    run_multilayer_community_detection,
+)
+from src.chunking import _singleton_quality
+from src.ingest import is_srt_csv
+from src.synthetic import generate_srt_corpus
+
+
+def leidenalg_quality(graphs: list, labels: np.ndarray, gamma: float, C: float) -> float:
+    """Quality of a fixed partition from leidenalg objects, on the improvement-over-singletons scale."""
+    layers, interslice_layer, _ = la.time_slices_to_layers(
+        graphs,
+        interslice_weight=C,
+        slice_attr="slice",
+        vertex_id_attr="id",
+        edge_type_attr="type",
+        weight_attr="weight",
+    )
+    initial = [int(x) for x in labels.ravel()]
+    partitions = [
+        la.RBConfigurationVertexPartition(
+            layer, initial_membership=initial, weights="weight", resolution_parameter=gamma
+        )
+        for layer in layers
+    ]
+    interslice = la.CPMVertexPartition(
+        interslice_layer,
+        initial_membership=initial,
+        resolution_parameter=0,
+        node_sizes="node_size",
+        weights="weight",
+    )
+    raw = sum(p.quality() for p in partitions) + interslice.quality()
+    return float(raw - _singleton_quality(graphs, gamma))
+
+
+def check_file(
+    path: Path, gamma: float, C: float, n_random: int, n_iter: int, rng: np.random.Generator
+) -> float:
+    ikis = extract_ikis(load_srt_file(path), "blue")
+    if not ikis:
+        return 0.0
+    block_ids = sorted(ikis)
+    iki_matrix = np.vstack([ikis[b] for b in block_ids])
+    graphs = [build_trial_network(ikis[b]) for b in block_ids]
+
+    worst = 0.0
+    for labels in rng.integers(0, 4, size=(n_random, *iki_matrix.shape)):
+        ours = multilayer_modularity(iki_matrix, labels, gamma, C)
+        worst = max(worst, abs(ours - leidenalg_quality(graphs, labels, gamma, C)))
+    for engine in ("leiden", "chain_dp"):
+        result = run_multilayer_community_detection(graphs, gamma, C, n_iter=n_iter, random_state=0, engine=engine)
+        rescored = multilayer_modularity(iki_matrix, result["all_memberships"], gamma, C)
+        worst = max(worst, float(np.max(np.abs(rescored - np.asarray(result["quality_scores"])))))
+    print(f"{path.name}: blocks={len(block_ids)} max_abs_diff={worst:.2e}")
+    return worst
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input-dir", default=None, help="SRT folder (default: synthetic files).")
+    parser.add_argument("--n-files", type=int, default=5)
+    parser.add_argument("--gamma", type=float, default=DEFAULT_GAMMA)
+    parser.add_argument("--coupling", type=float, default=DEFAULT_COUPLING)
+    parser.add_argument("--n-random", type=int, default=20, help="Random partitions checked per file.")
+    parser.add_argument("--n-iter", type=int, default=3, help="Leiden restarts re-scored per file.")
+    parser.add_argument("--n-partitions", type=int, default=5000, help="Partitions in the throughput run.")
+    parser.add_argument("--tolerance", type=float, default=1e-9)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.input_dir is None:
+            files = generate_srt_corpus(tmp, n_files=args.n_files)
+        else:
+            files = sorted(p for p in Path(args.input_dir).glob("*.csv") if is_srt_csv(p))
+            picks = np.unique(np.linspace(0, len(files) - 1, min(args.n_files, len(files))).astype(int))
+            files = [files[i] for i in picks]
+        worst = max(
+            check_file(path, args.gamma, args.coupling, args.n_random, args.n_iter, rng) for path in files
+        )
+
+        ikis = extract_ikis(load_srt_file(files[0]), "blue")
+        iki_matrix = np.vstack([ikis[b] for b in sorted(ikis)])
+        candidates = rng.integers(0, 4, size=(args.n_partitions, *iki_matrix.shape))
+        start = time.perf_counter()
+        multilayer_modularity(iki_matrix, candidates, args.gamma, args.coupling)
+        elapsed = time.perf_counter() - start
+
+    print(
+        f"files={len(files)} max_abs_diff={worst:.2e} "
+        f"throughput={args.n_partitions / elapsed:,.0f} partitions/s ({iki_matrix.shape[0]} blocks)"
+    )
+    return 0 if worst <= args.tolerance else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
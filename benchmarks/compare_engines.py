@@ -0,0 +1,103 @@
+"""
+Compare the `chain_dp` and `leiden` community-detection engines on SRT files.
+
+Usage:
+    python -m benchmarks.compare_engines --input-dir SRT --n-files 20 --n-iter 100
+
+For an evenly spaced sample of files, both engines are run on the same trial
+networks and their multilayer quality and runtime are reported. The exit code
+is 1 if `chain_dp` scores below the best Leiden run by more than `--tolerance`
+(relative) on any file.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.chunking import (
+    DEFAULT_COUPLING,
+    DEFAULT_GAMMA,
+    build_trial_network,
+    extract_ikis,
+    load_srt_file,
+    run_multilayer_community_detection,
+)
+
+
+def compare_engines(
+    files: list[Path],
+    sequence_type: str = "blue",
+    gamma: float = DEFAULT_GAMMA,
+    C: float = DEFAULT_COUPLING,
+    n_iter: int = 100,
+    random_state: int = 42,
+) -> list[dict]:
+    rows = []
+    for path in files:
+        ikis = extract_ikis(load_srt_file(path), sequence_type=sequence_type)
+        if not ikis:
+            continue
+        graphs = [build_trial_network(ikis[b]) for b in sorted(ikis)]
+        timings = {}
+        results = {}
+        for engine in ("chain_dp", "leiden"):
+            start = time.perf_counter()
+            results[engine] = run_multilayer_community_detection(
+                graphs, gamma=gamma, C=C, n_iter=n_iter, random_state=random_state, engine=engine
+            )
+            timings[engine] = time.perf_counter() - start
+        q_dp = results["chain_dp"]["best_quality"]
+        q_leiden = results["leiden"]["best_quality"]
+        rows.append(
+            {
+                "file": path.name,
+                "n_blocks": len(graphs),
+                "quality_chain_dp": q_dp,
+                "quality_leiden_best": q_leiden,
+                "quality_leiden_mean": results["leiden"]["mean_quality"],
+                "relative_gap": (q_leiden - q_dp) / abs(q_leiden) if q_leiden else 0.0,
+                "seconds_chain_dp": timings["chain_dp"],
+                "seconds_leiden": timings["leiden"],
+            }
+        )
+        print(
+            f"{path.name}: blocks={len(graphs)} chain_dp={q_dp:.4f} ({timings['chain_dp']:.3f}s) "
+            f"leiden_best={q_leiden:.4f} ({timings['leiden']:.2f}s)"
+        )
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input-dir", default="SRT")
+    parser.add_argument("--pattern", default="*.csv")
+    parser.add_argument("--n-files", type=int, default=20, help="Number of evenly spaced files to compare.")
+    parser.add_argument("--sequence-type", default="blue")
+    parser.add_argument("--n-iter", type=int, default=100, help="Leiden restarts per file.")
+    parser.add_argument("--tolerance", type=float, default=1e-9, help="Allowed relative quality shortfall.")
+    parser.add_argument("--output", default=None, help="Optional JSON file for the per-file results.")
+    args = parser.parse_args(argv)
+
+    files = sorted(Path(args.input_dir).glob(args.pattern))
+    if not files:
+        raise FileNotFoundError(f"No files found: {Path(args.input_dir) / args.pattern}")
+    picks = np.unique(np.linspace(0, len(files) - 1, min(args.n_files, len(files))).astype(int))
+    rows = compare_engines([files[i] for i in picks], sequence_type=args.sequence_type, n_iter=args.n_iter)
+
+    gaps = np.array([r["relative_gap"] for r in rows])
+    speedup = sum(r["seconds_leiden"] for r in rows) / max(sum(r["seconds_chain_dp"] for r in rows), 1e-12)
+    print(
+        f"files={len(rows)} chain_dp>=leiden: {int(np.sum(gaps <= args.tolerance))}/{len(rows)} "
+        f"max_relative_shortfall={max(gaps.max(initial=0.0), 0.0):.2e} speedup={speedup:.0f}x"
+    )
+    if args.output:
+        Path(args.output).write_text(json.dumps(rows, indent=2), encoding="utf-8")
+    return 0 if np.all(gaps <= args.tolerance) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
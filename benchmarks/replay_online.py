@@ -0,0 +1,103 @@
+"""
+Replay SRT files row by row through `OnlineChunkingAnalyzer`.
+
+Usage:
+    python -m benchmarks.replay_online --input-dir SRT --n-files 10
+
+For each file (synthetic sessions of about 100 blocks per sequence when
+`--input-dir` is not given)
+and each engine, rows are fed one at a time. The replay is checked against
+the offline pipeline: after the last row the layers must equal
+`extract_ikis` on the whole file, and the online quality is compared with
+`run_multilayer_community_detection` on all layers (exactly for `chain_dp`).
+Per-update latency is reported. The exit code is 1 on a block mismatch, a
+`chain_dp` quality mismatch, or an update slower than `--max-seconds`.
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from src.chunking import (
+    ENGINES,
+    build_trial_network,
+    extract_ikis,
+    load_srt_file,
+    run_multilayer_community_detection,
+)
+from src.ingest import is_srt_csv
+from src.online import OnlineChunkingAnalyzer, replay_srt_file
+from src.synthetic import generate_srt_corpus
+
+
+def replay_file(path: Path, engine: str, sequence_type: str, n_iter: int, window: int) -> dict:
+    analyzer = OnlineChunkingAnalyzer(sequence_type=sequence_type, engine=engine, window=window, random_state=0)
+    seconds = [update["seconds"] for update in replay_srt_file(path, analyzer)]
+    offline = extract_ikis(load_srt_file(path), sequence_type)
+    state = analyzer.result()
+    blocks_match = sorted(offline) == state["block_ids"] and all(
+        np.array_equal(offline[b], state["ikis"][b]) for b in offline
+    )
+    offline_quality = float("nan")
+    if offline:
+        graphs = [build_trial_network(offline[b]) for b in sorted(offline)]
+        result = run_multilayer_community_detection(graphs, n_iter=n_iter, random_state=0, engine=engine)
+        offline_quality = result["best_quality"]
+    return {
+        "file": path.name,
+        "engine": engine,
+        "n_blocks": state["n_blocks"],
+        "n_updates": len(seconds),
+        "blocks_match": blocks_match,
+        "online_quality": state["quality"] if offline else float("nan"),
+        "offline_quality": offline_quality,
+        "max_seconds": max(seconds, default=0.0),
+        "p95_seconds": float(np.percentile(seconds, 95)) if seconds else 0.0,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input-dir", default=None, help="SRT folder (default: synthetic sessions).")
+    parser.add_argument("--n-files", type=int, default=3)
+    parser.add_argument("--sequence-type", default="blue")
+    parser.add_argument("--engine", nargs="+", default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument("--window", type=int, default=8)
+    parser.add_argument("--n-iter", type=int, default=5, help="Offline Leiden restarts for the comparison.")
+    parser.add_argument("--max-seconds", type=float, default=1.0, help="Allowed seconds per update.")
+    args = parser.parse_args(argv)
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.input_dir is None:
+            files = generate_srt_corpus(tmp, n_files=args.n_files, n_blocks=300)
+        else:
+            files = sorted(p for p in Path(args.input_dir).glob("*.csv") if is_srt_csv(p))
+            picks = np.unique(np.linspace(0, len(files) - 1, min(args.n_files, len(files))).astype(int))
+            files = [files[i] for i in picks]
+        for path in files:
+            for engine in args.engine:
+                row = replay_file(path, engine, args.sequence_type, args.n_iter, args.window)
+                print(
+                    f"{row['file']} [{engine}] blocks={row['n_blocks']} updates={row['n_updates']} "
+                    f"match={row['blocks_match']} quality={row['online_quality']:.4f} "
+                    f"offline={row['offline_quality']:.4f} "
+                    f"max={row['max_seconds']:.3f}s p95={row['p95_seconds']:.3f}s"
+                )
+                if not row["blocks_match"]:
+                    failures.append(f"{row['file']} [{engine}]: layers differ from extract_ikis")
+                same_quality = np.isclose(row["online_quality"], row["offline_quality"], equal_nan=True)
+                if engine == "chain_dp" and not same_quality:
+                    failures.append(f"{row['file']} [{engine}]: quality differs from the offline solve")
+                if row["max_seconds"] > args.max_seconds:
+                    failures.append(f"{row['file']} [{engine}]: update took {row['max_seconds']:.3f}s")
+    for line in failures:
+        print(f"FAIL {line}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,37 +1,96 @@
 from __future__ import annotations
 
 import argparse
+import cProfile
 import json
+import os
+import pstats
+import shutil
+import sys
 import time
+import unicodedata
+import warnings
+import zlib
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Mapping, Sequence
 
 import numpy as np
 import pandas as pd
-from scipy import stats
 
-try:
+if TYPE_CHECKING:  # pragma: no cover - annotations only
     import igraph as ig
-except ImportError as exc:  # pragma: no cover - import guard
-    raise ImportError(
-        "python-igraph is required for chunking analysis. "
-        "Install with: pip install python-igraph"
-    ) from exc
 
-try:
-    import leidenalg as la
-except ImportError as exc:  # pragma: no cover - import guard
-    raise ImportError(
-        "leidenalg is required for chunking analysis. "
-        "Install with: pip install leidenalg"
-    ) from exc
+from .ingest import (
+    ANALYSIS_COLUMNS,
+    SRTDataset,
+    ingest_srt_folder,
+    is_srt_csv,
+    normalize_file_name,
+    parse_srt_filename,
+    read_srt_csv,
+)
+from .prefetch import PrefetchReader
+from .ragged import RaggedArray, RaggedIKIs, pad_rows
+from .result_cache import ResultCache, file_content_hash, parse_size
+from .results_store import ResultsStore
+from .timing import StageTimer, summarize_timings
+from .watchdog import WatchdogPool
+from .writers import CsvAppendWriter, LogWriter, ReorderBuffer, TableWriters
 
 
 EXPECTED_PRESSES_PER_BLOCK = 8
 DEFAULT_GAMMA = 0.9
 DEFAULT_COUPLING = 0.03
+# Bump whenever a change alters per-file results or their schema; cached results of other
+# versions are then ignored and removed by `cache prune`.
+ALGORITHM_VERSION = "9"
+ENGINES = ("leiden", "chain_dp")
+# chain_dp enumerates 2 ** (n_nodes - 1) segmentations per layer; longer chains warn.
+CHAIN_DP_MAX_NODES = 12
+# A participant session recorded further than this from its wave's median date is reported.
+SESSION_DATE_TOLERANCE_DAYS = 180
+# Lazily imported modules that watchdog workers load up front; missing ones are skipped.
+GRAPH_STACK_MODULES = ("igraph", "leidenalg", "scipy.optimize", "scipy.stats")
+SEQUENCE_TYPES = ("blue", "green", "yellow")
+OUTPUT_FORMATS = ("csv", "parquet", "both")
+DEFAULT_SWEEP_GAMMAS = (0.7, 0.8, 0.9, 1.0, 1.1)
+DEFAULT_SWEEP_COUPLINGS = (0.01, 0.02, 0.03, 0.05, 0.1)
+
+
+def _import_igraph() -> Any:
+    """
+    Import python-igraph on first use.
+
+    The graph stack (igraph, leidenalg, scipy) is imported by the functions
+    that need it, so loading this module, the CLI and worker processes stays
+    cheap and the light subcommands work without those packages.
+    """
+    try:
+        import igraph
+    except ImportError as exc:  # pragma: no cover - import guard
+        raise ImportError(
+            "python-igraph is required for chunking analysis. "
+            "Install with: pip install python-igraph"
+        ) from exc
+    return igraph
+
+
+def _import_leidenalg() -> Any:
+    """Import leidenalg on first use (only the 'leiden' engine needs it)."""
+    try:
+        import leidenalg
+    except ImportError as exc:  # pragma: no cover - import guard
+        raise ImportError(
+            "leidenalg is required for chunking analysis. "
+            "Install with: pip install leidenalg"
+        ) from exc
+    return leidenalg
 
 
 @dataclass(frozen=True)
@@ -48,89 +107,233 @@ def _format_seconds(seconds: float) -> str:
     return f"{hours:02d}:{minutes:02d}:{secs:02d}"
 
 
-def load_srt_file(filepath: str | Path) -> pd.DataFrame:
-    """Load one SRT CSV file and coerce key columns into numeric types."""
-    path = Path(filepath)
-    if not path.exists():
-        raise FileNotFoundError(f"SRT file not found: {path}")
+def _file_seed(random_state: int | None, file_path: str | Path) -> int | None:
+    """
+    Derive a reproducible per-file seed from the batch seed.
+
+    The seed depends only on the batch seed and the file name, so it does not
+    change with the file's position in the batch, the number of worker
+    processes, or the completion order.
+    """
+    if random_state is None:
+        return None
+    name = unicodedata.normalize("NFC", Path(file_path).name)
+    seed_seq = np.random.SeedSequence([int(random_state), zlib.crc32(name.encode("utf-8"))])
+    return int(seed_seq.generate_state(1, dtype=np.uint32)[0] & 0x7FFFFFFF)
 
-    df = pd.read_csv(path, sep=";", decimal=",")
-    df.columns = [str(c).strip() for c in df.columns]
 
-    required_cols = [
-        "BlockNumber",
-        "EventNumber",
-        "Time Since Block start",
-        "isHit",
-        "target",
-        "pressed",
-        "sequence",
-    ]
-    if missing := [c for c in required_cols if c not in df.columns]:
-        raise ValueError(f"Missing required columns: {missing}")
-
-    numeric_cols = [
-        "BlockNumber",
-        "EventNumber",
-        "Time Since Block start",
-        "isHit",
-        "target",
-        "pressed",
-    ]
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
+@lru_cache(maxsize=4)
+def _open_dataset(dataset_dir: str) -> SRTDataset:
+    return SRTDataset(dataset_dir)
 
-    df["sequence"] = df["sequence"].astype(str).str.strip().str.lower()
-    df = df.dropna(subset=numeric_cols + ["sequence"]).reset_index(drop=True)
-    df["BlockNumber"] = df["BlockNumber"].astype(int)
-    df["EventNumber"] = df["EventNumber"].astype(int)
-    df["isHit"] = df["isHit"].astype(int)
-    return df
+
+def load_srt_file(
+    filepath: str | Path,
+    dataset: str | Path | None = None,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Load one SRT CSV file and coerce key columns into numeric types.
+
+    With `dataset` (a directory written by `ingest_srt_folder`), the cleaned
+    rows are read from its Parquet copy when that copy is up to date, reading
+    only `columns` if given; otherwise the CSV is parsed.
+    """
+    if dataset is not None:
+        df = _open_dataset(str(dataset)).load(filepath, columns=columns)
+        if df is not None:
+            return df
+    return read_srt_csv(filepath)
 
 
 def extract_ikis(
     df: pd.DataFrame,
     sequence_type: str = "blue",
     expected_presses_per_block: int = EXPECTED_PRESSES_PER_BLOCK,
-) -> dict[int, np.ndarray]:
+    min_presses: int | None = None,
+) -> RaggedIKIs:
     """
     Extract IKIs per block for a chosen sequence.
 
+    See `extract_ikis_batch` for the block filters and `min_presses`.
+
     Returns:
-        Mapping {block_number: np.ndarray of IKIs}
+        `RaggedIKIs`, a mapping {block_number: np.ndarray of IKIs} backed by
+        one flat array (empty if no block is valid).
     """
     seq = sequence_type.lower().strip()
-    filtered = df[(df["isHit"] == 1) & (df["sequence"] == seq)].copy()
+    batch = extract_ikis_batch(
+        df,
+        sequence_types=[seq],
+        file_column=None,
+        expected_presses_per_block=expected_presses_per_block,
+        min_presses=min_presses,
+    )
+    return batch.get((None, seq)) or RaggedIKIs(np.empty(0), [0], [])
 
-    ikis_by_block: dict[int, np.ndarray] = {}
-    for block_number, block_df in filtered.groupby("BlockNumber"):
-        block_df = block_df.sort_values("EventNumber")
-        times = block_df["Time Since Block start"].to_numpy(dtype=float)
-        if times.size != expected_presses_per_block:
-            continue
-        ikis = np.diff(times)
-        if ikis.size != expected_presses_per_block - 1:
-            continue
-        if np.any(ikis <= 0):
-            continue
-        ikis_by_block[int(block_number)] = ikis
 
-    if not ikis_by_block:
+def extract_ikis_batch(
+    df: pd.DataFrame,
+    sequence_types: Iterable[str] = SEQUENCE_TYPES,
+    file_column: str | None = "source_file",
+    expected_presses_per_block: int = EXPECTED_PRESSES_PER_BLOCK,
+    min_presses: int | None = None,
+) -> dict[tuple[str | None, str], RaggedIKIs]:
+    """
+    Extract IKIs per block for every (file, sequence) of a frame in one pass.
+
+    `df` may concatenate several files (e.g. rows read from an `SRTDataset`);
+    rows are grouped by `file_column` when the frame has it, otherwise the
+    whole frame counts as one file with key None. Hit rows are sorted once by
+    (file, sequence, block, event) and processed as flat segments without a
+    per-block loop. For each (file, sequence) the result equals
+    `extract_ikis` on that file's rows.
+
+    A block is kept if it has between `min_presses` (default: exactly
+    `expected_presses_per_block`) and `expected_presses_per_block` hits with
+    increasing times; with a lower `min_presses`, a partially correct block
+    is kept only if its hits are its first presses (by EventNumber), so its
+    IKIs stay at their positions in the sequence and blocks of one file can
+    differ in length. Blocks with a missed press before a hit are dropped.
+    Trials with any IKI beyond 3 SD of the mean at its position (over the
+    group's trials that reach that position) are dropped.
+
+    Returns:
+        Mapping {(file, sequence): RaggedIKIs} with an entry for each
+        (file, sequence) that has at least one valid block.
+    """
+    min_presses = expected_presses_per_block if min_presses is None else min_presses
+    if not 3 <= min_presses <= expected_presses_per_block:
+        raise ValueError("Need 3 <= min_presses <= expected_presses_per_block (at least two IKIs per block).")
+    # Repeated sequence types would make the index non-unique; keep the first of each.
+    sequences = list(dict.fromkeys(s.lower().strip() for s in sequence_types))
+    seq_codes = pd.Index(sequences).get_indexer(df["sequence"].to_numpy(dtype=object))
+    # Misses stay in until each row's position within its block is known.
+    mask = seq_codes >= 0
+    if file_column is not None and file_column in df.columns:
+        file_codes, file_names = pd.factorize(df[file_column].to_numpy(dtype=object)[mask], sort=True)
+    else:
+        file_codes, file_names = np.zeros(int(mask.sum()), dtype=np.int64), [None]
+    seq_codes = seq_codes[mask]
+    blocks = df["BlockNumber"].to_numpy()[mask]
+    times = df["Time Since Block start"].to_numpy(dtype=float)[mask]
+    hits = df["isHit"].to_numpy()[mask] == 1
+    order = np.lexsort((df["EventNumber"].to_numpy()[mask], blocks, seq_codes, file_codes))
+    if order.size == 0:
+        return {}
+    file_codes, seq_codes, blocks, times = file_codes[order], seq_codes[order], blocks[order], times[order]
+
+    # Position of every press in its (file, sequence, block) segment, by event order.
+    changed = np.ones(order.size, dtype=bool)
+    changed[1:] = (np.diff(file_codes) != 0) | (np.diff(seq_codes) != 0) | (np.diff(blocks) != 0)
+    segment = np.cumsum(changed) - 1
+    positions = np.arange(order.size) - np.flatnonzero(changed)[segment]
+    hits = hits[order]
+    if not hits.any():
+        return {}
+    file_codes, seq_codes, blocks, times = file_codes[hits], seq_codes[hits], blocks[hits], times[hits]
+    segment, positions = segment[hits], positions[hits]
+
+    # Keep blocks with an accepted number of hits that are the block's first presses: an IKI
+    # is stored at its column only if no press before it was missed.
+    starts = np.flatnonzero(np.append(True, np.diff(segment) != 0))
+    counts = np.diff(np.append(starts, segment.size))
+    prefix = np.logical_and.reduceat(positions < np.repeat(counts, counts), starts)
+    accepted = (counts >= min_presses) & (counts <= expected_presses_per_block) & prefix
+    starts, counts = starts[accepted], counts[accepted]
+    if starts.size == 0:
+        return {}
+    presses = RaggedArray(np.empty(int(counts.sum())), np.append(0, np.cumsum(counts)))
+    press_times = times[np.repeat(starts - presses.starts, counts) + np.arange(presses.values.shape[0])]
+    # Differences within each block: drop the difference across every block boundary.
+    within = np.ones(press_times.size - 1, dtype=bool)
+    within[presses.starts[1:] - 1] = False
+    ikis = RaggedArray(np.diff(press_times)[within], np.append(0, np.cumsum(counts - 1)))
+    increasing = np.logical_and.reduceat(ikis.values > 0, ikis.starts)
+    keep = np.flatnonzero(increasing)
+    starts, ikis = starts[keep], ikis.take(keep)
+    if starts.size == 0:
         return {}
 
-    block_ids = sorted(ikis_by_block)
-    matrix = np.vstack([ikis_by_block[b] for b in block_ids])
-    means = matrix.mean(axis=0)
-    stds = matrix.std(axis=0, ddof=0)
+    # 3-SD outlier filter per (file, sequence) group and IKI position; rows of a group are contiguous.
+    group_key = file_codes[starts].astype(np.int64) * len(sequences) + seq_codes[starts]
+    group_starts = np.flatnonzero(np.append(True, np.diff(group_key) != 0))
+    group_sizes = np.diff(np.append(group_starts, group_key.size))
+    group_of_row = np.repeat(np.arange(group_starts.size), group_sizes)
+    cell = np.repeat(group_of_row, ikis.lengths) * ikis.width + ikis.column_index()
+    n_cells = group_starts.size * ikis.width
+    cell_counts = np.bincount(cell, minlength=n_cells)
+    means = np.bincount(cell, weights=ikis.values, minlength=n_cells) / np.maximum(cell_counts, 1)
+    deviations = ikis.values - means[cell]
+    variances = np.bincount(cell, weights=deviations * deviations, minlength=n_cells) / np.maximum(cell_counts, 1)
+    stds = np.sqrt(variances)
     stds = np.where(stds == 0, np.nan, stds)
-    z_scores = np.abs((matrix - means) / stds)
-
+    z_scores = np.abs(deviations / stds[cell])
     # Keep trials where each IKI position is within 3 SD
     # (matches Wymbs-style outlier handling).
-    keep_mask = np.nan_to_num(z_scores, nan=0.0) <= 3.0
-    keep_rows = keep_mask.all(axis=1)
+    keep_rows = np.logical_and.reduceat(np.nan_to_num(z_scores, nan=0.0) <= 3.0, ikis.starts)
+
+    result: dict[tuple[str | None, str], RaggedIKIs] = {}
+    for first, size in zip(group_starts, group_sizes):
+        rows = np.arange(first, first + size)[keep_rows[first : first + size]]
+        if rows.size == 0:
+            continue
+        key = (file_names[file_codes[starts[first]]], sequences[seq_codes[starts[first]]])
+        result[key] = RaggedIKIs.from_ragged(ikis.take(rows), blocks[starts[rows]])
+    return result
 
-    return {block_id: ikis_by_block[block_id] for keep, block_id in zip(keep_rows, block_ids) if keep}
+
+class ChainGraphFactory:
+    """
+    Chain trial graphs of one size that share a prebuilt template.
+
+    The topology and the `id`/`name` vertex attributes are built once;
+    `graphs` copies the template per trial and assigns a row of an
+    (n_trials, n_nodes - 1) weight matrix such as `compute_chain_weights`
+    returns, and `reweight` assigns new weight rows to existing graphs in
+    place (e.g. one graph list reused for every null permutation). Use
+    `chain_graph_factory` to get the shared factory for a size.
+    """
+
+    def __init__(self, n_nodes: int) -> None:
+        if n_nodes < 2:
+            raise ValueError("Chain graphs need at least 2 nodes.")
+        self.n_nodes = int(n_nodes)
+        template = _import_igraph().Graph(
+            n=self.n_nodes, edges=[(i, i + 1) for i in range(self.n_nodes - 1)], directed=False
+        )
+        # `find_partition_temporal` needs a stable id across slices for each node position.
+        template.vs["id"] = list(range(self.n_nodes))
+        template.vs["name"] = [f"IKI_{i + 1}" for i in range(self.n_nodes)]
+        self._template = template
+
+    def _weight_rows(self, weights: np.ndarray) -> list[list[float]]:
+        weights = np.asarray(weights, dtype=float)
+        if weights.ndim != 2 or weights.shape[1] != self.n_nodes - 1:
+            raise ValueError(f"Expected weights of shape (n, {self.n_nodes - 1}), got {weights.shape}.")
+        return weights.tolist()
+
+    def graphs(self, weights: np.ndarray) -> list[ig.Graph]:
+        graphs = []
+        for row in self._weight_rows(weights):
+            graph = self._template.copy()
+            graph.es["weight"] = row
+            graphs.append(graph)
+        return graphs
+
+    def reweight(self, graphs: list[ig.Graph], weights: np.ndarray) -> list[ig.Graph]:
+        rows = self._weight_rows(weights)
+        if len(rows) != len(graphs):
+            raise ValueError(f"Got {len(rows)} weight rows for {len(graphs)} graphs.")
+        for graph, row in zip(graphs, rows):
+            graph.es["weight"] = row
+        return graphs
+
+
+@lru_cache(maxsize=None)
+def chain_graph_factory(n_nodes: int) -> ChainGraphFactory:
+    """The shared `ChainGraphFactory` for chain graphs of `n_nodes` nodes."""
+    return ChainGraphFactory(n_nodes)
 
 
 def build_trial_network(ikis: np.ndarray) -> ig.Graph:
@@ -138,108 +341,623 @@ def build_trial_network(ikis: np.ndarray) -> ig.Graph:
     ikis = np.asarray(ikis, dtype=float)
     if ikis.ndim != 1 or ikis.size < 2:
         raise ValueError("IKI vector must be 1D with at least 2 elements.")
+    return chain_graph_factory(ikis.size).graphs(compute_chain_weights(ikis[None, :]))[0]
+
+
+def _compact_labels(labels: Any) -> np.ndarray:
+    """Convert community labels to the smallest signed integer array that holds them (int8 in practice)."""
+    array = np.asarray(labels)
+    max_label = int(array.max()) if array.size else 0
+    for dtype in (np.int8, np.int16, np.int32):
+        if max_label <= np.iinfo(dtype).max:
+            return array.astype(dtype, copy=False)
+    return array.astype(np.int64, copy=False)
+
+
+@lru_cache(maxsize=None)
+def _chain_segmentations(n_nodes: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Enumerate all contiguous segmentations of an `n_nodes` chain.
+
+    Returns `(cuts, labels)`: `cuts[s, i]` is True when segmentation `s` places a
+    boundary between node `i` and `i + 1`; `labels[s]` numbers the segments
+    0, 1, ... from left to right.
+    """
+    n_states = 1 << (n_nodes - 1)
+    cuts = ((np.arange(n_states)[:, None] >> np.arange(n_nodes - 1)) & 1).astype(bool)
+    labels = np.zeros((n_states, n_nodes), dtype=np.int64)
+    labels[:, 1:] = np.cumsum(cuts, axis=1)
+    return cuts, labels
+
+
+@lru_cache(maxsize=None)
+def _segmentation_overlap(n_nodes: int) -> np.ndarray:
+    """
+    Best label agreement between every pair of chain segmentations.
+
+    Entry `[s, t]` is the maximum number of node positions that can keep their
+    community label from a layer segmented as `s` to the next layer segmented
+    as `t` (a maximum-weight matching of segments by overlap). Positive-overlap
+    segment pairs form a staircase along the chain, so the matching is solved
+    for all pairs at once by a left-to-right sweep that tracks whether the
+    current segment of each layer is already matched.
+    """
+    cuts, _ = _chain_segmentations(n_nodes)
+    cut_s = cuts[:, None, :]
+    cut_t = cuts[None, :, :]
+    shape = (cuts.shape[0], cuts.shape[0])
+    neg = np.full(shape, -np.inf)
+    # States: neither/only s/only t/both segments matched (current piece not
+    # chosen), and current piece chosen.
+    v00, v10, v01, v11 = np.zeros(shape), neg.copy(), neg.copy(), neg.copy()
+    vc = np.ones(shape)
+    for i in range(n_nodes - 1):
+        new_s = cut_s[..., i]
+        new_t = cut_t[..., i]
+        f11 = np.maximum(v11, vc)
+        g00 = np.where(
+            new_s & new_t,
+            np.maximum.reduce([v00, v10, v01, f11]),
+            np.where(new_s, np.maximum(v00, v10), np.maximum(v00, v01)),
+        )
+        g10 = np.where(new_t & ~new_s, np.maximum(v10, f11), neg)
+        g01 = np.where(new_s & ~new_t, np.maximum(v01, f11), neg)
+        new_piece = new_s | new_t
+        v00 = np.where(new_piece, g00, v00)
+        v10 = np.where(new_piece, g10, v10)
+        v01 = np.where(new_piece, g01, v01)
+        v11 = np.where(new_piece, neg, v11)
+        vc = np.where(new_piece, g00, vc) + 1.0
+    return np.maximum.reduce([v00, v10, v01, v11, vc])
+
+
+@lru_cache(maxsize=32)
+def _segmentation_overlap_between(n_prev: int, n_next: int) -> np.ndarray:
+    """
+    `_segmentation_overlap` between segmentations of chains of different lengths.
+
+    Only the positions both layers have can keep their label, so each pair
+    scores the overlap of its segmentations cut to the shorter chain.
+    Bit `i` of a state is the cut after node `i`, so cutting a state to `n`
+    nodes keeps its low `n - 1` bits. Stored as int8 (overlaps are at most
+    the chain length) to keep the cached pairs small.
+    """
+    n_common = min(n_prev, n_next)
+    mask = (1 << (n_common - 1)) - 1
+    common = _segmentation_overlap(n_common).astype(np.int8)
+    return common[np.ix_(np.arange(1 << (n_prev - 1)) & mask, np.arange(1 << (n_next - 1)) & mask)]
+
+
+def _match_segments(labels_prev: np.ndarray, labels_next: np.ndarray) -> dict[int, int]:
+    """
+    Map segments of `labels_next` to the overlapping segments of `labels_prev` they continue.
+
+    Layers of different lengths are compared on the positions both have.
+    """
+    n_prev = int(labels_prev.max()) + 1
+    n_next = int(labels_next.max()) + 1
+    n_common = min(labels_prev.size, labels_next.size)
+    from scipy.optimize import linear_sum_assignment
+
+    overlap = np.zeros((n_next, n_prev), dtype=float)
+    np.add.at(overlap, (labels_next[:n_common], labels_prev[:n_common]), 1.0)
+    rows, cols = linear_sum_assignment(overlap, maximize=True)
+    return {int(r): int(c) for r, c in zip(rows, cols) if overlap[r, c] > 0}
+
+
+def _chain_weight_matrix(graphs: list[ig.Graph]) -> np.ndarray | RaggedArray:
+    """
+    Stack the edge weights of chain graphs into an (n_layers, n_nodes - 1) array.
+
+    Chains of different lengths give a `RaggedArray` with a row per layer.
+    """
+    rows = []
+    for graph in graphs:
+        n_nodes = graph.vcount()
+        if n_nodes < 2 or sorted(graph.get_edgelist()) != [(i, i + 1) for i in range(n_nodes - 1)]:
+            raise ValueError("The 'chain_dp' engine requires chain graphs.")
+        order = np.argsort([src for src, _ in graph.get_edgelist()])
+        rows.append(np.asarray(graph.es["weight"], dtype=float)[order])
+    weights = RaggedArray.from_rows(rows)
+    return weights.dense() if weights.is_uniform else weights
 
-    n_nodes = int(ikis.size)
-    pairwise_abs_diff = np.abs(ikis[:, None] - ikis[None, :])
-    d_max = float(pairwise_abs_diff.max())
 
-    if d_max == 0.0:
-        weights = np.ones(n_nodes - 1, dtype=float)
+LayerTerms = tuple[Any, Any, np.ndarray]
+
+
+def _chain_layer_terms(weights: np.ndarray | RaggedArray) -> LayerTerms:
+    """
+    Parameter-free parts of every segmentation's intralayer quality.
+
+    Returns `(internal, null, empty)` with shape (n_layers, n_states) for the
+    first two, such that the RB-configuration quality of a segmentation is
+    `2 * internal - gamma * null`; `empty` flags layers without edge weight.
+    Computed once per file, they let a parameter sweep re-solve each grid
+    point without rebuilding them. For ragged weights of different lengths
+    the first two are lists with one array of that layer's states per
+    layer, computed per length group.
+    """
+    if isinstance(weights, RaggedArray):
+        if weights.is_uniform:
+            return _chain_layer_terms(weights.dense())
+        internal: list[Any] = [None] * len(weights)
+        null_term: list[Any] = [None] * len(weights)
+        empty = np.zeros(len(weights), dtype=bool)
+        for _, rows in weights.length_groups():
+            group_internal, group_null, empty[rows] = _chain_layer_terms(weights.take(rows).dense())
+            for i, row in enumerate(rows):
+                internal[row], null_term[row] = group_internal[i], group_null[i]
+        return internal, null_term, empty
+
+    n_layers, n_edges = weights.shape
+    cuts, seg_labels = _chain_segmentations(n_edges + 1)
+
+    degree = np.zeros((n_layers, n_edges + 1), dtype=float)
+    degree[:, :-1] += weights
+    degree[:, 1:] += weights
+    two_m = degree.sum(axis=1)
+    safe_two_m = np.where(two_m > 0, two_m, 1.0)
+
+    internal = weights @ (~cuts).T.astype(float)
+    onehot = seg_labels[:, :, None] == np.arange(n_edges + 1)[None, None, :]
+    community_degree = np.einsum("ln,snc->lsc", degree, onehot)
+    null_term = (community_degree**2).sum(axis=2) - (degree**2).sum(axis=1)[:, None]
+    return internal, null_term / safe_two_m[:, None], two_m <= 0
+
+
+def _layer_couplings(C: float | Sequence[float] | np.ndarray, n_layers: int) -> np.ndarray:
+    """Interslice coupling of each consecutive layer pair: a scalar `C` everywhere, or `n_layers - 1` values."""
+    couplings = np.asarray(C, dtype=float)
+    if couplings.ndim == 0:
+        return np.full(max(n_layers - 1, 0), float(couplings))
+    if couplings.shape != (max(n_layers - 1, 0),):
+        raise ValueError(
+            f"Expected a scalar coupling or {n_layers - 1} per-pair couplings, got shape {couplings.shape}."
+        )
+    return couplings
+
+
+def _chain_dp_step(
+    score: np.ndarray, coupling: float, doubled_overlap: np.ndarray, n_common: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    One Viterbi transition: the best previous state for every next state, and its score.
+
+    Overlaps lie between 1 and `n_common`, so a previous state scoring more
+    than `2 * |coupling| * (n_common - 1)` below the best one can never win
+    a transition; only the remaining rows of the square overlap table are
+    evaluated. The kept rows stay in index order, so ties resolve as in the
+    full table and the result is identical.
+    """
+    span = 2.0 * abs(coupling) * (n_common - 1)
+    best_score = score.max()
+    # The slack keeps states that rounding could still let win; NaN scores keep every state.
+    rows = np.flatnonzero(~(score < best_score - span - 1e-9 * (1.0 + abs(best_score) + span)))
+    candidates = score[rows, None] + coupling * doubled_overlap[rows]
+    best = np.argmax(candidates, axis=0)
+    return rows[best], candidates[best, np.arange(best.size)]
+
+
+def _chain_dp_partition(
+    weights: np.ndarray | RaggedArray,
+    gamma: float,
+    C: float | np.ndarray,
+    layer_terms: LayerTerms | None = None,
+) -> tuple[list[list[int]], float]:
+    """
+    Optimise temporal multilayer modularity over contiguous chain partitions.
+
+    Each layer is restricted to contiguous segmentations of the chain
+    (2 ** (n_nodes - 1) states). Because interslice coupling only links
+    consecutive layers, the optimum over all layers is found exactly by a
+    Viterbi sweep. The returned quality uses the same scale as
+    `leidenalg.find_partition_temporal`: the improvement over the all-singleton
+    partition of the summed RB-configuration layer qualities plus the
+    interslice CPM quality. `C` is one coupling for all layer pairs or an
+    array of `n_layers - 1` per-pair couplings. Pass precomputed
+    `_chain_layer_terms(weights)` as `layer_terms` to skip rebuilding them.
+
+    Ragged weights (chains of different lengths) run the same sweep with
+    each layer's own states, coupling consecutive layers on the positions
+    both have; the memberships then differ in length per layer.
+
+    Each transition still compares up to (2 ** (n_nodes - 1)) ** 2 state
+    pairs (see `_chain_dp_step`), so the cost grows about fourfold per extra
+    node; chains longer than `CHAIN_DP_MAX_NODES` raise a RuntimeWarning.
+    """
+    if isinstance(weights, RaggedArray) and weights.is_uniform:
+        weights = weights.dense()
+    n_nodes = int(weights.lengths.max() if isinstance(weights, RaggedArray) else weights.shape[1]) + 1
+    if n_nodes > CHAIN_DP_MAX_NODES:
+        warnings.warn(
+            f"chain_dp on {n_nodes}-node chains evaluates up to {1 << (n_nodes - 1)} ** 2 state pairs per "
+            f"layer (limit {CHAIN_DP_MAX_NODES} nodes); engine='leiden' scales better.",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+    if isinstance(weights, RaggedArray):
+        states, quality = _ragged_chain_dp_states(weights, gamma, C, layer_terms)
+        return _chain_dp_memberships(states, weights.lengths + 1), quality
+
+    n_layers, n_edges = weights.shape
+    cuts, _ = _chain_segmentations(n_edges + 1)
+
+    # Intralayer quality of every segmentation in every layer: (n_layers, n_states).
+    internal, null_term, empty = layer_terms if layer_terms is not None else _chain_layer_terms(weights)
+    layer_quality = 2.0 * internal - gamma * null_term
+    layer_quality[empty] = 0.0
+
+    couplings = _layer_couplings(C, n_layers)
+    overlap = 2.0 * _segmentation_overlap(n_edges + 1)
+    score = layer_quality[0].copy()
+    backpointers = np.zeros((n_layers, cuts.shape[0]), dtype=np.int64)
+    for layer in range(1, n_layers):
+        backpointers[layer], score = _chain_dp_step(score, couplings[layer - 1], overlap, n_edges + 1)
+        score = score + layer_quality[layer]
+
+    states = np.empty(n_layers, dtype=np.int64)
+    states[-1] = int(np.argmax(score))
+    for layer in range(n_layers - 1, 0, -1):
+        states[layer - 1] = backpointers[layer, states[layer]]
+    return _chain_dp_memberships(states, np.full(n_layers, n_edges + 1)), float(score[states[-1]])
+
+
+def _ragged_chain_dp_states(
+    weights: RaggedArray,
+    gamma: float,
+    C: float | np.ndarray,
+    layer_terms: LayerTerms | None = None,
+) -> tuple[np.ndarray, float]:
+    """The Viterbi sweep of `_chain_dp_partition` for layers with different numbers of states."""
+    n_layers = len(weights)
+    layer_nodes = weights.lengths + 1
+    internal, null_term, empty = layer_terms if layer_terms is not None else _chain_layer_terms(weights)
+    couplings = _layer_couplings(C, n_layers)
+
+    def layer_quality(layer: int) -> np.ndarray:
+        if empty[layer]:
+            return np.zeros(internal[layer].shape)
+        return 2.0 * internal[layer] - gamma * null_term[layer]
+
+    doubled_overlaps: dict[tuple[int, int], np.ndarray] = {}
+    score = layer_quality(0)
+    backpointers: list[np.ndarray] = [np.zeros(0, dtype=np.int64)]
+    for layer in range(1, n_layers):
+        pair = (int(layer_nodes[layer - 1]), int(layer_nodes[layer]))
+        if pair not in doubled_overlaps:
+            doubled_overlaps[pair] = 2.0 * _segmentation_overlap_between(*pair)
+        best, score = _chain_dp_step(score, couplings[layer - 1], doubled_overlaps[pair], min(pair))
+        backpointers.append(best)
+        score = score + layer_quality(layer)
+
+    states = np.empty(n_layers, dtype=np.int64)
+    states[-1] = int(np.argmax(score))
+    for layer in range(n_layers - 1, 0, -1):
+        states[layer - 1] = backpointers[layer][states[layer]]
+    return states, float(score[states[-1]])
+
+
+def _chain_dp_memberships(states: np.ndarray, layer_nodes: np.ndarray) -> list[list[int]]:
+    """
+    Community labels of the chosen segmentation `states[l]` of each layer's `layer_nodes[l]`-node chain.
+
+    Matched segments continue the previous layer's community, unmatched
+    segments open a new one.
+    """
+    n_layers = states.size
+    memberships: list[list[int]] = []
+    labels = _chain_segmentations(int(layer_nodes[0]))[1][states[0]]
+    segment_ids = np.arange(int(labels.max()) + 1)
+    next_id = segment_ids.size
+    memberships.append(segment_ids[labels].tolist())
+    for layer in range(1, n_layers):
+        prev_labels = labels
+        labels = _chain_segmentations(int(layer_nodes[layer]))[1][states[layer]]
+        matches = _match_segments(prev_labels, labels)
+        new_ids = np.empty(int(labels.max()) + 1, dtype=np.int64)
+        for segment in range(new_ids.size):
+            if segment in matches:
+                new_ids[segment] = segment_ids[matches[segment]]
+            else:
+                new_ids[segment] = next_id
+                next_id += 1
+        segment_ids = new_ids
+        memberships.append(segment_ids[labels].tolist())
+    return memberships
+
+
+def _detect_from_weights(
+    weights: np.ndarray | RaggedArray,
+    gamma: float,
+    C: float,
+    n_iter: int,
+    random_state: int | None,
+    engine: str,
+    graphs: list[ig.Graph] | None = None,
+    **options: Any,
+) -> dict[str, Any]:
+    """
+    Run community detection on chain layers given their (n_layers, n_edges) or ragged weights.
+
+    `graphs` are the matching chain graphs if the caller already has them;
+    otherwise they are built only if the engine needs them. `options` are
+    passed on to `run_multilayer_community_detection`.
+    """
+    if engine == "chain_dp":
+        return _chain_dp_result(weights, gamma=gamma, C=C)
+    if graphs is None:
+        graphs = _chain_graphs(weights)
+    return run_multilayer_community_detection(
+        graphs,
+        gamma=gamma,
+        C=C,
+        n_iter=n_iter,
+        random_state=random_state,
+        engine=engine,
+        **options,
+    )
+
+
+def _chain_dp_result(
+    weights: np.ndarray | RaggedArray,
+    gamma: float,
+    C: float,
+    layer_terms: LayerTerms | None = None,
+) -> dict[str, Any]:
+    memberships, quality = _chain_dp_partition(weights, gamma=gamma, C=C, layer_terms=layer_terms)
+    all_memberships = _compact_labels(pad_rows(memberships)[None])
+    return {
+        "best_memberships": all_memberships[0],
+        "all_memberships": all_memberships,
+        "quality_scores": [quality],
+        "best_quality": quality,
+        "mean_quality": quality,
+        "std_quality": 0.0,
+        "n_restarts": 1,
+        "stop_reason": "exact",
+        "gamma": gamma,
+        "coupling": C,
+        "engine": "chain_dp",
+    }
+
+
+def _temporal_layers(graphs: list[ig.Graph], C: float | np.ndarray) -> tuple[list[ig.Graph], ig.Graph]:
+    """
+    The layer graphs and interslice layer of `leidenalg.time_slices_to_layers`, built directly.
+
+    Layer `l` holds the edges of `graphs[l]` on the vertices of all layers
+    (ordered by layer, then by position) with `node_size` 1 on its own
+    vertices; the interslice layer couples each position to the same
+    position in the next layer with that pair's coupling (`C` is a scalar or
+    `n_layers - 1` values). leidenalg's generic construction matches nodes
+    across slices by id in Python, which takes quadratic time in the number
+    of layers; layers whose `id`s are their positions, like the chain
+    graphs, are built from edge lists in one pass instead. Layers of
+    different sizes couple the positions both layers have.
+    """
+    couplings = _layer_couplings(C, len(graphs))
+    sizes = np.array([graph.vcount() for graph in graphs], dtype=np.int64)
+    positional = all(
+        "id" not in graph.vertex_attributes() or graph.vs["id"] == list(range(graph.vcount())) for graph in graphs
+    )
+    if not positional:
+        la = _import_leidenalg()
+        ig = _import_igraph()
+        slices = ig.Graph.Tree(len(graphs), 1, mode=ig.TREE_UNDIRECTED)
+        slices.es["weight"] = couplings.tolist()
+        slices.vs["slice"] = graphs
+        layers, interslice_layer, _ = la.slices_to_layers(
+            slices, slice_attr="slice", vertex_id_attr="id", edge_type_attr="type", weight_attr="weight"
+        )
+        return layers, interslice_layer
+
+    ig = _import_igraph()
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    n_total = int(offsets[-1])
+    layers = []
+    for index, graph in enumerate(graphs):
+        offset = int(offsets[index])
+        edges = (np.asarray(graph.get_edgelist(), dtype=np.int64).reshape(-1, 2) + offset).tolist()
+        layer = ig.Graph(n=n_total, edges=edges, edge_attrs={"weight": graph.es["weight"]})
+        node_size = np.zeros(n_total, dtype=np.int64)
+        node_size[offset : offset + graph.vcount()] = 1
+        layer.vs["node_size"] = node_size.tolist()
+        layers.append(layer)
+    if (sizes == sizes[0]).all():
+        n_nodes = int(sizes[0])
+        sources = np.arange(n_total - n_nodes, dtype=np.int64)
+        targets = sources + n_nodes
+        edge_weights = np.repeat(couplings, n_nodes)
     else:
-        weights = np.array(
-            [(d_max - abs(ikis[i] - ikis[i + 1])) / d_max for i in range(n_nodes - 1)],
-            dtype=float,
+        n_common = np.minimum(sizes[:-1], sizes[1:])
+        pair_starts = np.repeat(offsets[:-2], n_common)
+        positions = np.arange(int(n_common.sum())) - np.repeat(np.cumsum(n_common) - n_common, n_common)
+        sources = pair_starts + positions
+        targets = np.repeat(offsets[1:-1], n_common) + positions
+        edge_weights = np.repeat(couplings, n_common)
+    interslice_layer = ig.Graph(
+        n=n_total,
+        edges=np.column_stack([sources, targets]).tolist(),
+        edge_attrs={"weight": edge_weights.tolist()},
+    )
+    interslice_layer.vs["node_size"] = 0
+    return layers, interslice_layer
+
+
+def _leiden_temporal_from(
+    graphs: list[ig.Graph],
+    gamma: float,
+    C: float | np.ndarray,
+    seed: int,
+    initial_memberships: Any = None,
+    fixed_layers: Iterable[int] = (),
+) -> tuple[list[list[int]], float]:
+    """
+    One temporal Leiden run, optionally started from `initial_memberships` instead of singletons.
+
+    Mirrors `leidenalg.find_partition_temporal` (same layers, see
+    `_temporal_layers`, partition types and optimiser; from singletons it
+    finds the same memberships for a seed) and reports quality on the same
+    scale, the improvement over the all-singleton partition. `C` may also
+    hold one coupling per consecutive layer pair. The nodes of the layers listed in
+    `fixed_layers` keep their initial communities.
+    """
+    la = _import_leidenalg()
+    layers, interslice_layer = _temporal_layers(graphs, C)
+    # Vertices are ordered by slice, then by position within the slice.
+    n_total = interslice_layer.vcount()
+    if initial_memberships is None:
+        initial = list(range(n_total))
+    else:
+        # Padded memberships (see `pad_rows`) mark missing positions with -1.
+        initial = [int(label) for layer in initial_memberships for label in layer if label >= 0]
+    if len(initial) != n_total:
+        raise ValueError("initial_memberships must match the layer sizes of the graphs.")
+    partitions = [
+        la.RBConfigurationVertexPartition(
+            layer, initial_membership=initial, weights="weight", resolution_parameter=gamma
         )
+        for layer in layers
+    ]
+    interslice_partition = la.CPMVertexPartition(
+        interslice_layer,
+        initial_membership=initial,
+        resolution_parameter=0,
+        node_sizes="node_size",
+        weights="weight",
+    )
+    optimiser = la.Optimiser()
+    optimiser.set_rng_seed(seed)
+    fixed = set(fixed_layers)
+    optimiser.optimise_partition_multiplex(
+        partitions + [interslice_partition],
+        is_membership_fixed=[i in fixed for i, graph in enumerate(graphs) for _ in range(graph.vcount())]
+        if fixed
+        else None,
+    )
+
+    membership = partitions[0].membership
+    offsets = np.cumsum([0] + [graph.vcount() for graph in graphs])
+    memberships = [membership[offsets[i] : offsets[i + 1]] for i in range(len(graphs))]
+    quality = sum(float(p.quality()) for p in partitions) + float(interslice_partition.quality())
+    return memberships, quality - _singleton_quality(graphs, gamma)
+
 
-    edges = [(i, i + 1) for i in range(n_nodes - 1)]
-    graph = ig.Graph(n=n_nodes, edges=edges, directed=False)
-    graph.es["weight"] = weights.tolist()
-    # `find_partition_temporal` needs a stable id across slices for each node position.
-    graph.vs["id"] = list(range(n_nodes))
-    graph.vs["name"] = [f"IKI_{i + 1}" for i in range(n_nodes)]
-    return graph
+def _singleton_quality(graphs: list[ig.Graph], gamma: float) -> float:
+    """RB-configuration quality of the all-singleton partition: -gamma * sum(k_i^2) / 2m per layer."""
+    singleton = 0.0
+    for graph in graphs:
+        strength = np.asarray(graph.strength(weights="weight"), dtype=float)
+        if strength.sum() > 0:
+            singleton -= gamma * float(strength @ strength) / float(strength.sum())
+    return singleton
 
 
 def run_multilayer_community_detection(
     graphs: list[ig.Graph],
     gamma: float = DEFAULT_GAMMA,
-    C: float = DEFAULT_COUPLING,
+    C: float | Sequence[float] = DEFAULT_COUPLING,
     n_iter: int = 100,
     random_state: int | None = None,
+    engine: str = "leiden",
+    adaptive: bool = False,
+    patience: int = 10,
+    agreement: int = 5,
+    tol: float = 1e-9,
+    time_budget: float | None = None,
+    initial_memberships: Any = None,
 ) -> dict[str, Any]:
     """
-    Run temporal multilayer community detection using leidenalg.
-
-    Uses Mucha-style temporal coupling via `find_partition_temporal`.
+    Run temporal multilayer community detection.
+
+    Uses Mucha-style temporal coupling. `engine="leiden"` runs the
+    optimisation of `leidenalg.find_partition_temporal` `n_iter` times with
+    random seeds (see `_leiden_temporal_from`) and keeps the best run.
+    `engine="chain_dp"` solves chain graphs in one deterministic pass (see
+    `_chain_dp_partition`); `n_iter` and `random_state` are ignored. `C` is
+    one interslice coupling for all consecutive layers, or a sequence of
+    `len(graphs) - 1` per-pair couplings (e.g. a weaker coupling between
+    sessions, see `run_participant_analysis`).
+
+    With `adaptive`, `n_iter` is an upper bound: restarts stop once the best
+    quality has not improved by more than `tol` for `patience` restarts, or
+    once `agreement` restarts have reached the best quality within `tol`.
+    `time_budget` (seconds) stops restarting once exceeded, adaptive or not;
+    at least one restart is always run. The result reports `n_restarts` and
+    `stop_reason`.
+
+    `initial_memberships` (n_layers lists of node labels, e.g. the
+    `best_memberships` of a neighbouring parameter setting) warm-starts the
+    first Leiden restart; later restarts start from singletons as usual.
+
+    `all_memberships` is a compact integer array of shape
+    (n_restarts, n_layers, n_nodes) and `best_memberships` is its best row.
+    Layers of different sizes are padded to the largest with -1.
     """
     if not graphs:
         raise ValueError("No trial graphs provided.")
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {ENGINES}.")
 
     for graph in graphs:
         if "weight" not in graph.es.attribute_names():
             raise ValueError("Each graph must contain edge attribute 'weight'.")
 
+    if np.ndim(C) != 0:
+        C = _layer_couplings(C, len(graphs))
+    if engine == "chain_dp":
+        return _chain_dp_result(_chain_weight_matrix(graphs), gamma=gamma, C=C)
+
     rng = np.random.default_rng(random_state)
     quality_scores: list[float] = []
-    all_memberships: list[list[list[int]]] = []
-
-    for _ in range(n_iter):
+    all_memberships: list[np.ndarray] = []
+    start_time = time.perf_counter()
+    stop_reason = "max_restarts"
+    best_quality = -np.inf
+    since_improvement = 0
+    n_at_best = 0
+
+    for restart in range(n_iter):
+        if time_budget is not None and quality_scores and time.perf_counter() - start_time >= time_budget:
+            stop_reason = "time_budget"
+            break
         seed = int(rng.integers(0, 2**31 - 1))
-        temporal_out = la.find_partition_temporal(
-            graphs,
-            la.RBConfigurationVertexPartition,
-            interslice_weight=C,
-            weights="weight",
-            resolution_parameter=gamma,
-            seed=seed,
-        )
+        # Equivalent to `leidenalg.find_partition_temporal` (same memberships and
+        # quality for a seed), with the layers built in linear time.
+        initial = initial_memberships if restart == 0 else None
+        memberships, quality = _leiden_temporal_from(graphs, gamma, C, seed, initial)
 
-        memberships: list[list[int]]
-        quality: float
+        all_memberships.append(_compact_labels(pad_rows(memberships)))
+        quality_scores.append(quality)
 
-        # Compatibility across leidenalg versions:
-        # - Newer API may return (partitions, interslice_partition_obj)
-        # - Older API returns (memberships, quality_float)
-        if (
-            isinstance(temporal_out, tuple)
-            and len(temporal_out) == 2
-            and isinstance(temporal_out[0], list)
-            and temporal_out[0]
-            and hasattr(temporal_out[0][0], "membership")
-        ):
-            partitions, interslice_partition = temporal_out
-            memberships = [p.membership[:] for p in partitions]
-            quality = float(
-                sum(float(p.quality()) for p in partitions)
-                + float(interslice_partition.quality())
-            )
-        elif (
-            isinstance(temporal_out, tuple)
-            and len(temporal_out) == 2
-            and isinstance(temporal_out[0], list)
-        ):
-            raw_memberships, raw_quality = temporal_out
-            memberships = [list(m) for m in raw_memberships]
-            quality = float(raw_quality)
+        if quality > best_quality + tol:
+            best_quality = quality
+            since_improvement = 0
+            n_at_best = 1
         else:
-            raise RuntimeError(
-                "Unexpected return format from leidenalg.find_partition_temporal."
-            )
-
-        all_memberships.append(memberships)
-        quality_scores.append(quality)
+            since_improvement += 1
+            n_at_best += quality >= best_quality - tol
+        if adaptive and since_improvement >= patience:
+            stop_reason = "no_improvement"
+            break
+        if adaptive and n_at_best >= agreement:
+            stop_reason = "agreement"
+            break
 
     best_idx = int(np.argmax(quality_scores))
-    best_memberships = all_memberships[best_idx]
+    membership_array = _compact_labels(np.stack(all_memberships))
     return {
-        "best_memberships": best_memberships,
-        "all_memberships": all_memberships,
+        "best_memberships": membership_array[best_idx],
+        "all_memberships": membership_array,
         "quality_scores": quality_scores,
         "best_quality": float(quality_scores[best_idx]),
         "mean_quality": float(np.mean(quality_scores)),
         "std_quality": float(np.std(quality_scores, ddof=0)),
+        "n_restarts": len(quality_scores),
+        "stop_reason": stop_reason,
         "gamma": gamma,
         "coupling": C,
+        "engine": engine,
     }
 
 
@@ -264,89 +982,510 @@ def compute_single_trial_modularity(
     return float(q)
 
 
+def compute_chain_weights(iki_matrix: np.ndarray | RaggedArray) -> np.ndarray | RaggedArray:
+    """
+    Edge weights of the chain trial networks for many trials at once.
+
+    Row-wise equivalent of the weights set by `build_trial_network`:
+    `(d_max - |IKI_i - IKI_{i+1}|) / d_max` with `d_max` the largest absolute
+    IKI difference within the trial (all ones if the trial is constant).
+
+    Returns:
+        Array of shape (n_trials, n_ikis - 1), or for a `RaggedArray` of
+        trials (e.g. `RaggedIKIs`) a `RaggedArray` with one weight fewer per
+        row than IKIs.
+    """
+    if isinstance(iki_matrix, RaggedArray):
+        return _ragged_chain_weights(iki_matrix)
+    ikis = np.asarray(iki_matrix, dtype=float)
+    if ikis.ndim != 2 or ikis.shape[1] < 2:
+        raise ValueError("IKI matrix must be 2D with at least 2 IKIs per trial.")
+    d_max = ikis.max(axis=1) - ikis.min(axis=1)
+    neighbour_diff = np.abs(np.diff(ikis, axis=1))
+    safe_d_max = np.where(d_max == 0.0, 1.0, d_max)
+    weights = (safe_d_max[:, None] - neighbour_diff) / safe_d_max[:, None]
+    weights[d_max == 0.0] = 1.0
+    return weights
+
+
+def _ragged_chain_weights(ikis: RaggedArray) -> RaggedArray:
+    """`compute_chain_weights` for trials of varying length, computed on the flat IKI values."""
+    if len(ikis) and int(ikis.lengths.min()) < 2:
+        raise ValueError("Every trial needs at least 2 IKIs.")
+    values = np.asarray(ikis.values, dtype=float)
+    if values.size == 0:
+        return RaggedArray(np.empty(0), np.zeros(len(ikis) + 1, dtype=np.int64))
+    d_max = np.maximum.reduceat(values, ikis.starts) - np.minimum.reduceat(values, ikis.starts)
+    # Differences within each trial: drop the difference across every trial boundary.
+    within = np.ones(values.size - 1, dtype=bool)
+    within[ikis.starts[1:] - 1] = False
+    neighbour_diff = np.abs(np.diff(values))[within]
+    edge_offsets = ikis.offsets - np.arange(len(ikis) + 1)
+    edge_rows = np.repeat(np.arange(len(ikis)), np.diff(edge_offsets))
+    safe_d_max = np.where(d_max == 0.0, 1.0, d_max)[edge_rows]
+    weights = (safe_d_max - neighbour_diff) / safe_d_max
+    weights[(d_max == 0.0)[edge_rows]] = 1.0
+    return RaggedArray(weights, edge_offsets)
+
+
+def _chain_graphs(weights: np.ndarray | RaggedArray, graphs: list[ig.Graph] | None = None) -> list[ig.Graph]:
+    """
+    Chain graphs for dense (n_layers, n_edges) or ragged chain weights.
+
+    Layers of each length come from that length's `chain_graph_factory`.
+    With `graphs` (built by an earlier call for the same layer lengths), the
+    new weights are assigned to them in place instead.
+    """
+    if not isinstance(weights, RaggedArray):
+        factory = chain_graph_factory(weights.shape[1] + 1)
+        return factory.graphs(weights) if graphs is None else factory.reweight(graphs, weights)
+    out: list[Any] = [None] * len(weights) if graphs is None else graphs
+    for n_edges, rows in weights.length_groups():
+        factory = chain_graph_factory(n_edges + 1)
+        group_weights = weights.take(rows).dense()
+        if graphs is None:
+            for row, graph in zip(rows, factory.graphs(group_weights)):
+                out[row] = graph
+        else:
+            factory.reweight([out[row] for row in rows], group_weights)
+    return out
+
+
+def _normalize_phi(phi: np.ndarray) -> np.ndarray:
+    """phi relative to the mean finite phi of the file (NaN if undefined)."""
+    finite_phi = phi[np.isfinite(phi)]
+    if finite_phi.size == 0 or float(finite_phi.mean()) == 0.0:
+        return np.full(phi.shape, np.nan)
+    mean_phi = float(finite_phi.mean())
+    return (phi - mean_phi) / mean_phi
+
+
+def compute_single_trial_modularity_batch(
+    iki_matrix: np.ndarray | RaggedArray,
+    labels: np.ndarray,
+) -> dict[str, np.ndarray]:
+    """
+    Compute Q_single_trial, phi and phi_normalized for all trials in one pass.
+
+    For a chain network, weighted modularity only depends on the edge weights
+    and on whether the two ends of each edge (and each node pair, for the null
+    term) share a label, so no graph objects are needed.
+
+    Args:
+        iki_matrix: IKIs, shape (n_trials, n_ikis), or a `RaggedArray` of
+            trials of different lengths (computed per length group).
+        labels: Community labels, shape (n_trials, n_ikis); for ragged IKIs
+            padded to at least the longest trial (see `pad_rows`).
+
+    Returns:
+        Dict with arrays `q_single_trial`, `phi` and `phi_normalized`, each of
+        shape (n_trials,). Matches `compute_single_trial_modularity` applied to
+        `build_trial_network` for each trial.
+    """
+    labels = np.asarray(labels)
+    if isinstance(iki_matrix, RaggedArray):
+        if labels.ndim != 2 or labels.shape[0] != len(iki_matrix) or labels.shape[1] < iki_matrix.width:
+            raise ValueError("Label matrix must have a row per trial, at least as wide as the longest trial.")
+        q = np.empty(len(iki_matrix))
+        for length, rows in iki_matrix.length_groups():
+            q[rows] = _single_trial_q(iki_matrix.take(rows).dense(), labels[rows, :length])
+    else:
+        q = _single_trial_q(iki_matrix, labels)
+    with np.errstate(divide="ignore"):
+        phi = np.where(q <= 0, np.nan, 1.0 / q)
+    return {"q_single_trial": q, "phi": phi, "phi_normalized": _normalize_phi(phi)}
+
+
+def _single_trial_q(iki_matrix: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """Q_single_trial of equally long trials, see `compute_single_trial_modularity_batch`."""
+    weights = compute_chain_weights(iki_matrix)
+    if labels.shape != (weights.shape[0], weights.shape[1] + 1):
+        raise ValueError("Label matrix must have the same shape as the IKI matrix.")
+
+    degree = np.zeros(labels.shape, dtype=float)
+    degree[:, :-1] += weights
+    degree[:, 1:] += weights
+    two_m = degree.sum(axis=1)
+
+    same_edge = labels[:, :-1] == labels[:, 1:]
+    internal = 2.0 * (weights * same_edge).sum(axis=1)
+    same = labels[:, :, None] == labels[:, None, :]
+    null_term = np.einsum("bi,bij,bj->b", degree, same, degree)
+
+    safe_two_m = np.where(two_m > 0, two_m, 1.0)
+    q = (internal - null_term / safe_two_m) / safe_two_m
+    q[two_m <= 0] = 0.0
+    return q
+
+
+def multilayer_modularity(
+    iki_matrix: np.ndarray | RaggedArray,
+    labels: np.ndarray,
+    gamma: float = DEFAULT_GAMMA,
+    C: float | Sequence[float] = DEFAULT_COUPLING,
+    normalize: bool = False,
+) -> float | np.ndarray:
+    """
+    Mucha-style temporal multilayer modularity of chain-trial partitions.
+
+    `iki_matrix` (n_blocks, n_ikis) defines the chain layers of
+    `build_trial_network` (weights from `compute_chain_weights`); `labels`
+    is one (n_blocks, n_ikis) label matrix or a stack (n_partitions,
+    n_blocks, n_ikis) scored at once. Labels are global: equal labels at the
+    same position in consecutive blocks earn the interslice coupling `C`,
+    which may also be a sequence of n_blocks - 1 per-pair couplings.
+    For blocks of different lengths pass a `RaggedArray` (e.g. `RaggedIKIs`)
+    with labels padded by -1 (see `pad_rows`); consecutive blocks are
+    coupled on the positions both have.
+
+    By default the score is on the scale `run_multilayer_community_detection`
+    reports for leidenalg: the improvement of the summed RB-configuration
+    layer qualities plus the interslice CPM quality over the all-singleton
+    partition. With `normalize`, the raw quality is divided by 2 * mu, the
+    total intra- and interlayer strength, giving Mucha et al.'s Q.
+    """
+    labels = np.asarray(labels)
+    single = labels.ndim == 2
+    if single:
+        labels = labels[None]
+    if isinstance(iki_matrix, RaggedArray):
+        node_counts = iki_matrix.lengths
+        if labels.ndim != 3 or labels.shape[1] != len(iki_matrix) or labels.shape[2] < iki_matrix.width:
+            raise ValueError("labels must have a row per block, at least as wide as the longest block.")
+        layer_quality = np.empty(labels.shape[:2])
+        two_m = np.empty(len(iki_matrix))
+        degree_sq = np.empty(len(iki_matrix))
+        for length, rows in iki_matrix.length_groups():
+            weights = compute_chain_weights(iki_matrix.take(rows).dense())
+            layer_quality[:, rows], two_m[rows], degree_sq[rows] = _chain_layer_quality(
+                weights, labels[:, rows, :length], gamma
+            )
+    else:
+        weights = compute_chain_weights(np.asarray(iki_matrix, dtype=float))
+        node_counts = np.full(weights.shape[0], weights.shape[1] + 1)
+        if labels.ndim != 3 or labels.shape[1:] != (weights.shape[0], weights.shape[1] + 1):
+            raise ValueError("labels must have shape (n_blocks, n_ikis) or (n_partitions, n_blocks, n_ikis).")
+        layer_quality, two_m, degree_sq = _chain_layer_quality(weights, labels, gamma)
+
+    couplings = _layer_couplings(C, labels.shape[1])
+    # Padding (-1) never matches: only positions both blocks have are coupled.
+    kept = (labels[:, 1:] == labels[:, :-1]) & (labels[:, 1:] >= 0)
+    interslice = 2.0 * kept.sum(axis=2) @ couplings
+    quality = layer_quality.sum(axis=1) + interslice
+
+    if normalize:
+        safe_two_m = np.where(two_m > 0, two_m, 1.0)
+        singleton = -gamma * (degree_sq / safe_two_m)[two_m > 0].sum()
+        if (node_counts == node_counts[0]).all():
+            two_mu = two_m.sum() + 2.0 * couplings.sum() * node_counts[0]
+        else:
+            two_mu = two_m.sum() + 2.0 * couplings @ np.minimum(node_counts[:-1], node_counts[1:])
+        quality = (quality + singleton) / two_mu
+    return float(quality[0]) if single else quality
+
+
+def _chain_layer_quality(
+    weights: np.ndarray, labels: np.ndarray, gamma: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    RB-configuration quality over the singleton partition of equally long chain layers.
+
+    `labels` has shape (n_partitions, n_layers, n_nodes); returns the
+    (n_partitions, n_layers) qualities, each layer's total strength 2m and
+    its sum of squared node strengths.
+    """
+    degree = np.zeros((weights.shape[0], weights.shape[1] + 1))
+    degree[:, :-1] += weights
+    degree[:, 1:] += weights
+    two_m = degree.sum(axis=1)
+    safe_two_m = np.where(two_m > 0, two_m, 1.0)
+
+    internal = np.einsum("ple,le->pl", labels[..., :-1] == labels[..., 1:], weights)
+    same = labels[..., :, None] == labels[..., None, :]
+    degree_sq = (degree**2).sum(axis=1)
+    null = np.einsum("plij,li,lj->pl", same, degree, degree) - degree_sq
+    return np.where(two_m > 0, 2.0 * internal - gamma * null / safe_two_m, 0.0), two_m, degree_sq
+
+
+def module_allegiance(all_memberships: np.ndarray) -> np.ndarray:
+    """
+    Co-assignment frequency of node pairs across restarts.
+
+    `all_memberships` has shape (n_restarts, n_layers, n_nodes); the result
+    has shape (n_layers, n_nodes, n_nodes) and entry (l, i, j) is the
+    fraction of restarts that put nodes i and j of layer l into the same
+    community. Padded positions (label -1, see `pad_rows`) get NaN.
+    """
+    labels = np.asarray(all_memberships)
+    if labels.ndim != 3:
+        raise ValueError("all_memberships must have shape (n_restarts, n_layers, n_nodes).")
+    allegiance = (labels[..., :, None] == labels[..., None, :]).mean(axis=0)
+    valid = labels[0] >= 0
+    if not valid.all():
+        allegiance[~(valid[:, :, None] & valid[:, None, :])] = np.nan
+    return allegiance
+
+
+def consensus_partition(allegiance: np.ndarray, threshold: float = 0.5) -> np.ndarray:
+    """
+    Consensus labels per layer from a module-allegiance tensor.
+
+    Nodes whose allegiance exceeds `threshold` are linked and each connected
+    component of these links becomes one community (transitive closure by
+    repeated boolean matrix squaring, batched over layers). Labels are
+    numbered 0, 1, ... in order of first appearance within each layer.
+    Returns an (n_layers, n_nodes) array; padded nodes (NaN allegiance with
+    themselves, see `module_allegiance`) get -1.
+    """
+    allegiance = np.asarray(allegiance, dtype=float)
+    n_nodes = allegiance.shape[-1]
+    linked = (allegiance > threshold) | np.eye(n_nodes, dtype=bool)
+    reach = linked.astype(np.int64)
+    for _ in range(max(1, int(np.ceil(np.log2(max(n_nodes, 2)))))):
+        reach = np.minimum(reach @ reach, 1)
+    # Each node takes the lowest node index of its component, then labels are made dense.
+    first_member = np.argmax(reach > 0, axis=-1)
+    is_first = first_member == np.arange(n_nodes)
+    dense = np.cumsum(is_first, axis=-1) - 1
+    labels = np.take_along_axis(dense, first_member, axis=-1)
+    labels[np.isnan(np.diagonal(allegiance, axis1=-2, axis2=-1))] = -1
+    return _compact_labels(labels)
+
+
+def _allegiance_metrics(all_memberships: np.ndarray, labels: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Per-layer stability of `labels` across restarts.
+
+    `allegiance_confidence` is the mean of |2 * allegiance - 1| over node
+    pairs (1: all restarts agree on every pair, 0: every pair is a coin
+    flip); `consensus_stability` is the fraction of restarts whose layer
+    partition equals `labels`.
+    """
+    restarts = np.asarray(all_memberships)
+    allegiance = module_allegiance(restarts)
+    upper = np.triu(np.ones(allegiance.shape[-1:] * 2, dtype=bool), k=1)
+    pair_confidence = np.abs(2.0 * allegiance[:, upper] - 1.0)
+    if np.isnan(pair_confidence).any():
+        # Pairs with a padded node are NaN and left out.
+        confidence = np.nanmean(pair_confidence, axis=1)
+    else:
+        confidence = pair_confidence.mean(axis=1)
+    coassigned = restarts[..., :, None] == restarts[..., None, :]
+    target = labels[:, :, None] == labels[:, None, :]
+    stability = (coassigned == target[None]).all(axis=(2, 3)).mean(axis=0)
+    return {"allegiance_confidence": confidence, "consensus_stability": stability}
+
+
 def compute_chunk_metrics(
-    ikis_dict: dict[int, np.ndarray],
-    partitions: dict[int, list[int]] | list[list[int]],
+    ikis_dict: Mapping[int, np.ndarray],
+    partitions: dict[int, list[int]] | list[list[int]] | np.ndarray,
+    all_memberships: np.ndarray | None = None,
+    width: int | None = None,
 ) -> pd.DataFrame:
-    """Compute per-trial chunk metrics from IKIs and community labels."""
-    block_ids = sorted(ikis_dict)
+    """
+    Compute per-trial chunk metrics from IKIs and community labels.
+
+    IKIs and labels are stored in fixed-width columns `iki_1..iki_n` and
+    `label_1..label_n`; chunk boundaries are encoded in `boundary_mask`, where
+    bit `i` is set when IKI `i + 1` and IKI `i + 2` fall into different chunks
+    (see `decode_boundary_mask` and `unpack_trial_arrays`). `n` is `width`
+    (default: the longest block); `n_ikis` holds each block's own length and
+    shorter blocks are padded with NaN IKIs and -1 labels.
+
+    With `all_memberships` (every restart's labels, shape (n_restarts,
+    n_blocks, n_ikis) in sorted block order), the per-block
+    `allegiance_confidence` and `consensus_stability` columns report how
+    consistently the restarts agree (see `_allegiance_metrics`).
+    """
+    ikis = RaggedIKIs.from_dict(ikis_dict)
+    block_ids = ikis.block_ids.tolist()
     if isinstance(partitions, dict):
         membership_map = partitions
     else:
         membership_map = dict(zip(block_ids, partitions))
 
-    rows: list[dict[str, Any]] = []
-    for block_id in block_ids:
-        ikis = ikis_dict[block_id]
-        membership = np.asarray(membership_map[block_id], dtype=int)
-        graph = build_trial_network(ikis)
-        q_single = compute_single_trial_modularity(membership, graph)
-        phi = np.nan if q_single <= 0 else 1.0 / q_single
-        boundaries = [
-            i + 1 for i in range(len(membership) - 1) if membership[i] != membership[i + 1]
-        ]
-        rows.append(
-            {
-                "block_number": block_id,
-                "q_single_trial": q_single,
-                "phi": phi,
-                "n_chunks": int(np.unique(membership).size),
-                "chunk_boundaries": boundaries,
-                "community_labels": membership.tolist(),
-                "ikis": ikis.tolist(),
-            }
-        )
+    lengths = ikis.lengths
+    iki_matrix = ikis.padded(np.nan, width)
+    label_rows = [np.asarray(membership_map[b])[:n] for b, n in zip(block_ids, lengths)]
+    labels = _compact_labels(pad_rows(label_rows, fill=-1, width=iki_matrix.shape[1]))
+    modularity = compute_single_trial_modularity_batch(ikis, labels)
+    is_boundary = (labels[:, :-1] != labels[:, 1:]) & (labels[:, 1:] >= 0)
+    sorted_labels = np.sort(labels, axis=1)
+    n_chunks = (sorted_labels[:, 0] >= 0) + (
+        (sorted_labels[:, 1:] != sorted_labels[:, :-1]) & (sorted_labels[:, 1:] >= 0)
+    ).sum(axis=1)
+    boundary_mask = is_boundary.astype(np.int64) @ (1 << np.arange(is_boundary.shape[1], dtype=np.int64))
+
+    columns: dict[str, Any] = {
+        "block_number": block_ids,
+        "n_ikis": lengths,
+        "q_single_trial": modularity["q_single_trial"],
+        "phi": modularity["phi"],
+        "phi_normalized": modularity["phi_normalized"],
+        "n_chunks": n_chunks.astype(int),
+        "boundary_mask": boundary_mask,
+    }
+    if all_memberships is not None:
+        # Restarts are padded to the longest block only, which may be narrower than `width`.
+        columns.update(_allegiance_metrics(all_memberships, labels[:, : np.shape(all_memberships)[2]]))
+    for i in range(iki_matrix.shape[1]):
+        columns[f"iki_{i + 1}"] = iki_matrix[:, i]
+    for i in range(labels.shape[1]):
+        columns[f"label_{i + 1}"] = labels[:, i]
+    return pd.DataFrame(columns)
 
-    out = pd.DataFrame(rows).sort_values("block_number").reset_index(drop=True)
-    finite_phi = out["phi"].replace([np.inf, -np.inf], np.nan).dropna()
-    if finite_phi.empty or float(finite_phi.mean()) == 0.0:
-        out["phi_normalized"] = np.nan
-    else:
-        mean_phi = float(finite_phi.mean())
-        out["phi_normalized"] = (out["phi"] - mean_phi) / mean_phi
-    return out
+
+def decode_boundary_mask(mask: int, n_ikis: int = EXPECTED_PRESSES_PER_BLOCK - 1) -> list[int]:
+    """Chunk boundary positions encoded in `boundary_mask` (a boundary `k` lies after IKI `k`)."""
+    return [i + 1 for i in range(n_ikis - 1) if (int(mask) >> i) & 1]
+
+
+def unpack_trial_arrays(trials: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return the (n_trials, n_ikis) IKI and label matrices stored in a per-trial metrics table.
+
+    Blocks shorter than the table (see the `n_ikis` column) are padded with NaN IKIs and -1 labels.
+    """
+    iki_cols = [c for c in trials.columns if c.startswith("iki_")]
+    label_cols = [c for c in trials.columns if c.startswith("label_")]
+    iki_cols.sort(key=lambda c: int(c.split("_")[1]))
+    label_cols.sort(key=lambda c: int(c.split("_")[1]))
+    return trials[iki_cols].to_numpy(dtype=float), _compact_labels(trials[label_cols].to_numpy())
+
+
+def _permutation_test_decided(
+    n_exceed: int,
+    n_done: int,
+    alpha: float,
+    confidence: float,
+) -> bool:
+    """
+    Whether the permutation p-value is clearly below or above `alpha`.
+
+    Uses a Clopper-Pearson interval for the exceedance probability after
+    `n_done` permutations with `n_exceed` null scores >= the empirical score.
+    """
+    from scipy import stats
+
+    tail = (1.0 - confidence) / 2.0
+    lower = stats.beta.ppf(tail, n_exceed, n_done - n_exceed + 1) if n_exceed > 0 else 0.0
+    upper = stats.beta.ppf(1.0 - tail, n_exceed + 1, n_done - n_exceed) if n_exceed < n_done else 1.0
+    return bool(upper < alpha or lower > alpha)
+
+
+def _shuffled_chain_weights(
+    ikis: np.ndarray | RaggedArray, n_permutations: int, rng: np.random.Generator
+) -> Any:
+    """
+    Chain weights of `n_permutations` shuffles of the IKI order within every block.
+
+    Dense IKIs give an (n_permutations, n_blocks, n_ikis - 1) array. Ragged
+    IKIs are shuffled in their flat layout by sorting each value's row index
+    plus a uniform key, which keeps every value in its block; this gives one
+    `RaggedArray` of weights per permutation.
+    """
+    if not isinstance(ikis, RaggedArray):
+        shuffled = rng.permuted(np.broadcast_to(ikis, (n_permutations, *ikis.shape)), axis=2)
+        return compute_chain_weights(shuffled.reshape(-1, ikis.shape[1])).reshape(
+            n_permutations, ikis.shape[0], ikis.shape[1] - 1
+        )
+    n_values = ikis.values.shape[0]
+    order = np.argsort(ikis.row_index() + rng.random((n_permutations, n_values)), axis=1)
+    offsets = ikis.offsets[1:] + n_values * np.arange(n_permutations)[:, None]
+    stacked = RaggedArray(ikis.values[order].ravel(), np.concatenate([[0], offsets.ravel()]))
+    weights = compute_chain_weights(stacked)
+    edge_offsets = weights.offsets[: len(ikis) + 1]
+    return [RaggedArray(row, edge_offsets) for row in weights.values.reshape(n_permutations, -1)]
 
 
 def statistical_validation(
-    ikis_dict: dict[int, np.ndarray],
+    ikis_dict: Mapping[int, np.ndarray],
     n_permutations: int = 100,
     gamma: float = DEFAULT_GAMMA,
     C: float = DEFAULT_COUPLING,
     random_state: int | None = None,
+    engine: str = "leiden",
+    empirical: dict[str, Any] | None = None,
+    early_stopping: bool = False,
+    alpha: float = 0.05,
+    min_permutations: int = 20,
+    confidence: float = 0.99,
+    time_budget: float | None = None,
 ) -> dict[str, Any]:
-    """Compare empirical multilayer modularity to null model (shuffled IKI order)."""
-    block_ids = sorted(ikis_dict)
-    if not block_ids:
+    """
+    Compare empirical multilayer modularity to null model (shuffled IKI order).
+
+    All shuffled IKI tensors (n_permutations x n_blocks x n_ikis) and their
+    chain edge weights are generated up front; blocks of different lengths
+    are shuffled in their flat ragged layout (see `_shuffled_chain_weights`)
+    and each length group shares its graphs. Pass the result of
+    `run_multilayer_community_detection` as `empirical` to reuse it instead of
+    re-running the empirical detection.
+
+    With `early_stopping`, permutations stop once (after at least
+    `min_permutations`) a Clopper-Pearson interval at `confidence` for the
+    exceedance probability lies entirely below or above `alpha`.
+
+    `time_budget` (seconds) stops starting new permutations once exceeded;
+    at least one permutation is always run and `stopped_by_budget` reports
+    whether the budget cut the test short.
+    """
+    ikis = RaggedIKIs.from_dict(ikis_dict)
+    if not len(ikis):
         raise ValueError("No IKIs available for validation.")
 
-    empirical_graphs = [build_trial_network(ikis_dict[b]) for b in block_ids]
-    empirical = run_multilayer_community_detection(
-        empirical_graphs,
-        gamma=gamma,
-        C=C,
-        n_iter=20,
-        random_state=random_state,
-    )
+    iki_matrix = ikis.dense() if ikis.is_uniform else ikis
+    if empirical is None:
+        empirical = _detect_from_weights(
+            compute_chain_weights(iki_matrix),
+            gamma=gamma,
+            C=C,
+            n_iter=20,
+            random_state=random_state,
+            engine=engine,
+        )
     empirical_q = float(empirical["best_quality"])
 
     rng = np.random.default_rng(random_state)
+    null_weights = _shuffled_chain_weights(iki_matrix, n_permutations, rng)
+    null_seeds = rng.integers(0, 2**31 - 1, size=n_permutations)
+
     null_scores: list[float] = []
-    for _ in range(n_permutations):
-        shuffled_graphs = []
-        for b in block_ids:
-            shuffled = rng.permutation(ikis_dict[b])
-            shuffled_graphs.append(build_trial_network(shuffled))
-        null_result = run_multilayer_community_detection(
-            shuffled_graphs,
+    n_exceed = 0
+    n_null_restarts = 0
+    # One graph list serves every permutation; only the edge weights change.
+    null_graphs: list[ig.Graph] | None = None
+    start_time = time.perf_counter()
+    stopped_by_budget = False
+    for weights, seed in zip(null_weights, null_seeds):
+        if time_budget is not None and null_scores and time.perf_counter() - start_time >= time_budget:
+            stopped_by_budget = True
+            break
+        if engine != "chain_dp":
+            null_graphs = _chain_graphs(weights, null_graphs)
+        null_result = _detect_from_weights(
+            weights,
             gamma=gamma,
             C=C,
             n_iter=1,
-            random_state=int(rng.integers(0, 2**31 - 1)),
+            random_state=int(seed),
+            engine=engine,
+            graphs=null_graphs,
         )
         null_scores.append(float(null_result["best_quality"]))
+        n_null_restarts += int(null_result["n_restarts"])
+        n_exceed += null_scores[-1] >= empirical_q
+        if (
+            early_stopping
+            and len(null_scores) >= min_permutations
+            and _permutation_test_decided(n_exceed, len(null_scores), alpha, confidence)
+        ):
+            break
 
     null_array = np.asarray(null_scores, dtype=float)
     p_permutation = float((np.sum(null_array >= empirical_q) + 1) / (null_array.size + 1))
+    from scipy import stats
+
     t_stat, p_two_sided = stats.ttest_1samp(null_array, popmean=empirical_q)
 
     return {
@@ -357,6 +1496,10 @@ def statistical_validation(
         "p_value_permutation": p_permutation,
         "t_statistic": float(t_stat),
         "p_value_ttest_two_sided": float(p_two_sided),
+        "n_permutations_used": int(null_array.size),
+        "stopped_early": bool(null_array.size < n_permutations),
+        "stopped_by_budget": stopped_by_budget,
+        "n_null_restarts": n_null_restarts,
     }
 
 
@@ -368,33 +1511,120 @@ def run_full_analysis(
     n_iter: int = 100,
     n_permutations: int = 100,
     random_state: int | None = None,
+    engine: str = "leiden",
+    early_stopping: bool = False,
+    alpha: float = 0.05,
+    adaptive: bool = False,
+    patience: int = 10,
+    agreement: int = 5,
+    time_budget: float | None = None,
+    dataset: str | Path | None = None,
+    data: pd.DataFrame | None = None,
+    timer: StageTimer | None = None,
+    consensus: bool = False,
+    file_budget: float | None = None,
+    expected_presses_per_block: int = EXPECTED_PRESSES_PER_BLOCK,
+    min_presses: int | None = None,
 ) -> dict[str, Any]:
-    """Run full Wymbs/Mucha chunking analysis pipeline on one participant file."""
-    df = load_srt_file(filepath)
-    ikis_dict = extract_ikis(df, sequence_type=sequence_type)
+    """
+    Run full Wymbs/Mucha chunking analysis pipeline on one participant file.
+
+    With `dataset`, the file's rows are read from the ingested Parquet
+    dataset when it holds an up-to-date copy (see `load_srt_file`). Pass the
+    already loaded rows as `data` to analyse several sequences of one file
+    without reading it again.
+
+    The multilayer detection result is reused as the empirical score of the
+    null-model validation; `early_stopping` and `alpha` are passed on to
+    `statistical_validation`, and `adaptive`, `patience`, `agreement` and
+    `time_budget` to `run_multilayer_community_detection`.
+
+    Chunk metrics use the best restart's partition, or with `consensus` the
+    `consensus_partition` of the module allegiance over all restarts; either
+    way they include the per-block allegiance and stability columns.
+
+    `file_budget` bounds the wall-clock seconds of the whole analysis:
+    restarts stop once half of it is spent (or at `time_budget`, whichever
+    comes first) and null permutations once all of it is spent, each after
+    at least one run. `budget_exhausted` in the result is True if either
+    budget cut restarts or permutations short.
+
+    Blocks are sequences of `expected_presses_per_block` presses; with
+    `min_presses` blocks whose first presses (at least that many) are
+    correct are kept too (see `extract_ikis_batch`). Their layers are shorter,
+    and the per-trial tables stay `expected_presses_per_block - 1` IKIs
+    wide, padded as described in `compute_chunk_metrics`.
+
+    Wall-clock time per stage (see `timing.STAGES`) and the number of
+    leidenalg optimisations are recorded in `timer` (a fresh `StageTimer` if
+    None) and returned flattened under `timings`.
+    """
+    timer = timer if timer is not None else StageTimer()
+    start_time = time.perf_counter()
+    with timer.stage("load"):
+        df = data if data is not None else load_srt_file(filepath, dataset=dataset, columns=ANALYSIS_COLUMNS)
+    with timer.stage("extract_ikis"):
+        ikis_dict = extract_ikis(
+            df,
+            sequence_type=sequence_type,
+            expected_presses_per_block=expected_presses_per_block,
+            min_presses=min_presses,
+        )
     if not ikis_dict:
         raise ValueError(f"No valid blocks found for sequence='{sequence_type}'.")
 
-    block_ids = sorted(ikis_dict)
-    graphs = [build_trial_network(ikis_dict[b]) for b in block_ids]
-    multilayer = run_multilayer_community_detection(
-        graphs,
-        gamma=gamma,
-        C=C,
-        n_iter=n_iter,
-        random_state=random_state,
-    )
-    partition_map = {
-        b: multilayer["best_memberships"][i] for i, b in enumerate(block_ids)
-    }
-    metrics = compute_chunk_metrics(ikis_dict, partition_map)
-    validation = statistical_validation(
-        ikis_dict,
-        n_permutations=n_permutations,
-        gamma=gamma,
-        C=C,
-        random_state=random_state,
-    )
+    block_ids = ikis_dict.block_ids.tolist()
+    with timer.stage("build_networks"):
+        # The weights feed every stage; graphs are only built for the Leiden engine.
+        weights = compute_chain_weights(ikis_dict.dense() if ikis_dict.is_uniform else ikis_dict)
+        graphs = None if engine == "chain_dp" else _chain_graphs(weights)
+    detection_budget = time_budget
+    if file_budget is not None:
+        detection_share = max(file_budget / 2 - (time.perf_counter() - start_time), 0.0)
+        detection_budget = detection_share if time_budget is None else min(time_budget, detection_share)
+    with timer.stage("community_detection"):
+        multilayer = _detect_from_weights(
+            weights,
+            gamma=gamma,
+            C=C,
+            n_iter=n_iter,
+            random_state=random_state,
+            engine=engine,
+            graphs=graphs,
+            adaptive=adaptive,
+            patience=patience,
+            agreement=agreement,
+            time_budget=detection_budget,
+        )
+    with timer.stage("chunk_metrics"):
+        if consensus:
+            labels = consensus_partition(module_allegiance(multilayer["all_memberships"]))
+        else:
+            labels = multilayer["best_memberships"]
+        lengths = ikis_dict.lengths
+        partition_map = {b: labels[i, : lengths[i]] for i, b in enumerate(block_ids)}
+        metrics = compute_chunk_metrics(
+            ikis_dict,
+            partition_map,
+            all_memberships=multilayer["all_memberships"],
+            width=expected_presses_per_block - 1,
+        )
+    null_budget = None if file_budget is None else max(file_budget - (time.perf_counter() - start_time), 0.0)
+    with timer.stage("null_model"):
+        validation = statistical_validation(
+            ikis_dict,
+            n_permutations=n_permutations,
+            gamma=gamma,
+            C=C,
+            random_state=random_state,
+            engine=engine,
+            empirical=multilayer,
+            early_stopping=early_stopping,
+            alpha=alpha,
+            time_budget=null_budget,
+        )
+    leiden_calls = multilayer["n_restarts"] + validation["n_null_restarts"] if engine == "leiden" else 0
+    timer.count("leiden_calls", leiden_calls)
 
     return {
         "filepath": str(filepath),
@@ -406,200 +1636,2295 @@ def run_full_analysis(
             "coupling": C,
             "n_iter": n_iter,
             "n_permutations": n_permutations,
+            "engine": engine,
+            "early_stopping": early_stopping,
+            "alpha": alpha,
+            "adaptive": adaptive,
+            "patience": patience,
+            "agreement": agreement,
+            "time_budget": time_budget,
+            "consensus": consensus,
+            "file_budget": file_budget,
+            "expected_presses_per_block": expected_presses_per_block,
+            "min_presses": min_presses,
         },
         "ikis": ikis_dict,
         "multilayer_result": multilayer,
         "partition_map": partition_map,
         "metrics": metrics,
         "validation": validation,
+        "budget_exhausted": multilayer["stop_reason"] == "time_budget" or validation["stopped_by_budget"],
+        "timings": timer.as_row(),
     }
 
 
-def run_batch_analysis(
-    input_dir: str | Path = "SRT",
-    output_dir: str | Path = "outputs",
-    pattern: str = "*.csv",
-    sequence_type: str = "blue",
-    gamma: float = DEFAULT_GAMMA,
-    C: float = DEFAULT_COUPLING,
-    n_iter: int = 20,
-    n_permutations: int = 20,
+def order_sessions(filepaths: Iterable[str | Path]) -> list[Path]:
+    """
+    Sort one participant's session files by recording date, then session number.
+
+    Files whose date does not parse (e.g. a mistyped `202040628`) are placed
+    by session number, see `_order_sessions`. Raises ValueError if the file
+    names do not parse (see `parse_srt_filename`), belong to more than one
+    participant, or an undated file cannot be placed. Dates that parse but
+    disagree with the session numbers are not corrected; `_order_sessions`
+    reports them.
+    """
+    ordered, _, unplaced, _ = _order_sessions(filepaths)
+    if unplaced:
+        raise ValueError(f"Cannot place undated session files: {', '.join(p.name for p in unplaced)}")
+    return ordered
+
+
+def _order_sessions(
+    filepaths: Iterable[str | Path],
+) -> tuple[list[Path], list[int], list[Path], list[tuple[Path, str]]]:
+    """
+    `order_sessions`, returning the waves, unplaced files and order conflicts instead of raising.
+
+    Dated files are sorted by (date, session) and split into waves, a new
+    wave starting whenever the session number does not increase. An undated
+    file joins the latest wave that does not have its session number yet,
+    right after that wave's sessions with lower numbers. If every wave
+    already has its session number, its position is unknown and it is
+    returned as unplaced.
+
+    Returns `(ordered, waves, unplaced, conflicts)`: the placed files in
+    order, the (1-based) wave of each, the unplaced files and a
+    `(file, message)` pair for every sign that the dates and session numbers
+    disagree: a wave that does not start at session 1 (reported on its first
+    file), and a session recorded more than `SESSION_DATE_TOLERANCE_DAYS`
+    from the median date of its wave.
+    """
+    parsed = [(Path(path), parse_srt_filename(path)) for path in filepaths]
+    if not parsed:
+        raise ValueError("No session files given.")
+    unparsed = [path.name for path, info in parsed if info["participant"] is None]
+    if unparsed:
+        raise ValueError(f"Cannot parse participant and session from: {', '.join(unparsed)}")
+    participants = {info["participant"].casefold() for _, info in parsed}
+    if len(participants) > 1:
+        raise ValueError(f"Session files belong to several participants: {sorted(participants)}")
+    dated = sorted(
+        ((path, info) for path, info in parsed if info["date"] is not None),
+        key=lambda item: (item[1]["date"], item[1]["session"], item[0].name),
+    )
+    waves: list[list[tuple[Path, dict[str, Any]]]] = []
+    for path, info in dated:
+        if not waves or info["session"] <= waves[-1][-1][1]["session"]:
+            waves.append([])
+        waves[-1].append((path, info))
+    if not waves:
+        waves.append([])
+    undated = sorted(
+        ((path, info) for path, info in parsed if info["date"] is None),
+        key=lambda item: (item[1]["session"], item[0].name),
+    )
+    unplaced: list[Path] = []
+    for path, info in undated:
+        open_waves = [wave for wave in waves if all(i["session"] != info["session"] for _, i in wave)]
+        if not open_waves:
+            unplaced.append(path)
+            continue
+        wave = open_waves[-1]
+        wave.insert(sum(i["session"] < info["session"] for _, i in wave), (path, info))
+
+    conflicts: list[tuple[Path, str]] = []
+    for number, wave in enumerate(waves, start=1):
+        if wave and wave[0][1]["session"] != 1:
+            conflicts.append(
+                (
+                    wave[0][0],
+                    f"Wave {number} starts at session {wave[0][1]['session']}, not 1 (missing sessions, "
+                    "or recording dates that disagree with the session numbers).",
+                )
+            )
+        days = np.array([info["date"].toordinal() for _, info in wave if info["date"] is not None])
+        if days.size < 2:
+            continue
+        median = float(np.median(days))
+        for path, info in wave:
+            if info["date"] is not None and abs(info["date"].toordinal() - median) > SESSION_DATE_TOLERANCE_DAYS:
+                offset = int(round(info["date"].toordinal() - median))
+                conflicts.append(
+                    (path, f"Recorded {offset:+d} days from the median date of wave {number}; mistyped date?")
+                )
+    ordered = [path for wave in waves for path, _ in wave]
+    wave_numbers = [number for number, wave in enumerate(waves, start=1) for _ in wave]
+    return ordered, wave_numbers, unplaced, conflicts
+
+
+def group_participant_files(files: Iterable[str | Path]) -> tuple[dict[str, list[Path]], list[Path]]:
+    """
+    Group SRT files by the participant in their file name.
+
+    Returns `(groups, unmatched)`: each participant's files in session order
+    (see `order_sessions`; undated files that cannot be placed come last),
+    keyed and sorted by participant, and the files whose name does not
+    parse. Participants are matched case-insensitively; a group is keyed by
+    the spelling of its first file.
+    """
+    groups: dict[str, list[Path]] = {}
+    keys: dict[str, str] = {}
+    unmatched: list[Path] = []
+    for path in sorted(Path(f) for f in files):
+        participant = parse_srt_filename(path)["participant"]
+        if participant is None:
+            unmatched.append(path)
+            continue
+        key = keys.setdefault(participant.casefold(), participant)
+        groups.setdefault(key, []).append(path)
+    ordered = {}
+    for key in sorted(groups):
+        files_in_order, _, unplaced, _ = _order_sessions(groups[key])
+        ordered[key] = files_in_order + unplaced
+    return ordered, unmatched
+
+
+def _session_couplings(session_sizes: list[int], C: float, session_coupling: float | None) -> np.ndarray:
+    """Per-pair couplings of stacked sessions: `C` within a session, `session_coupling` across a boundary."""
+    couplings = np.full(max(sum(session_sizes) - 1, 0), float(C))
+    if session_coupling is not None:
+        boundaries = np.cumsum(session_sizes)[:-1]
+        couplings[boundaries - 1] = float(session_coupling)
+    return couplings
+
+
+def run_participant_analysis(
+    filepaths: Iterable[str | Path],
+    sequence_type: str = "blue",
+    gamma: float = DEFAULT_GAMMA,
+    C: float = DEFAULT_COUPLING,
+    session_coupling: float | None = None,
+    n_iter: int = 100,
+    random_state: int | None = None,
+    engine: str = "chain_dp",
+    adaptive: bool = False,
+    patience: int = 10,
+    agreement: int = 5,
+    time_budget: float | None = None,
+    dataset: str | Path | None = None,
+    data: dict[str, pd.DataFrame] | None = None,
+    timer: StageTimer | None = None,
+    consensus: bool = False,
+    expected_presses_per_block: int = EXPECTED_PRESSES_PER_BLOCK,
+    min_presses: int | None = None,
+) -> dict[str, Any]:
+    """
+    Run one multilayer detection over all session files of a participant.
+
+    The sessions are ordered by date and session number (`order_sessions`)
+    and their blocks stacked into one temporal network, session after
+    session, so chunk labels are comparable across days. Consecutive blocks
+    are coupled with `C`; the last block of a session and the first block of
+    the next are coupled with `session_coupling` instead when given (e.g. a
+    weaker link across the days between sessions). Sessions without valid
+    blocks for `sequence_type` are skipped and listed in `skipped_sessions`;
+    undated files that cannot be placed in the order are left out and listed
+    in `unplaced_sessions`. `session_order` lists the placed files in the
+    order used, with the wave of each (see `_order_sessions`); order
+    conflicts between dates and session numbers are listed in
+    `session_conflicts` and raised as warnings, but do not change the order.
+
+    Pass already loaded rows as `data` (file path string -> DataFrame) to
+    analyse several sequences without reading the files again. The per-trial
+    `metrics` carry `source_file`, `session` and the block number within the
+    session; `phi_normalized` is relative to the session's mean phi, as in
+    `run_full_analysis`. There is no null-model validation at this level;
+    run `run_full_analysis` per session for p-values. `expected_presses_per_block`
+    and `min_presses` select blocks as in `run_full_analysis`.
+
+    The default engine is `chain_dp`, whose cost grows linearly with the
+    number of layers (but exponentially with block length, see
+    `_chain_dp_partition`). Each of Leiden's temporal layer graphs spans the nodes
+    of all layers, so a Leiden restart grows quadratically and takes a
+    few minutes for seven sessions (see `benchmarks/bench_layer_scaling.py`).
+    """
+    timer = timer if timer is not None else StageTimer()
+    files, waves, unplaced, conflicts = _order_sessions(filepaths)
+    participant = parse_srt_filename(files[0] if files else unplaced[0])["participant"]
+    for path, message in conflicts:
+        warnings.warn(f"Session order of {participant}: {path.name}: {message}", stacklevel=2)
+
+    sessions: list[dict[str, Any]] = []
+    skipped: list[str] = []
+    stacked: list[RaggedIKIs] = []
+    for path, wave in zip(files, waves):
+        with timer.stage("load"):
+            if data is not None and str(path) in data:
+                df = data[str(path)]
+            else:
+                df = load_srt_file(path, dataset=dataset, columns=ANALYSIS_COLUMNS)
+        with timer.stage("extract_ikis"):
+            ikis_dict = extract_ikis(
+                df,
+                sequence_type=sequence_type,
+                expected_presses_per_block=expected_presses_per_block,
+                min_presses=min_presses,
+            )
+        if not ikis_dict:
+            skipped.append(str(path))
+            continue
+        info = parse_srt_filename(path)
+        block_ids = ikis_dict.block_ids.tolist()
+        sessions.append(
+            {
+                "source_file": str(path),
+                "session": info["session"],
+                "date": info["date"],
+                "wave": wave,
+                "block_ids": block_ids,
+                "first_layer": sum(len(s["block_ids"]) for s in sessions),
+            }
+        )
+        stacked.append(ikis_dict)
+    if not sessions:
+        raise ValueError(f"No valid blocks found for sequence='{sequence_type}' in any session of {participant}.")
+
+    session_sizes = [len(s["block_ids"]) for s in sessions]
+    couplings = _session_couplings(session_sizes, C, session_coupling)
+    with timer.stage("build_networks"):
+        layers = RaggedArray.concat(stacked)
+        layer_ikis = RaggedIKIs.from_ragged(layers, np.arange(len(layers)))
+        weights = compute_chain_weights(layers.dense() if layers.is_uniform else layers)
+    with timer.stage("community_detection"):
+        multilayer = _detect_from_weights(
+            weights,
+            gamma=gamma,
+            C=couplings,
+            n_iter=n_iter,
+            random_state=random_state,
+            engine=engine,
+            adaptive=adaptive,
+            patience=patience,
+            agreement=agreement,
+            time_budget=time_budget,
+        )
+    with timer.stage("chunk_metrics"):
+        if consensus:
+            labels = consensus_partition(module_allegiance(multilayer["all_memberships"]))
+        else:
+            labels = multilayer["best_memberships"]
+        metrics = compute_chunk_metrics(
+            layer_ikis, labels, all_memberships=multilayer["all_memberships"], width=expected_presses_per_block - 1
+        )
+        layer_session = np.repeat(np.arange(len(sessions)), session_sizes)
+        metrics["block_number"] = [b for s in sessions for b in s["block_ids"]]
+        metrics["phi_normalized"] = np.concatenate(
+            [_normalize_phi(metrics["phi"].to_numpy()[layer_session == i]) for i in range(len(sessions))]
+        )
+        metrics.insert(0, "session", [s["session"] for s in sessions for _ in s["block_ids"]])
+        metrics.insert(0, "source_file", [s["source_file"] for s in sessions for _ in s["block_ids"]])
+    if engine == "leiden":
+        timer.count("leiden_calls", multilayer["n_restarts"])
+
+    return {
+        "participant": participant,
+        "sequence_type": sequence_type,
+        "sessions": sessions,
+        "skipped_sessions": skipped,
+        "unplaced_sessions": [str(path) for path in unplaced],
+        "session_order": [{"source_file": str(path), "wave": wave} for path, wave in zip(files, waves)],
+        "session_conflicts": [{"source_file": str(path), "conflict": message} for path, message in conflicts],
+        "n_layers": len(layers),
+        "layer_couplings": couplings,
+        "parameters": {
+            "gamma": gamma,
+            "coupling": C,
+            "session_coupling": session_coupling,
+            "n_iter": n_iter,
+            "engine": engine,
+            "adaptive": adaptive,
+            "patience": patience,
+            "agreement": agreement,
+            "time_budget": time_budget,
+            "consensus": consensus,
+            "expected_presses_per_block": expected_presses_per_block,
+            "min_presses": min_presses,
+        },
+        "multilayer_result": multilayer,
+        "labels": labels,
+        "metrics": metrics,
+        "timings": timer.as_row(),
+    }
+
+
+def _sweep_order(n_gammas: int, n_couplings: int) -> list[tuple[int, int]]:
+    """Serpentine walk over the grid so consecutive points are always neighbours."""
+    order = []
+    for gi in range(n_gammas):
+        cis = range(n_couplings) if gi % 2 == 0 else range(n_couplings - 1, -1, -1)
+        order.extend((gi, ci) for ci in cis)
+    return order
+
+
+def run_parameter_sweep(
+    filepath: str | Path,
+    gammas: Iterable[float],
+    couplings: Iterable[float],
+    sequence_type: str = "blue",
+    n_iter: int = 20,
+    random_state: int | None = None,
+    engine: str = "leiden",
+    warm_start: bool = True,
+    adaptive: bool = False,
+    patience: int = 10,
+    agreement: int = 5,
+    dataset: str | Path | None = None,
+    data: pd.DataFrame | None = None,
+    expected_presses_per_block: int = EXPECTED_PRESSES_PER_BLOCK,
+    min_presses: int | None = None,
+) -> pd.DataFrame:
+    """
+    Evaluate multilayer chunking on one file for every (gamma, coupling) pair.
+
+    Loading, `extract_ikis` and the trial networks are done once per file;
+    `chain_dp` also reuses its segmentation tables across the grid. The grid
+    is walked in serpentine order and, with `warm_start`, the first Leiden
+    restart of each point starts from the best partition of the previous
+    (neighbouring) point. `expected_presses_per_block` and `min_presses`
+    select blocks as in `run_full_analysis`; the other options are passed on
+    to `run_multilayer_community_detection`.
+
+    Returns one row per grid point, in (gamma, coupling) order, with the
+    multilayer quality and the per-trial chunk metrics of the best partition.
+    """
+    gammas = [float(g) for g in gammas]
+    couplings = [float(c) for c in couplings]
+    if not gammas or not couplings:
+        raise ValueError("The sweep needs at least one gamma and one coupling value.")
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {ENGINES}.")
+
+    df = data if data is not None else load_srt_file(filepath, dataset=dataset, columns=ANALYSIS_COLUMNS)
+    ikis_dict = extract_ikis(
+        df,
+        sequence_type=sequence_type,
+        expected_presses_per_block=expected_presses_per_block,
+        min_presses=min_presses,
+    )
+    if not ikis_dict:
+        raise ValueError(f"No valid blocks found for sequence='{sequence_type}'.")
+    block_ids = ikis_dict.block_ids.tolist()
+    lengths = ikis_dict.lengths
+    weights = compute_chain_weights(ikis_dict.dense() if ikis_dict.is_uniform else ikis_dict)
+    if engine == "chain_dp":
+        layer_terms = _chain_layer_terms(weights)
+    else:
+        graphs = _chain_graphs(weights)
+
+    rng = np.random.default_rng(random_state)
+    rows: dict[tuple[int, int], dict[str, Any]] = {}
+    previous: np.ndarray | None = None
+    for gi, ci in _sweep_order(len(gammas), len(couplings)):
+        gamma, C = gammas[gi], couplings[ci]
+        start = time.perf_counter()
+        if engine == "chain_dp":
+            multilayer = _chain_dp_result(weights, gamma=gamma, C=C, layer_terms=layer_terms)
+        else:
+            multilayer = run_multilayer_community_detection(
+                graphs,
+                gamma=gamma,
+                C=C,
+                n_iter=n_iter,
+                random_state=int(rng.integers(0, 2**31 - 1)),
+                engine=engine,
+                adaptive=adaptive,
+                patience=patience,
+                agreement=agreement,
+                initial_memberships=previous if warm_start else None,
+            )
+        partition_map = {b: multilayer["best_memberships"][i, : lengths[i]] for i, b in enumerate(block_ids)}
+        metrics = compute_chunk_metrics(ikis_dict, partition_map)
+        rows[(gi, ci)] = {
+            "source_file": str(filepath),
+            "sequence_type": sequence_type,
+            "gamma": gamma,
+            "coupling": C,
+            "n_blocks": len(block_ids),
+            "best_quality": multilayer["best_quality"],
+            "mean_quality": multilayer["mean_quality"],
+            "std_quality": multilayer["std_quality"],
+            "n_restarts": multilayer["n_restarts"],
+            "warm_started": engine != "chain_dp" and warm_start and previous is not None,
+            "mean_q_single_trial": float(metrics["q_single_trial"].mean()),
+            "mean_phi": float(metrics["phi"].replace([np.inf, -np.inf], np.nan).mean()),
+            "mean_phi_normalized": float(metrics["phi_normalized"].mean()),
+            "mean_n_chunks": float(metrics["n_chunks"].mean()),
+            "seconds": time.perf_counter() - start,
+        }
+        previous = multilayer["best_memberships"]
+    return pd.DataFrame([rows[k] for k in sorted(rows)])
+
+
+def _summary_row(result: dict[str, Any], metrics: pd.DataFrame, file_path: Path) -> dict[str, Any]:
+    """Condense one `run_full_analysis` result into a summary CSV row."""
+    return {
+        "source_file": str(file_path),
+        "sequence_type": result["sequence_type"],
+        "n_blocks": int(result["n_blocks"]),
+        "mean_q_single_trial": float(metrics["q_single_trial"].mean()),
+        "mean_phi": float(metrics["phi"].replace([np.inf, -np.inf], np.nan).mean()),
+        "mean_phi_normalized": float(metrics["phi_normalized"].mean()),
+        "mean_n_chunks": float(metrics["n_chunks"].mean()),
+        "mean_allegiance_confidence": float(metrics["allegiance_confidence"].mean()),
+        "mean_consensus_stability": float(metrics["consensus_stability"].mean()),
+        "n_restarts": int(result["multilayer_result"]["n_restarts"]),
+        "empirical_q_multitrial": float(result["validation"]["empirical_q_multitrial"]),
+        "null_q_multitrial_mean": float(result["validation"]["null_q_multitrial_mean"]),
+        "p_value_permutation": float(result["validation"]["p_value_permutation"]),
+        "n_permutations_used": int(result["validation"]["n_permutations_used"]),
+        "budget_exhausted": bool(result["budget_exhausted"]),
+        **result.get("timings", {}),
+    }
+
+
+def _failed_outcome(task: dict[str, Any], error: str) -> dict[str, Any]:
+    return {
+        "index": task["index"],
+        "file_path": str(task["file_path"]),
+        "results": [
+            {"sequence_type": seq, "status": "failed", "error": error} for seq in task["sequence_types"]
+        ],
+    }
+
+
+def _read_task_rows(task: dict[str, Any]) -> pd.DataFrame:
+    return load_srt_file(Path(task["file_path"]), dataset=task["dataset_dir"], columns=ANALYSIS_COLUMNS)
+
+
+def _task_rows(task: dict[str, Any], timer: StageTimer | None = None) -> pd.DataFrame:
+    """
+    The rows of a task's file, read now or taken from the prefetch reader.
+
+    Prefetched tasks carry `data` (or the reader's `load_error`) and the
+    `load_seconds` the read took in the background, which is booked on
+    `timer` as load time.
+    """
+    if "load_seconds" not in task:
+        if timer is None:
+            return _read_task_rows(task)
+        with timer.stage("load"):
+            return _read_task_rows(task)
+    if timer is not None:
+        timer.add("load", task["load_seconds"])
+    if task["load_error"] is not None:
+        raise task["load_error"]
+    return task["data"]
+
+
+def _analyze_file_task(task: dict[str, Any]) -> dict[str, Any]:
+    """
+    Analyse one batch file for every requested sequence type.
+
+    The file is loaded once (or comes prefetched, see `_task_rows`) and each
+    sequence is analysed from the same rows.
+    With `profile_dir` set, the whole task runs under cProfile and the stats
+    are written to `<profile_dir>/<index>.prof`. Runs in worker processes,
+    so every exception is converted into a failed per-sequence result
+    instead of propagating.
+    """
+    if task.get("profile_dir"):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return _analyze_file_task(dict(task, profile_dir=None))
+        finally:
+            profiler.disable()
+            profiler.dump_stats(Path(task["profile_dir"]) / f"{task['index']:06d}.prof")
+
+    file_path = Path(task["file_path"])
+    load_timer = StageTimer()
+    try:
+        df = _task_rows(task, load_timer)
+    except Exception as exc:  # pragma: no cover - robust batch execution
+        return _failed_outcome(task, str(exc))
+
+    results: list[dict[str, Any]] = []
+    for seq_index, seq in enumerate(task["sequence_types"]):
+        # The file is read once; its load time is booked on the first sequence.
+        timer = load_timer if seq_index == 0 else StageTimer()
+        try:
+            result = run_full_analysis(file_path, sequence_type=seq, data=df, timer=timer, **task["analysis"])
+            metrics = result["metrics"].copy()
+            metrics["source_file"] = str(file_path)
+            metrics["sequence_type"] = seq
+            results.append(
+                {
+                    "sequence_type": seq,
+                    "status": "ok",
+                    "summary": _summary_row(result, metrics, file_path),
+                    "metrics": metrics,
+                }
+            )
+        except Exception as exc:  # pragma: no cover - robust batch execution
+            results.append({"sequence_type": seq, "status": "failed", "error": str(exc)})
+    return {"index": task["index"], "file_path": str(file_path), "results": results}
+
+
+def _sweep_file_task(task: dict[str, Any]) -> dict[str, Any]:
+    """Sweep one batch file for every requested sequence type (see `_analyze_file_task`)."""
+    file_path = Path(task["file_path"])
+    try:
+        df = _task_rows(task)
+    except Exception as exc:  # pragma: no cover - robust batch execution
+        return _failed_outcome(task, str(exc))
+
+    results: list[dict[str, Any]] = []
+    for seq in task["sequence_types"]:
+        try:
+            table = run_parameter_sweep(file_path, sequence_type=seq, data=df, **task["analysis"])
+            results.append({"sequence_type": seq, "status": "ok", "table": table})
+        except Exception as exc:  # pragma: no cover - robust batch execution
+            results.append({"sequence_type": seq, "status": "failed", "error": str(exc)})
+    return {"index": task["index"], "file_path": str(file_path), "results": results}
+
+
+def _participant_summary_rows(result: dict[str, Any]) -> list[dict[str, Any]]:
+    """
+    One summary row per session of a `run_participant_analysis` result.
+
+    `label_carryover` is the share of IKI positions whose chunk label in the
+    session's first block equals the label in the previous session's last
+    block (NaN for the first session), over the positions both blocks have.
+    """
+    metrics = result["metrics"]
+    label_cols = [c for c in metrics.columns if c.startswith("label_")]
+    labels = metrics[label_cols].to_numpy()
+    multilayer = result["multilayer_result"]
+    rows = []
+    for i, session in enumerate(result["sessions"]):
+        first = session["first_layer"]
+        rows_of_session = metrics.iloc[first : first + len(session["block_ids"])]
+        if i > 0:
+            common = (labels[first] >= 0) & (labels[first - 1] >= 0)
+            carryover = float((labels[first] == labels[first - 1])[common].mean())
+        else:
+            carryover = np.nan
+        rows.append(
+            {
+                "participant": result["participant"],
+                "source_file": session["source_file"],
+                "session": session["session"],
+                "date": None if session["date"] is None else session["date"].isoformat(),
+                "wave": session["wave"],
+                "sequence_type": result["sequence_type"],
+                "n_blocks": len(session["block_ids"]),
+                "mean_q_single_trial": float(rows_of_session["q_single_trial"].mean()),
+                "mean_phi": float(rows_of_session["phi"].replace([np.inf, -np.inf], np.nan).mean()),
+                "mean_phi_normalized": float(rows_of_session["phi_normalized"].mean()),
+                "mean_n_chunks": float(rows_of_session["n_chunks"].mean()),
+                "mean_allegiance_confidence": float(rows_of_session["allegiance_confidence"].mean()),
+                "mean_consensus_stability": float(rows_of_session["consensus_stability"].mean()),
+                "label_carryover": carryover,
+                "n_sessions": len(result["sessions"]),
+                "n_layers": result["n_layers"],
+                "n_restarts": int(multilayer["n_restarts"]),
+                "best_quality": float(multilayer["best_quality"]),
+                "stop_reason": multilayer["stop_reason"],
+            }
+        )
+    return rows
+
+
+def _analyze_participant_task(task: dict[str, Any]) -> dict[str, Any]:
+    """
+    Analyse all sessions of one participant for every requested sequence type.
+
+    Each session file is read once and shared by all sequences. The task's
+    `file_path` is the participant (used in progress and error messages)
+    and `file_paths` its session files. Exceptions become failed results,
+    as in `_analyze_file_task`.
+    """
+    data: dict[str, pd.DataFrame] = {}
+    load_timer = StageTimer()
+    try:
+        with load_timer.stage("load"):
+            for path in task["file_paths"]:
+                data[path] = load_srt_file(Path(path), dataset=task["dataset_dir"], columns=ANALYSIS_COLUMNS)
+    except Exception as exc:  # pragma: no cover - robust batch execution
+        return _failed_outcome(task, str(exc))
+
+    results: list[dict[str, Any]] = []
+    for seq_index, seq in enumerate(task["sequence_types"]):
+        timer = load_timer if seq_index == 0 else StageTimer()
+        try:
+            result = run_participant_analysis(
+                task["file_paths"], sequence_type=seq, data=data, timer=timer, **task["analysis"]
+            )
+            metrics = result["metrics"]
+            metrics.insert(0, "sequence_type", seq)
+            metrics.insert(0, "participant", result["participant"])
+            results.append(
+                {
+                    "sequence_type": seq,
+                    "status": "ok",
+                    "summary_rows": _participant_summary_rows(result),
+                    "metrics": metrics,
+                    "skipped_sessions": result["skipped_sessions"],
+                    "unplaced_sessions": result["unplaced_sessions"],
+                    "timings": result["timings"],
+                }
+            )
+        except Exception as exc:  # pragma: no cover - robust batch execution
+            results.append({"sequence_type": seq, "status": "failed", "error": str(exc)})
+    return {"index": task["index"], "file_path": task["file_path"], "results": results}
+
+
+def _run_isolated(task: dict[str, Any], worker: Any = _analyze_file_task) -> dict[str, Any]:
+    """Re-run one task in a dedicated process so a crash is attributed to its file."""
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        try:
+            return executor.submit(worker, task).result()
+        except BrokenProcessPool:
+            return _failed_outcome(task, "Worker process crashed while analysing this file.")
+
+
+def _iter_task_outcomes(
+    tasks: Iterable[dict[str, Any]],
+    n_jobs: int,
+    worker: Any = _analyze_file_task,
+    prefetch: int = 0,
+    io_stats: dict[str, Any] | None = None,
+    timeout: float | None = None,
+    watchdog_stats: dict[str, Any] | None = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Yield per-file outcomes of `worker` in completion order.
+
+    With `n_jobs == 1` files are analysed in-process; with `prefetch > 0` a
+    reader thread parses up to `prefetch` files ahead while the current one
+    is analysed, and its `PrefetchReader.stats()` are stored in `io_stats`.
+    Otherwise at most `n_jobs` files are in flight in a process pool (whose
+    workers read their own files); if a worker dies, the files that were in
+    flight are re-run one by one in isolation and the pool is restarted for
+    the remaining files.
+
+    With `timeout`, files run in `n_jobs` watchdog workers (see
+    `_iter_watched_outcomes`) instead, in serial runs too.
+    """
+    if timeout is not None:
+        yield from _iter_watched_outcomes(tasks, n_jobs, worker, prefetch, io_stats, timeout, watchdog_stats)
+        return
+    if n_jobs == 1 and prefetch > 0:
+        reader = PrefetchReader(tasks, _read_task_rows, depth=prefetch)
+        for loaded in reader:
+            yield worker(
+                dict(loaded.item, data=loaded.value, load_error=loaded.error, load_seconds=loaded.seconds)
+            )
+        if io_stats is not None:
+            io_stats.update(reader.stats())
+        return
+    if n_jobs == 1:
+        for task in tasks:
+            yield worker(task)
+        return
+
+    pending = deque(tasks)
+    while pending:
+        suspects: list[dict[str, Any]] = []
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            in_flight: dict[Any, dict[str, Any]] = {}
+            while pending or in_flight:
+                while pending and len(in_flight) < n_jobs:
+                    task = pending.popleft()
+                    in_flight[executor.submit(worker, task)] = task
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = in_flight.pop(future)
+                    try:
+                        yield future.result()
+                    except BrokenProcessPool:
+                        suspects.append(task)
+                if suspects:
+                    suspects.extend(in_flight.values())
+                    in_flight.clear()
+                    break
+        for task in suspects:
+            yield _run_isolated(task, worker)
+
+
+def _iter_watched_outcomes(
+    tasks: Iterable[dict[str, Any]],
+    n_jobs: int,
+    worker: Any,
+    prefetch: int,
+    io_stats: dict[str, Any] | None,
+    timeout: float,
+    watchdog_stats: dict[str, Any] | None,
+) -> Iterator[dict[str, Any]]:
+    """
+    `_iter_task_outcomes` under a `WatchdogPool`: a file still running after `timeout` seconds is killed.
+
+    Its sequences are reported as failed with the timeout as the error, as
+    are files whose worker crashed. In serial runs the prefetch reader still
+    parses files ahead, in this process. The timeout and crash counts are
+    stored in `watchdog_stats`.
+    """
+    reader = None
+    if n_jobs == 1 and prefetch > 0:
+        reader = PrefetchReader(tasks, _read_task_rows, depth=prefetch)
+        tasks = (
+            dict(loaded.item, data=loaded.value, load_error=loaded.error, load_seconds=loaded.seconds)
+            for loaded in reader
+        )
+    # The fork server imports these once and every worker (including replacements for killed ones)
+    # inherits them. The graph stack is imported lazily, so it is listed explicitly; otherwise each new
+    # worker would import it (about a second) inside its first file's budget and timeout.
+    preload = [worker.__module__] if worker.__module__ != "__main__" else []
+    preload.extend(GRAPH_STACK_MODULES)
+    pool = WatchdogPool(worker, timeout, n_workers=n_jobs, preload=preload)
+    for watched in pool.imap_unordered(tasks):
+        yield watched.value if watched.error is None else _failed_outcome(watched.item, str(watched.error))
+    if reader is not None and io_stats is not None:
+        io_stats.update(reader.stats())
+    if watchdog_stats is not None:
+        watchdog_stats.update(timeout=timeout, n_timeouts=pool.n_timeouts, n_crashes=pool.n_crashes)
+
+
+def _cached_result(cached: dict[str, Any], sequence_type: str, file_path: Path) -> dict[str, Any]:
+    """Turn a cache payload into a per-sequence result, re-pointing paths at `file_path`."""
+    metrics = cached["metrics"].copy()
+    metrics["source_file"] = str(file_path)
+    return {
+        "sequence_type": sequence_type,
+        "status": "cached",
+        "summary": dict(cached["summary"], source_file=str(file_path)),
+        "metrics": metrics,
+    }
+
+
+def _resolve_sequence_types(sequence_type: str | Iterable[str]) -> list[str]:
+    """Expand `"all"`, a comma-separated string or a list into known sequence types."""
+    if isinstance(sequence_type, str):
+        requested = [s.strip().lower() for s in sequence_type.split(",") if s.strip()]
+    else:
+        requested = [str(s).strip().lower() for s in sequence_type]
+    if "all" in requested:
+        return list(SEQUENCE_TYPES)
+    if unknown := [s for s in requested if s not in SEQUENCE_TYPES]:
+        raise ValueError(f"Unknown sequence type(s) {unknown}; expected {SEQUENCE_TYPES} or 'all'.")
+    if not requested:
+        raise ValueError("No sequence type given.")
+    return list(dict.fromkeys(requested))
+
+
+def _file_status(results: list[dict[str, Any]]) -> str:
+    statuses = {r["status"] for r in results}
+    if len(statuses) == 1:
+        return statuses.pop()
+    if statuses <= {"ok", "cached"}:
+        return "ok"
+    return "partial"
+
+
+def _keep_slowest_profiles(
+    profile_dir: Path,
+    files: list[Path],
+    computed_rows: dict[tuple[int, int], dict[str, Any]],
+    top: int,
+) -> None:
+    """Keep the cProfile dumps of the `top` slowest files, named after them, with text reports."""
+    file_seconds: dict[int, float] = {}
+    for (idx, _), row in computed_rows.items():
+        file_seconds[idx] = file_seconds.get(idx, 0.0) + float(row.get("time_total", 0.0))
+    slowest = set(sorted(file_seconds, key=file_seconds.get, reverse=True)[:top])
+    for dump in profile_dir.glob("*.prof"):
+        idx = int(dump.stem)
+        if idx not in slowest:
+            dump.unlink()
+            continue
+        target = profile_dir / f"{files[idx].stem}.prof"
+        dump.replace(target)
+        with (profile_dir / f"{files[idx].stem}.txt").open("w", encoding="utf-8") as report:
+            report.write(f"{files[idx].name}: {file_seconds[idx]:.2f}s in analysed stages\n\n")
+            pstats.Stats(str(target), stream=report).sort_stats("cumulative").print_stats(40)
+
+
+def _write_file_results(
+    file_path: Path,
+    results: list[dict[str, Any]],
+    summary_writer: TableWriters,
+    trials_writer: TableWriters,
+    errors_writer: CsvAppendWriter,
+) -> None:
+    """Append one file's per-sequence summary, trial and error rows to the output writers."""
+    succeeded = [r for r in results if r["status"] != "failed"]
+    failed = [r for r in results if r["status"] == "failed"]
+    if succeeded:
+        summary_writer.write(pd.DataFrame([r["summary"] for r in succeeded]))
+        trials_writer.write(pd.concat([r["metrics"] for r in succeeded], ignore_index=True))
+    if failed:
+        errors_writer.write(
+            pd.DataFrame(
+                [
+                    {"source_file": str(file_path), "sequence_type": r["sequence_type"], "error": r["error"]}
+                    for r in failed
+                ]
+            )
+        )
+
+
+def _parse_shard(shard: str | tuple[int, int]) -> tuple[int, int]:
+    """Parse `"i/N"` (or an `(i, N)` tuple) into a validated 1-based shard index and count."""
+    if isinstance(shard, str):
+        try:
+            index_text, count_text = shard.split("/")
+            shard = (int(index_text), int(count_text))
+        except ValueError as exc:
+            raise ValueError(f"Invalid shard {shard!r}; expected 'i/N', e.g. '2/4'.") from exc
+    index, count = shard
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard {index}/{count}; need 1 <= i <= N.")
+    return index, count
+
+
+def shard_files(files: list[Path], shard_index: int, n_shards: int) -> list[Path]:
+    """
+    Files of shard `shard_index` (1-based) out of `n_shards` balanced shards.
+
+    Files are assigned longest-processing-time first: in order of decreasing
+    file size (a proxy for block count and thus runtime; ties by name), each
+    goes to the shard with the smallest total size so far. The assignment
+    depends only on the file names and sizes, so every machine computes the
+    same split. The returned files keep their sorted order.
+    """
+    _parse_shard((shard_index, n_shards))
+    sizes = {path: path.stat().st_size for path in files}
+    loads = [0] * n_shards
+    assignment: dict[Path, int] = {}
+    for path in sorted(files, key=lambda p: (-sizes[p], p.name)):
+        target = min(range(n_shards), key=lambda k: (loads[k], k))
+        assignment[path] = target
+        loads[target] += sizes[path]
+    return [path for path in sorted(files) if assignment[path] == shard_index - 1]
+
+
+def run_batch_analysis(
+    input_dir: str | Path = "SRT",
+    output_dir: str | Path = "outputs",
+    pattern: str = "*.csv",
+    sequence_type: str | list[str] = "blue",
+    gamma: float = DEFAULT_GAMMA,
+    C: float = DEFAULT_COUPLING,
+    n_iter: int = 20,
+    n_permutations: int = 20,
+    random_state: int | None = 42,
+    limit: int | None = None,
+    n_jobs: int = 1,
+    engine: str = "leiden",
+    early_stopping: bool = False,
+    alpha: float = 0.05,
+    adaptive: bool = False,
+    patience: int = 10,
+    agreement: int = 5,
+    time_budget: float | None = None,
+    dataset_dir: str | Path | None = None,
+    use_cache: bool = True,
+    cache_dir: str | Path | None = None,
+    cache_max_bytes: int | None = None,
+    resume: bool = False,
+    profile_top: int = 0,
+    shard: str | tuple[int, int] | None = None,
+    output_format: str = "csv",
+    consensus: bool = False,
+    prefetch: int = 2,
+    results_store: str | Path | None = None,
+    master_table: str | Path | None = None,
+    file_budget: float | None = None,
+    file_timeout: float | None = None,
+    expected_presses_per_block: int = EXPECTED_PRESSES_PER_BLOCK,
+    min_presses: int | None = None,
+) -> dict[str, Any]:
+    """
+    Batch-run chunking analysis across many participant files.
+
+    `sequence_type` may be one sequence, several (list or comma-separated) or
+    `"all"`; each file is then loaded once and analysed for every requested
+    sequence, and all outputs are keyed by `sequence_type`.
+
+    Files are analysed in a process pool when `n_jobs > 1` (`n_jobs < 1` uses
+    all CPU cores). Each file gets its own seed derived from `random_state` and
+    the file name (shared by all its sequences), so results do not depend on
+    `n_jobs` or on which other sequences are analysed. In a serial run a
+    reader thread parses up to `prefetch` files ahead of the analysis (0
+    reads each file when its turn comes); `chunking_timings.json` reports
+    under `io` how much of the read time was hidden behind compute.
+
+    With `dataset_dir`, file contents are read from the Parquet dataset built
+    by `ingest_srt_folder` where it is up to date. `consensus` and
+    `file_budget` (a soft per-file wall-clock budget; summary rows flag
+    `budget_exhausted` when it cut restarts or permutations short),
+    `expected_presses_per_block` and `min_presses` are passed on to
+    `run_full_analysis`.
+
+    With `file_timeout`, files are analysed by watchdog worker processes
+    (also when `n_jobs == 1`) and a file still running after
+    `file_timeout` seconds is killed and recorded in chunking_errors.csv
+    with a timeout error instead of stalling the batch.
+
+    With `use_cache`, every successful (file, sequence) result is written to a
+    content-addressed cache (default `<output_dir>/cache`) as soon as the file
+    finishes. With `resume`, results whose cache key (CSV contents, sequence,
+    parameters, seed, algorithm version) is already present are not recomputed
+    and the progress log is appended to instead of being replaced.
+
+    Summary rows carry per-stage `time_*` columns and `n_leiden_calls`. With
+    `profile_top > 0`, computed files run under cProfile and the stats of the
+    `profile_top` slowest ones are kept in `<output_dir>/profiles` (`.prof`
+    plus a cumulative-time text report).
+
+    With `shard="i/N"` (1-based), only shard `i` of `N` runtime-balanced
+    shards of the sorted file list is analysed (see `shard_files`) and the
+    outputs go to `<output_dir>/shard_<i>_of_<N>`; the cache stays shared in
+    `<output_dir>/cache`. Combine finished shards with `merge_shard_outputs`.
+
+    Summary, trial and error rows are streamed to disk as files finish (in
+    sorted file order; results that finish early wait in a reorder buffer
+    until all earlier files are written), so the outputs are readable while
+    the run is in progress. `output_format` selects CSV (`"csv"`), Parquet
+    part-file directories (`"parquet"`, see `writers.ParquetPartWriter`) or
+    both for the summary and trial tables; errors are always CSV.
+
+    With `results_store`, the finished outputs are also added as a new run
+    to that SQLite results store (see `results_store.ResultsStore`), with
+    participant attributes from `master_table` if given.
+
+    Writes:
+      - chunking_summary.csv (one row per file and sequence)
+      - chunking_trials.csv (one row per analyzed block/trial)
+      - chunking_errors.csv (failed files/sequences with reason)
+      - chunking_timings.json (per-stage timing aggregates of computed files)
+      - chunking_params.json (run parameters)
+    """
+    input_path = Path(input_dir)
+    out_path = Path(output_dir)
+    sequence_types = _resolve_sequence_types(sequence_type)
+
+    files = sorted(p for p in input_path.glob(pattern) if is_srt_csv(p))
+    if limit is not None:
+        files = files[:limit]
+    if not files:
+        raise FileNotFoundError(f"No files found: {input_path / pattern}")
+    n_files_corpus = len(files)
+    cache_root = out_path
+    if shard is not None:
+        shard_index, n_shards = _parse_shard(shard)
+        files = shard_files(files, shard_index, n_shards)
+        out_path = out_path / f"shard_{shard_index}_of_{n_shards}"
+        if not files:
+            raise ValueError(f"Shard {shard_index}/{n_shards} has no files ({n_files_corpus} files in total).")
+    out_path.mkdir(parents=True, exist_ok=True)
+    if n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = min(n_jobs, len(files))
+
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format {output_format!r}; expected one of {OUTPUT_FORMATS}.")
+    computed_rows: dict[tuple[int, int], dict[str, Any]] = {}
+    success_count = 0
+    failed_count = 0
+    n_budget_exhausted = 0
+    progress_log_path = out_path / "chunking_progress.log"
+    cache = None
+    if use_cache:
+        cache = ResultCache(
+            cache_dir if cache_dir is not None else cache_root / "cache",
+            algorithm_version=ALGORITHM_VERSION,
+            max_bytes=cache_max_bytes,
+        )
+    profile_dir = out_path / "profiles"
+    if profile_top > 0:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+        profile_dir.mkdir(parents=True)
+    total_files = len(files)
+    start_time = time.time()
+    progress_log = LogWriter(progress_log_path, append=resume)
+
+    def log_progress(message: str) -> None:
+        progress_log.write(message)
+        print(message)
+
+    log_progress(
+        "Batch start "
+        f"(files={total_files}, sequence={','.join(sequence_types)}, gamma={gamma}, "
+        f"coupling={C}, n_iter={n_iter}, n_permutations={n_permutations}, engine={engine}, "
+        f"early_stopping={early_stopping}, adaptive={adaptive}, "
+        f"n_jobs={n_jobs}, resume={resume})"
+    )
+
+    tasks: list[dict[str, Any]] = []
+    cached_outcomes: list[dict[str, Any]] = []
+    cached_partial: dict[int, list[dict[str, Any]]] = {}
+    cache_keys: dict[tuple[int, str], str] = {}
+    for idx, file_path in enumerate(files):
+        analysis = {
+            "gamma": gamma,
+            "C": C,
+            "n_iter": n_iter,
+            "n_permutations": n_permutations,
+            "random_state": _file_seed(random_state, file_path),
+            "engine": engine,
+            "early_stopping": early_stopping,
+            "alpha": alpha,
+            "adaptive": adaptive,
+            "patience": patience,
+            "agreement": agreement,
+            "time_budget": time_budget,
+            "consensus": consensus,
+            "file_budget": file_budget,
+            "expected_presses_per_block": expected_presses_per_block,
+            "min_presses": min_presses,
+        }
+        pending_sequences = sequence_types
+        if cache is not None:
+            content_hash = file_content_hash(file_path)
+            cached_results = []
+            pending_sequences = []
+            for seq in sequence_types:
+                key = cache.make_key(content_hash, dict(analysis, sequence_type=seq))
+                cache_keys[(idx, seq)] = key
+                cached = cache.get(key) if resume else None
+                if cached is None:
+                    pending_sequences.append(seq)
+                else:
+                    cached_results.append(_cached_result(cached, seq, file_path))
+            if not pending_sequences:
+                cached_outcomes.append(
+                    {"index": idx, "file_path": str(file_path), "results": cached_results}
+                )
+                continue
+            cached_partial[idx] = cached_results
+        tasks.append(
+            {
+                "index": idx,
+                "file_path": str(file_path),
+                "sequence_types": pending_sequences,
+                "dataset_dir": None if dataset_dir is None else str(dataset_dir),
+                "profile_dir": str(profile_dir) if profile_top > 0 else None,
+                "analysis": analysis,
+            }
+        )
+
+    summary_path = out_path / "chunking_summary.csv"
+    trials_path = out_path / "chunking_trials.csv"
+    errors_path = out_path / "chunking_errors.csv"
+    timings_path = out_path / "chunking_timings.json"
+    params_path = out_path / "chunking_params.json"
+    summary_parquet_path = out_path / "chunking_summary.parquet"
+    trials_parquet_path = out_path / "chunking_trials.parquet"
+    write_csv = output_format in ("csv", "both")
+    write_parquet = output_format in ("parquet", "both")
+    summary_writer = TableWriters(
+        summary_path if write_csv else None, summary_parquet_path if write_parquet else None
+    )
+    trials_writer = TableWriters(
+        trials_path if write_csv else None, trials_parquet_path if write_parquet else None
+    )
+    errors_writer = CsvAppendWriter(errors_path)
+    # Outputs follow the sorted file (then sequence) order regardless of completion order.
+    reorder = ReorderBuffer()
+
+    io_stats: dict[str, Any] = {}
+    watchdog_stats: dict[str, Any] = {}
+    outcomes = chain(
+        cached_outcomes,
+        _iter_task_outcomes(
+            tasks,
+            n_jobs,
+            prefetch=prefetch,
+            io_stats=io_stats,
+            timeout=file_timeout,
+            watchdog_stats=watchdog_stats,
+        ),
+    )
+    try:
+        for processed, outcome in enumerate(outcomes, start=1):
+            idx = outcome["index"]
+            file_path = files[idx]
+            results = cached_partial.pop(idx, []) + outcome["results"]
+            results.sort(key=lambda r: sequence_types.index(r["sequence_type"]))
+            for res in results:
+                seq = res["sequence_type"]
+                if res["status"] == "ok":
+                    computed_rows[(idx, sequence_types.index(seq))] = res["summary"]
+                    if cache is not None:
+                        cache.put(
+                            cache_keys[(idx, seq)], {"summary": res["summary"], "metrics": res["metrics"]}
+                        )
+            for ready_path, ready_results in reorder.push(idx, (file_path, results)):
+                _write_file_results(ready_path, ready_results, summary_writer, trials_writer, errors_writer)
+            success_count += sum(r["status"] != "failed" for r in results)
+            failed_count += sum(r["status"] == "failed" for r in results)
+            n_budget_exhausted += sum(
+                bool(r["summary"].get("budget_exhausted", False)) for r in results if r["status"] != "failed"
+            )
+            status = _file_status(results)
+
+            elapsed = time.time() - start_time
+            # Fully cached files cost no time, so the rate only counts computed files.
+            computed = processed - min(processed, len(cached_outcomes))
+            files_per_sec = computed / elapsed if elapsed > 0 else 0.0
+            eta_remaining = (
+                (total_files - processed) / files_per_sec if files_per_sec > 0 else float("inf")
+            )
+            if processed == total_files:
+                eta_remaining = 0.0
+            eta_total = elapsed + eta_remaining
+
+            msg = (
+                f"[{processed}/{total_files}] {status} file='{file_path.name}' "
+                f"success={success_count} failed={failed_count} "
+                f"elapsed={_format_seconds(elapsed)} "
+                f"eta_remaining={_format_seconds(eta_remaining) if np.isfinite(eta_remaining) else 'N/A'} "
+                f"eta_total={_format_seconds(eta_total) if np.isfinite(eta_total) else 'N/A'}"
+            )
+            if len(sequence_types) > 1:
+                msg += " sequences=" + ",".join(f"{r['sequence_type']}:{r['status']}" for r in results)
+            errors = [
+                f"{r['sequence_type']}: {r['error']}" if len(sequence_types) > 1 else r["error"]
+                for r in results
+                if r["status"] == "failed"
+            ]
+            if errors:
+                msg += f" error='{'; '.join(errors)}'"
+            log_progress(msg)
+    finally:
+        summary_writer.close()
+        trials_writer.close()
+        errors_writer.close()
+        progress_log.flush()
+
+    timing_columns = ("source_file", "sequence_type", "n_restarts", "n_permutations_used")
+    timing_rows = [
+        {k: v for k, v in row.items() if k in timing_columns or k.startswith(("time_", "n_leiden"))}
+        for _, row in sorted(computed_rows.items())
+    ]
+    timings_path.write_text(
+        json.dumps(
+            dict(
+                summarize_timings(timing_rows),
+                wall_seconds=time.time() - start_time,
+                n_jobs=n_jobs,
+                n_rows_cached=success_count - len(computed_rows),
+                io=io_stats or None,
+                watchdog=watchdog_stats or None,
+            ),
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    if profile_top > 0:
+        _keep_slowest_profiles(profile_dir, files, computed_rows, profile_top)
+    params_path.write_text(
+        json.dumps(
+            {
+                "input_dir": str(input_path),
+                "pattern": pattern,
+                "sequence_type": sequence_types[0] if len(sequence_types) == 1 else sequence_types,
+                "gamma": gamma,
+                "coupling": C,
+                "n_iter": n_iter,
+                "n_permutations": n_permutations,
+                "engine": engine,
+                "early_stopping": early_stopping,
+                "alpha": alpha,
+                "adaptive": adaptive,
+                "patience": patience,
+                "agreement": agreement,
+                "time_budget": time_budget,
+                "consensus": consensus,
+                "expected_presses_per_block": expected_presses_per_block,
+                "min_presses": min_presses,
+                "dataset_dir": None if dataset_dir is None else str(dataset_dir),
+                "random_state": random_state,
+                "limit": limit,
+                "n_jobs": n_jobs,
+                "resume": resume,
+                "profile_top": profile_top,
+                "prefetch": prefetch,
+                "file_budget": file_budget,
+                "file_timeout": file_timeout,
+                "output_format": output_format,
+                "shard": None if shard is None else f"{shard_index}/{n_shards}",
+                "shard_files": None if shard is None else [p.name for p in files],
+                "n_files_corpus": n_files_corpus,
+                "algorithm_version": ALGORITHM_VERSION,
+                "cache_dir": None if cache is None else str(cache.cache_dir),
+                "n_files_total": len(files),
+                "n_files_success": success_count,
+                "n_files_failed": failed_count,
+                "n_files_cached": len(cached_outcomes),
+                "n_files_budget_exhausted": n_budget_exhausted,
+                "n_files_timed_out": watchdog_stats.get("n_timeouts", 0),
+                "progress_log": str(progress_log_path),
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+
+    run_id = None
+    if results_store is not None:
+        with ResultsStore(results_store) as store:
+            run_id = store.add_run(out_path, master_table=master_table)
+        log_progress(f"Added to results store {results_store} as run {run_id}")
+
+    elapsed_final = time.time() - start_time
+    log_progress(
+        "Batch finished "
+        f"(success={success_count}, failed={failed_count}, "
+        f"budget_exhausted={n_budget_exhausted}, timed_out={watchdog_stats.get('n_timeouts', 0)}, "
+        f"elapsed={_format_seconds(elapsed_final)})"
+    )
+    progress_log.close()
+
+    return {
+        "summary_path": str(summary_path),
+        "trials_path": str(trials_path),
+        "errors_path": str(errors_path),
+        "timings_path": str(timings_path),
+        "params_path": str(params_path),
+        "summary_parquet_path": str(summary_parquet_path) if write_parquet else None,
+        "trials_parquet_path": str(trials_parquet_path) if write_parquet else None,
+        "progress_log_path": str(progress_log_path),
+        "n_files_total": len(files),
+        "n_files_success": success_count,
+        "n_files_failed": failed_count,
+        "n_files_cached": len(cached_outcomes),
+        "n_files_budget_exhausted": n_budget_exhausted,
+        "n_files_timed_out": watchdog_stats.get("n_timeouts", 0),
+        "results_store_run_id": run_id,
+    }
+
+
+def _read_output_table(output_dir: Path, stem: str) -> pd.DataFrame:
+    """Read `<stem>.csv` from a batch output directory, or its Parquet directory if there is no CSV."""
+    csv_path = output_dir / f"{stem}.csv"
+    parquet_path = output_dir / f"{stem}.parquet"
+    if not csv_path.exists() and parquet_path.is_dir():
+        return pd.read_parquet(parquet_path) if any(parquet_path.glob("part-*.parquet")) else pd.DataFrame()
+    try:
+        # Round-trip parsing so merged outputs keep every digit of the shard outputs.
+        return pd.read_csv(csv_path, float_precision="round_trip")
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame()
+
+
+def merge_shard_outputs(
+    output_dir: str | Path = "outputs",
+    shard_dirs: Iterable[str | Path] | None = None,
+) -> dict[str, Any]:
+    """
+    Combine the outputs of `run_batch_analysis(shard="i/N")` runs.
+
+    `shard_dirs` defaults to every `<output_dir>/shard_*_of_*` directory. The
+    shards must come from one sharded run: the same shard count and analysis
+    parameters, every shard index exactly once, disjoint file lists covering
+    the whole corpus, and each (file, sequence) reported exactly once in a
+    summary or error file. Any violation raises ValueError listing the
+    problems and nothing is written.
+
+    Writes the standard chunking_summary.csv, chunking_trials.csv,
+    chunking_errors.csv, chunking_timings.json and chunking_params.json to
+    `output_dir`, in the same order as an unsharded run.
+    """
+    out_path = Path(output_dir)
+    dirs = sorted(out_path.glob("shard_*_of_*")) if shard_dirs is None else [Path(d) for d in shard_dirs]
+    if not dirs:
+        raise FileNotFoundError(f"No shard output directories found in {out_path}.")
+
+    params = [json.loads((d / "chunking_params.json").read_text(encoding="utf-8")) for d in dirs]
+    shard_specific = {
+        "shard", "shard_files", "n_jobs", "resume", "profile_top", "prefetch", "progress_log", "cache_dir"
+    }
+    problems: list[str] = []
+    if any(p.get("shard") is None for p in params):
+        raise ValueError("Only outputs of sharded runs (shard='i/N') can be merged.")
+    shards = [_parse_shard(p["shard"]) for p in params]
+    n_shards = shards[0][1]
+    reference = {k: v for k, v in params[0].items() if k not in shard_specific and not k.startswith("n_files")}
+    for d, p, (index, count) in zip(dirs, params, shards):
+        if count != n_shards:
+            problems.append(f"{d}: shard {index}/{count} does not belong to a {n_shards}-shard run")
+        differing = sorted(
+            k for k in set(reference) | set(p)
+            if k not in shard_specific and not k.startswith("n_files") and p.get(k) != reference.get(k)
+        )
+        if differing:
+            problems.append(f"{d}: parameters differ from {dirs[0]}: {differing}")
+        if p["n_files_corpus"] != params[0]["n_files_corpus"]:
+            problems.append(f"{d}: corpus size {p['n_files_corpus']} != {params[0]['n_files_corpus']}")
+    indices = [index for index, _ in shards]
+    if duplicated := sorted({i for i in indices if indices.count(i) > 1}):
+        problems.append(f"duplicated shard(s): {duplicated}")
+    if missing := sorted(set(range(1, n_shards + 1)) - set(indices)):
+        problems.append(f"missing shard(s): {missing} of {n_shards}")
+
+    owner: dict[str, int] = {}
+    for (index, _), p in zip(shards, params):
+        for name in p["shard_files"]:
+            if name in owner and owner[name] != index:
+                problems.append(f"file {name} is in shards {owner[name]} and {index}")
+            owner[name] = index
+    if len(owner) != params[0]["n_files_corpus"]:
+        problems.append(f"shards cover {len(owner)} files, corpus has {params[0]['n_files_corpus']}")
+
+    summaries = [_read_output_table(d, "chunking_summary") for d in dirs]
+    trials = [_read_output_table(d, "chunking_trials") for d in dirs]
+    errors = [_read_output_table(d, "chunking_errors") for d in dirs]
+    sequence_types = reference["sequence_type"]
+    sequence_types = [sequence_types] if isinstance(sequence_types, str) else list(sequence_types)
+    reported: dict[tuple[str, str], int] = {}
+    for frame in summaries + errors:
+        if frame.empty:
+            continue
+        for source, seq in zip(frame["source_file"], frame["sequence_type"]):
+            key = (normalize_file_name(Path(source).name), seq)
+            reported[key] = reported.get(key, 0) + 1
+    expected = {(name, seq) for name in owner for seq in sequence_types}
+    if duplicated_rows := sorted(k for k, n in reported.items() if n > 1):
+        problems.append(f"{len(duplicated_rows)} (file, sequence) pairs reported twice, e.g. {duplicated_rows[0]}")
+    if missing_rows := sorted(expected - set(reported)):
+        problems.append(f"{len(missing_rows)} (file, sequence) pairs missing, e.g. {missing_rows[0]}")
+    if unexpected := sorted(set(reported) - expected):
+        problems.append(f"{len(unexpected)} unexpected (file, sequence) pairs, e.g. {unexpected[0]}")
+    if problems:
+        raise ValueError("Cannot merge shard outputs:\n- " + "\n- ".join(problems))
+
+    file_order = {name: i for i, name in enumerate(sorted(owner))}
+
+    def ordered(frames: list[pd.DataFrame], extra_key: str | None = None) -> pd.DataFrame:
+        frames = [f for f in frames if not f.empty]
+        if not frames:
+            return pd.DataFrame()
+        merged = pd.concat(frames, ignore_index=True)
+        keys = pd.DataFrame(
+            {
+                "file": [file_order[normalize_file_name(Path(s).name)] for s in merged["source_file"]],
+                "seq": [sequence_types.index(s) for s in merged["sequence_type"]],
+                "row": np.arange(len(merged)),
+            }
+        )
+        order = keys.sort_values(["file", "seq", "row"], kind="stable").index
+        return merged.loc[order].reset_index(drop=True)
+
+    summary_df = ordered(summaries)
+    trial_df = ordered(trials)
+    errors_df = ordered(errors)
+
+    summary_path = out_path / "chunking_summary.csv"
+    trials_path = out_path / "chunking_trials.csv"
+    errors_path = out_path / "chunking_errors.csv"
+    timings_path = out_path / "chunking_timings.json"
+    params_path = out_path / "chunking_params.json"
+    summary_df.to_csv(summary_path, index=False)
+    trial_df.to_csv(trials_path, index=False)
+    errors_df.to_csv(errors_path, index=False)
+    timing_columns = r"^(source_file|sequence_type|time_|n_leiden|n_restarts|n_permutations_used)"
+    timing_rows = summary_df.filter(regex=timing_columns).to_dict("records")
+    timings_path.write_text(json.dumps(summarize_timings(timing_rows), indent=2), encoding="utf-8")
+    params_path.write_text(
+        json.dumps(
+            dict(
+                reference,
+                shards=[str(d) for d in dirs],
+                n_shards=n_shards,
+                n_files_total=len(owner),
+                n_files_success=len(summary_df),
+                n_files_failed=len(errors_df),
+                n_files_cached=sum(int(p.get("n_files_cached", 0)) for p in params),
+                n_files_budget_exhausted=sum(int(p.get("n_files_budget_exhausted", 0)) for p in params),
+                n_files_timed_out=sum(int(p.get("n_files_timed_out", 0)) for p in params),
+            ),
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    return {
+        "summary_path": str(summary_path),
+        "trials_path": str(trials_path),
+        "errors_path": str(errors_path),
+        "timings_path": str(timings_path),
+        "params_path": str(params_path),
+        "n_shards": n_shards,
+        "n_files_total": len(owner),
+        "n_files_success": len(summary_df),
+        "n_files_failed": len(errors_df),
+    }
+
+
+def summarize_outputs(output_dir: str | Path = "outputs", alpha: float = 0.05) -> dict[str, Any]:
+    """
+    Summarise the outputs of a finished (or merged) batch run without re-running anything.
+
+    Reads `chunking_summary` (CSV or Parquet) and `chunking_errors.csv` from
+    `output_dir` and aggregates them per sequence type: analysed files, mean
+    single-trial modularity, normalised phi and chunk count, the share of
+    files with a permutation p-value below `alpha`, and the number of rows
+    flagged `budget_exhausted`. `timings` holds the contents of
+    `chunking_timings.json` if present.
+    """
+    out_path = Path(output_dir)
+    if not (out_path / "chunking_summary.csv").exists() and not (out_path / "chunking_summary.parquet").is_dir():
+        raise FileNotFoundError(f"No chunking_summary output in {out_path}.")
+    summary = _read_output_table(out_path, "chunking_summary")
+    errors_path = out_path / "chunking_errors.csv"
+    try:
+        errors = pd.read_csv(errors_path) if errors_path.exists() else pd.DataFrame()
+    except pd.errors.EmptyDataError:
+        errors = pd.DataFrame()
+
+    if summary.empty:
+        by_sequence = pd.DataFrame()
+    else:
+        by_sequence = (
+            summary.assign(
+                significant=summary["p_value_permutation"] < alpha,
+                budget_exhausted=summary.get("budget_exhausted", False),
+            )
+            .groupby("sequence_type", sort=False)
+            .agg(
+                n_files=("source_file", "size"),
+                mean_q_single_trial=("mean_q_single_trial", "mean"),
+                mean_phi_normalized=("mean_phi_normalized", "mean"),
+                mean_n_chunks=("mean_n_chunks", "mean"),
+                share_significant=("significant", "mean"),
+                n_budget_exhausted=("budget_exhausted", "sum"),
+            )
+        )
+    timings_path = out_path / "chunking_timings.json"
+    return {
+        "n_rows": len(summary),
+        "n_files": int(summary["source_file"].nunique()) if not summary.empty else 0,
+        "n_failed": len(errors),
+        "by_sequence": by_sequence,
+        "timings": json.loads(timings_path.read_text(encoding="utf-8")) if timings_path.exists() else None,
+    }
+
+
+def run_batch_sweep(
+    input_dir: str | Path = "SRT",
+    output_dir: str | Path = "outputs",
+    pattern: str = "*.csv",
+    sequence_type: str | list[str] = "blue",
+    gammas: Iterable[float] = DEFAULT_SWEEP_GAMMAS,
+    couplings: Iterable[float] = DEFAULT_SWEEP_COUPLINGS,
+    n_iter: int = 20,
     random_state: int | None = 42,
     limit: int | None = None,
+    n_jobs: int = 1,
+    engine: str = "leiden",
+    warm_start: bool = True,
+    adaptive: bool = False,
+    patience: int = 10,
+    agreement: int = 5,
+    dataset_dir: str | Path | None = None,
+    prefetch: int = 2,
+    file_timeout: float | None = None,
+    expected_presses_per_block: int = EXPECTED_PRESSES_PER_BLOCK,
+    min_presses: int | None = None,
 ) -> dict[str, Any]:
     """
-    Batch-run chunking analysis across many participant files.
+    Run `run_parameter_sweep` on every file of a folder.
+
+    Files, sequences, seeds, block selection, parallelism and the
+    `file_timeout` watchdog are handled as in `run_batch_analysis` (without
+    caching or null models).
 
     Writes:
-      - chunking_summary.csv (one row per file)
-      - chunking_trials.csv (one row per analyzed block/trial)
-      - chunking_errors.csv (failed files with reason)
-      - chunking_params.json (run parameters)
+      - chunking_sweep.csv (one row per file, sequence, gamma and coupling)
+      - chunking_sweep_errors.csv (failed files/sequences with reason)
+      - chunking_sweep_params.json (run parameters)
     """
     input_path = Path(input_dir)
     out_path = Path(output_dir)
     out_path.mkdir(parents=True, exist_ok=True)
+    sequence_types = _resolve_sequence_types(sequence_type)
+    gammas = [float(g) for g in gammas]
+    couplings = [float(c) for c in couplings]
 
-    files = sorted(input_path.glob(pattern))
+    files = sorted(p for p in input_path.glob(pattern) if is_srt_csv(p))
     if limit is not None:
         files = files[:limit]
     if not files:
         raise FileNotFoundError(f"No files found: {input_path / pattern}")
+    if n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = min(n_jobs, len(files))
+
+    print(
+        f"Sweep start (files={len(files)}, sequence={','.join(sequence_types)}, "
+        f"grid={len(gammas)}x{len(couplings)}, n_iter={n_iter}, engine={engine}, "
+        f"warm_start={warm_start}, n_jobs={n_jobs})"
+    )
+    tasks = [
+        {
+            "index": idx,
+            "file_path": str(file_path),
+            "sequence_types": sequence_types,
+            "dataset_dir": None if dataset_dir is None else str(dataset_dir),
+            "analysis": {
+                "gammas": gammas,
+                "couplings": couplings,
+                "n_iter": n_iter,
+                "random_state": _file_seed(random_state, file_path),
+                "engine": engine,
+                "warm_start": warm_start,
+                "adaptive": adaptive,
+                "patience": patience,
+                "agreement": agreement,
+                "expected_presses_per_block": expected_presses_per_block,
+                "min_presses": min_presses,
+            },
+        }
+        for idx, file_path in enumerate(files)
+    ]
 
-    summary_rows: list[dict[str, Any]] = []
-    trial_frames: list[pd.DataFrame] = []
-    error_rows: list[dict[str, str]] = []
-    progress_log_path = out_path / "chunking_progress.log"
-    if progress_log_path.exists():
-        progress_log_path.unlink()
-    total_files = len(files)
+    tables: dict[tuple[int, int], pd.DataFrame] = {}
+    error_rows: dict[tuple[int, int], dict[str, str]] = {}
     start_time = time.time()
+    outcomes = _iter_task_outcomes(
+        tasks, n_jobs, worker=_sweep_file_task, prefetch=prefetch, timeout=file_timeout
+    )
+    for processed, outcome in enumerate(outcomes, start=1):
+        idx = outcome["index"]
+        for res in outcome["results"]:
+            row_key = (idx, sequence_types.index(res["sequence_type"]))
+            if res["status"] == "failed":
+                error_rows[row_key] = {
+                    "source_file": str(files[idx]),
+                    "sequence_type": res["sequence_type"],
+                    "error": res["error"],
+                }
+            else:
+                tables[row_key] = res["table"]
+        print(
+            f"[{processed}/{len(files)}] {_file_status(outcome['results'])} file='{files[idx].name}' "
+            f"elapsed={_format_seconds(time.time() - start_time)}"
+        )
 
-    def log_progress(message: str) -> None:
-        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
-        line = f"[{timestamp}] {message}\n"
-        with progress_log_path.open("a", encoding="utf-8") as f:
-            f.write(line)
-        print(message)
+    ordered = [tables[k] for k in sorted(tables)]
+    sweep_df = pd.concat(ordered, ignore_index=True) if ordered else pd.DataFrame()
+    errors_df = pd.DataFrame([error_rows[k] for k in sorted(error_rows)])
 
-    log_progress(
-        "Batch start "
-        f"(files={total_files}, sequence={sequence_type}, gamma={gamma}, "
-        f"coupling={C}, n_iter={n_iter}, n_permutations={n_permutations})"
+    sweep_path = out_path / "chunking_sweep.csv"
+    errors_path = out_path / "chunking_sweep_errors.csv"
+    params_path = out_path / "chunking_sweep_params.json"
+    sweep_df.to_csv(sweep_path, index=False)
+    errors_df.to_csv(errors_path, index=False)
+    params_path.write_text(
+        json.dumps(
+            {
+                "input_dir": str(input_path),
+                "pattern": pattern,
+                "sequence_type": sequence_types[0] if len(sequence_types) == 1 else sequence_types,
+                "gammas": gammas,
+                "couplings": couplings,
+                "n_iter": n_iter,
+                "engine": engine,
+                "warm_start": warm_start,
+                "adaptive": adaptive,
+                "patience": patience,
+                "agreement": agreement,
+                "expected_presses_per_block": expected_presses_per_block,
+                "min_presses": min_presses,
+                "dataset_dir": None if dataset_dir is None else str(dataset_dir),
+                "random_state": random_state,
+                "limit": limit,
+                "n_jobs": n_jobs,
+                "prefetch": prefetch,
+                "file_timeout": file_timeout,
+                "algorithm_version": ALGORITHM_VERSION,
+                "n_files_total": len(files),
+                "n_files_success": len({k[0] for k in tables}),
+                "n_files_failed": len({k[0] for k in error_rows}),
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
     )
+    print(f"Sweep finished (rows={len(sweep_df)}, elapsed={_format_seconds(time.time() - start_time)})")
+    return {
+        "sweep_path": str(sweep_path),
+        "errors_path": str(errors_path),
+        "params_path": str(params_path),
+        "n_files_total": len(files),
+        "n_rows": len(sweep_df),
+        "n_failed": len(errors_df),
+    }
 
-    for idx, file_path in enumerate(files, start=1):
-        status = "ok"
-        err_msg = ""
-        try:
-            result = run_full_analysis(
-                file_path,
-                sequence_type=sequence_type,
-                gamma=gamma,
-                C=C,
-                n_iter=n_iter,
-                n_permutations=n_permutations,
-                random_state=None if random_state is None else random_state + idx,
-            )
-            metrics = result["metrics"].copy()
-            metrics["source_file"] = str(file_path)
-            metrics["sequence_type"] = sequence_type
-            trial_frames.append(metrics)
 
-            summary_rows.append(
+def run_participant_batch(
+    input_dir: str | Path = "SRT",
+    output_dir: str | Path = "outputs/participants",
+    pattern: str = "*.csv",
+    sequence_type: str | list[str] = "blue",
+    gamma: float = DEFAULT_GAMMA,
+    C: float = DEFAULT_COUPLING,
+    session_coupling: float | None = None,
+    n_iter: int = 100,
+    random_state: int | None = 42,
+    limit: int | None = None,
+    n_jobs: int = 1,
+    engine: str = "chain_dp",
+    adaptive: bool = False,
+    patience: int = 10,
+    agreement: int = 5,
+    time_budget: float | None = None,
+    consensus: bool = False,
+    dataset_dir: str | Path | None = None,
+    participant_timeout: float | None = None,
+    expected_presses_per_block: int = EXPECTED_PRESSES_PER_BLOCK,
+    min_presses: int | None = None,
+) -> dict[str, Any]:
+    """
+    Run `run_participant_analysis` for every participant of a folder.
+
+    Files are grouped by the participant in their name
+    (`group_participant_files`); files whose name does not parse are
+    reported as errors. `limit` caps the number of participants. Seeds are
+    derived per participant, and block selection, parallelism and the
+    watchdog (`participant_timeout`) work as in `run_batch_analysis`, with a
+    participant in place of a file.
+
+    Writes:
+      - participant_summary.csv (one row per participant, session and sequence)
+      - participant_trials.csv (per-trial metrics with labels shared across sessions)
+      - participant_sessions.csv (each participant's files in the order used, with their wave)
+      - participant_errors.csv (failed participants/sequences, skipped sessions, session order
+        conflicts, unparsed files)
+      - participant_params.json (run parameters)
+    """
+    input_path = Path(input_dir)
+    out_path = Path(output_dir)
+    out_path.mkdir(parents=True, exist_ok=True)
+    sequence_types = _resolve_sequence_types(sequence_type)
+
+    files = sorted(p for p in input_path.glob(pattern) if is_srt_csv(p))
+    if not files:
+        raise FileNotFoundError(f"No files found: {input_path / pattern}")
+    groups, unmatched = group_participant_files(files)
+    participants = list(groups)
+    if limit is not None:
+        participants = participants[:limit]
+    if not participants:
+        raise ValueError(f"No file in {input_path} has a parseable participant name.")
+    if n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = min(n_jobs, len(participants))
+
+    n_files = sum(len(groups[p]) for p in participants)
+    session_rows: list[dict[str, Any]] = []
+    conflict_rows: list[dict[str, Any]] = []
+    for participant in participants:
+        ordered, waves, _, conflicts = _order_sessions(groups[participant])
+        for order, (path, wave) in enumerate(zip(ordered, waves), start=1):
+            info = parse_srt_filename(path)
+            session_rows.append(
                 {
-                    "source_file": str(file_path),
-                    "sequence_type": sequence_type,
-                    "n_blocks": int(result["n_blocks"]),
-                    "mean_q_single_trial": float(metrics["q_single_trial"].mean()),
-                    "mean_phi": float(metrics["phi"].replace([np.inf, -np.inf], np.nan).mean()),
-                    "mean_phi_normalized": float(metrics["phi_normalized"].mean()),
-                    "mean_n_chunks": float(metrics["n_chunks"].mean()),
-                    "empirical_q_multitrial": float(result["validation"]["empirical_q_multitrial"]),
-                    "null_q_multitrial_mean": float(result["validation"]["null_q_multitrial_mean"]),
-                    "p_value_permutation": float(result["validation"]["p_value_permutation"]),
+                    "participant": participant,
+                    "order": order,
+                    "source_file": str(path),
+                    "session": info["session"],
+                    "date": None if info["date"] is None else info["date"].isoformat(),
+                    "wave": wave,
                 }
             )
-        except Exception as exc:  # pragma: no cover - robust batch execution
-            status = "failed"
-            err_msg = str(exc)
-            error_rows.append({"source_file": str(file_path), "error": str(exc)})
-
-        elapsed = time.time() - start_time
-        processed = idx
-        success_count = len(summary_rows)
-        failed_count = len(error_rows)
-        files_per_sec = processed / elapsed if elapsed > 0 else 0.0
-        eta_total = total_files / files_per_sec if files_per_sec > 0 else float("inf")
-        eta_remaining = (total_files - processed) / files_per_sec if files_per_sec > 0 else float("inf")
-
-        msg = (
-            f"[{processed}/{total_files}] {status} file='{file_path.name}' "
-            f"success={success_count} failed={failed_count} "
-            f"elapsed={_format_seconds(elapsed)} "
-            f"eta_remaining={_format_seconds(eta_remaining) if np.isfinite(eta_remaining) else 'N/A'} "
-            f"eta_total={_format_seconds(eta_total) if np.isfinite(eta_total) else 'N/A'}"
+        conflict_rows.extend(
+            {"participant": participant, "source_file": str(path), "sequence_type": None, "error": message}
+            for path, message in conflicts
         )
-        if status == "failed":
-            msg += f" error='{err_msg}'"
-        log_progress(msg)
+    if conflict_rows:
+        n_conflicted = len({row["participant"] for row in conflict_rows})
+        print(
+            f"Warning: {len(conflict_rows)} session order conflicts in {n_conflicted} participants "
+            "(listed in participant_errors.csv)."
+        )
+    print(
+        f"Participant batch start (participants={len(participants)}, files={n_files}, "
+        f"sequence={','.join(sequence_types)}, engine={engine}, C={C}, session_coupling={session_coupling}, "
+        f"n_jobs={n_jobs})"
+    )
+    tasks = [
+        {
+            "index": idx,
+            "file_path": participant,
+            "file_paths": [str(path) for path in groups[participant]],
+            "sequence_types": sequence_types,
+            "dataset_dir": None if dataset_dir is None else str(dataset_dir),
+            "analysis": {
+                "gamma": gamma,
+                "C": C,
+                "session_coupling": session_coupling,
+                "n_iter": n_iter,
+                "random_state": _file_seed(random_state, participant),
+                "engine": engine,
+                "adaptive": adaptive,
+                "patience": patience,
+                "agreement": agreement,
+                "time_budget": time_budget,
+                "consensus": consensus,
+                "expected_presses_per_block": expected_presses_per_block,
+                "min_presses": min_presses,
+            },
+        }
+        for idx, participant in enumerate(participants)
+    ]
 
-    summary_df = pd.DataFrame(summary_rows)
-    trial_df = pd.concat(trial_frames, ignore_index=True) if trial_frames else pd.DataFrame()
-    errors_df = pd.DataFrame(error_rows)
+    summary_rows: dict[tuple[int, int], list[dict[str, Any]]] = {}
+    trial_tables: dict[tuple[int, int], pd.DataFrame] = {}
+    error_rows = [
+        {"participant": None, "source_file": str(path), "sequence_type": None, "error": "Unparseable file name."}
+        for path in unmatched
+    ]
+    error_rows.extend(conflict_rows)
+    timing_rows: list[dict[str, Any]] = []
+    watchdog_stats: dict[str, Any] = {}
+    start_time = time.time()
+    outcomes = _iter_task_outcomes(
+        tasks,
+        n_jobs,
+        worker=_analyze_participant_task,
+        timeout=participant_timeout,
+        watchdog_stats=watchdog_stats,
+    )
+    for processed, outcome in enumerate(outcomes, start=1):
+        idx = outcome["index"]
+        for res in outcome["results"]:
+            key = (idx, sequence_types.index(res["sequence_type"]))
+            if res["status"] == "failed":
+                error_rows.append(
+                    {
+                        "participant": participants[idx],
+                        "source_file": None,
+                        "sequence_type": res["sequence_type"],
+                        "error": res["error"],
+                    }
+                )
+                continue
+            summary_rows[key] = res["summary_rows"]
+            trial_tables[key] = res["metrics"]
+            timing_rows.append(
+                {"source_file": participants[idx], "sequence_type": res["sequence_type"], **res["timings"]}
+            )
+            error_rows.extend(
+                {
+                    "participant": participants[idx],
+                    "source_file": path,
+                    "sequence_type": res["sequence_type"],
+                    "error": "No valid blocks; session skipped.",
+                }
+                for path in res["skipped_sessions"]
+            )
+            error_rows.extend(
+                {
+                    "participant": participants[idx],
+                    "source_file": path,
+                    "sequence_type": res["sequence_type"],
+                    "error": "Undated session whose number every wave already has; session left out.",
+                }
+                for path in res["unplaced_sessions"]
+            )
+        print(
+            f"[{processed}/{len(participants)}] {_file_status(outcome['results'])} "
+            f"participant='{participants[idx]}' sessions={len(groups[participants[idx]])} "
+            f"elapsed={_format_seconds(time.time() - start_time)}"
+        )
 
-    summary_path = out_path / "chunking_summary.csv"
-    trials_path = out_path / "chunking_trials.csv"
-    errors_path = out_path / "chunking_errors.csv"
-    params_path = out_path / "chunking_params.json"
+    summary_df = pd.DataFrame([row for k in sorted(summary_rows) for row in summary_rows[k]])
+    ordered = [trial_tables[k] for k in sorted(trial_tables)]
+    trials_df = pd.concat(ordered, ignore_index=True) if ordered else pd.DataFrame()
+    errors_df = pd.DataFrame(error_rows, columns=["participant", "source_file", "sequence_type", "error"])
 
+    summary_path = out_path / "participant_summary.csv"
+    trials_path = out_path / "participant_trials.csv"
+    sessions_path = out_path / "participant_sessions.csv"
+    errors_path = out_path / "participant_errors.csv"
+    params_path = out_path / "participant_params.json"
     summary_df.to_csv(summary_path, index=False)
-    trial_df.to_csv(trials_path, index=False)
+    trials_df.to_csv(trials_path, index=False)
+    pd.DataFrame(
+        session_rows, columns=["participant", "order", "source_file", "session", "date", "wave"]
+    ).to_csv(sessions_path, index=False)
     errors_df.to_csv(errors_path, index=False)
     params_path.write_text(
         json.dumps(
             {
                 "input_dir": str(input_path),
                 "pattern": pattern,
-                "sequence_type": sequence_type,
+                "sequence_type": sequence_types[0] if len(sequence_types) == 1 else sequence_types,
                 "gamma": gamma,
                 "coupling": C,
+                "session_coupling": session_coupling,
                 "n_iter": n_iter,
-                "n_permutations": n_permutations,
+                "engine": engine,
+                "adaptive": adaptive,
+                "patience": patience,
+                "agreement": agreement,
+                "time_budget": time_budget,
+                "consensus": consensus,
+                "expected_presses_per_block": expected_presses_per_block,
+                "min_presses": min_presses,
+                "dataset_dir": None if dataset_dir is None else str(dataset_dir),
                 "random_state": random_state,
                 "limit": limit,
-                "n_files_total": len(files),
-                "n_files_success": len(summary_df),
-                "n_files_failed": len(errors_df),
-                "progress_log": str(progress_log_path),
+                "n_jobs": n_jobs,
+                "participant_timeout": participant_timeout,
+                "algorithm_version": ALGORITHM_VERSION,
+                "n_participants_total": len(participants),
+                "n_participants_success": len({k[0] for k in summary_rows}),
+                "n_files_total": n_files,
+                "n_files_unparsed": len(unmatched),
+                "n_session_conflicts": len(conflict_rows),
+                "timing_summary": summarize_timings(timing_rows),
+                "watchdog": watchdog_stats or None,
             },
             indent=2,
+            default=str,
         ),
         encoding="utf-8",
     )
-
-    elapsed_final = time.time() - start_time
-    log_progress(
-        "Batch finished "
-        f"(success={len(summary_df)}, failed={len(errors_df)}, "
-        f"elapsed={_format_seconds(elapsed_final)})"
+    print(
+        f"Participant batch finished (participants={len(participants)}, rows={len(summary_df)}, "
+        f"elapsed={_format_seconds(time.time() - start_time)})"
     )
-
     return {
         "summary_path": str(summary_path),
         "trials_path": str(trials_path),
+        "sessions_path": str(sessions_path),
         "errors_path": str(errors_path),
         "params_path": str(params_path),
-        "progress_log_path": str(progress_log_path),
-        "n_files_total": len(files),
-        "n_files_success": len(summary_df),
-        "n_files_failed": len(errors_df),
+        "n_participants_total": len(participants),
+        "n_rows": len(summary_df),
+        "n_errors": len(errors_df),
     }
 
 
+def _add_block_arguments(parser: argparse.ArgumentParser) -> None:
+    """The options selecting which blocks are analysed, shared by `run`, `sweep` and `participants`."""
+    parser.add_argument(
+        "--presses-per-block",
+        type=int,
+        default=EXPECTED_PRESSES_PER_BLOCK,
+        help="Key presses of a complete block (sequence length).",
+    )
+    parser.add_argument(
+        "--min-presses",
+        type=int,
+        default=None,
+        help="Also keep blocks whose first N presses are correct, for N >= this (default: complete blocks only).",
+    )
+
+
 def _build_arg_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
-        description="SRTT chunking analysis (Wymbs/Mucha multilayer community detection)."
+        prog="chunking run",
+        description="SRTT chunking analysis (Wymbs/Mucha multilayer community detection).",
     )
     parser.add_argument("--input-dir", default="SRT", help="Directory containing participant CSV files.")
     parser.add_argument("--output-dir", default="outputs", help="Directory for analysis outputs.")
     parser.add_argument("--pattern", default="*.csv", help="Glob pattern for input files.")
+    parser.add_argument(
+        "--dataset-dir",
+        default=None,
+        help="Read file contents from this ingested Parquet dataset where up to date.",
+    )
     parser.add_argument(
         "--sequence-type",
-        default="blue",
-        choices=["blue", "green", "yellow"],
-        help="Sequence type to analyze.",
+        nargs="+",
+        default=["blue"],
+        choices=[*SEQUENCE_TYPES, "all"],
+        help="Sequence type(s) to analyze; 'all' analyses every sequence in one pass per file.",
     )
     parser.add_argument("--gamma", type=float, default=DEFAULT_GAMMA, help="Intralayer resolution parameter.")
     parser.add_argument("--coupling", type=float, default=DEFAULT_COUPLING, help="Interlayer coupling parameter.")
     parser.add_argument("--n-iter", type=int, default=20, help="Community-detection repeats per file.")
     parser.add_argument("--n-permutations", type=int, default=20, help="Null-model permutations per file.")
+    parser.add_argument(
+        "--engine",
+        default="leiden",
+        choices=list(ENGINES),
+        help="Community-detection engine ('chain_dp': exact single pass for chain graphs).",
+    )
+    parser.add_argument(
+        "--early-stopping",
+        action="store_true",
+        help="Stop null permutations once the p-value is clearly above or below --alpha.",
+    )
+    parser.add_argument("--alpha", type=float, default=0.05, help="Significance level for --early-stopping.")
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Stop restarts early once the best quality has converged (--n-iter becomes a cap).",
+    )
+    parser.add_argument("--patience", type=int, default=10, help="Adaptive: restarts without improvement.")
+    parser.add_argument("--agreement", type=int, default=5, help="Adaptive: restarts reaching the best quality.")
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=None,
+        help="Wall-clock seconds per file for community-detection restarts.",
+    )
+    parser.add_argument(
+        "--file-budget",
+        type=float,
+        default=None,
+        help="Soft wall-clock seconds per file and sequence: fewer restarts/permutations once spent "
+        "(flagged as budget_exhausted).",
+    )
+    parser.add_argument(
+        "--file-timeout",
+        type=float,
+        default=None,
+        help="Kill a file still running after this many seconds and record it as failed (watchdog).",
+    )
+    parser.add_argument(
+        "--consensus",
+        action="store_true",
+        help="Base chunk metrics on the module-allegiance consensus of all restarts, not the best one.",
+    )
+    _add_block_arguments(parser)
     parser.add_argument("--seed", type=int, default=42, help="Base random seed for reproducible batch runs.")
     parser.add_argument("--limit", type=int, default=None, help="Optional limit on number of files.")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes (0 or negative: use all CPU cores).",
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=2,
+        help="Files parsed ahead of the analysis by a reader thread in serial runs (0: off).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Reuse cached per-file results and append to the progress log.",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the result cache.")
+    parser.add_argument("--cache-dir", default=None, help="Result cache directory (default: <output-dir>/cache).")
+    parser.add_argument(
+        "--cache-max-size",
+        default=None,
+        help="Evict least recently used cache entries beyond this size (e.g. 500M, 2G).",
+    )
+    parser.add_argument(
+        "--output-format",
+        default="csv",
+        choices=list(OUTPUT_FORMATS),
+        help="Format of the summary and trial tables (Parquet: part-file directories).",
+    )
+    parser.add_argument(
+        "--shard",
+        default=None,
+        metavar="I/N",
+        help="Analyse only shard I of N size-balanced shards (outputs in <output-dir>/shard_I_of_N).",
+    )
+    parser.add_argument(
+        "--results-store",
+        default=None,
+        help="Also add the finished outputs to this SQLite results store (see `chunking store`).",
+    )
+    parser.add_argument(
+        "--master-table",
+        default=None,
+        help="With --results-store: participant master table (xlsx or csv) to join onto the files.",
+    )
+    parser.add_argument(
+        "--profile",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Run files under cProfile and keep stats for the N slowest in <output-dir>/profiles.",
+    )
+    return parser
+
+
+def _build_cache_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="chunking cache",
+        description="Inspect or prune the per-file result cache.",
+    )
+    parser.add_argument("action", choices=["info", "prune", "clear"], help="Cache operation.")
+    parser.add_argument("--cache-dir", default="outputs/cache", help="Result cache directory.")
+    parser.add_argument(
+        "--max-size",
+        default=None,
+        help="For `prune`: evict least recently used entries beyond this size (e.g. 2G).",
+    )
+    return parser
+
+
+def _cache_main(argv: list[str]) -> int:
+    args = _build_cache_arg_parser().parse_args(argv)
+    cache = ResultCache(args.cache_dir, algorithm_version=ALGORITHM_VERSION)
+    if args.action == "clear":
+        cache.clear()
+        print(f"Removed cache directory {cache.cache_dir}")
+    elif args.action == "prune":
+        stats = cache.prune(max_bytes=parse_size(args.max_size))
+        print(
+            f"Pruned cache: removed_stale={stats['removed_stale']} "
+            f"removed_lru={stats['removed_lru']} size_bytes={stats['size_bytes']}"
+        )
+    else:
+        for key, value in cache.info().items():
+            print(f"{key}: {value}")
+    return 0
+
+
+def _build_ingest_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="chunking ingest",
+        description="Convert (or incrementally update) SRT CSV files into a typed Parquet dataset.",
+    )
+    parser.add_argument("--input-dir", default="SRT", help="Directory containing participant CSV files.")
+    parser.add_argument("--dataset-dir", default="outputs/srt_dataset", help="Parquet dataset directory.")
+    parser.add_argument("--pattern", default="*.csv", help="Glob pattern for input files.")
+    parser.add_argument(
+        "--keep-missing",
+        action="store_true",
+        help="Keep dataset entries whose CSV file no longer exists.",
+    )
+    return parser
+
+
+def _ingest_main(argv: list[str]) -> int:
+    args = _build_ingest_arg_parser().parse_args(argv)
+    report = ingest_srt_folder(
+        input_dir=args.input_dir,
+        dataset_dir=args.dataset_dir,
+        pattern=args.pattern,
+        prune=not args.keep_missing,
+    )
+    print(
+        f"Ingest complete: added={report['added']} updated={report['updated']} "
+        f"unchanged={report['unchanged']} removed={report['removed']} errors={len(report['errors'])}"
+    )
+    for name, error in report["errors"].items():
+        print(f"- {name}: {error}")
+    return 0
+
+
+def _build_sweep_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="chunking sweep",
+        description="Evaluate a gamma x coupling grid per file with shared preprocessing and warm starts.",
+    )
+    parser.add_argument("--input-dir", default="SRT", help="Directory containing participant CSV files.")
+    parser.add_argument("--output-dir", default="outputs", help="Directory for sweep outputs.")
+    parser.add_argument("--pattern", default="*.csv", help="Glob pattern for input files.")
+    parser.add_argument("--dataset-dir", default=None, help="Ingested Parquet dataset to read from.")
+    parser.add_argument(
+        "--sequence-type",
+        nargs="+",
+        default=["blue"],
+        choices=[*SEQUENCE_TYPES, "all"],
+        help="Sequence type(s) to sweep.",
+    )
+    parser.add_argument(
+        "--gammas", type=float, nargs="+", default=list(DEFAULT_SWEEP_GAMMAS), help="Resolution values."
+    )
+    parser.add_argument(
+        "--couplings", type=float, nargs="+", default=list(DEFAULT_SWEEP_COUPLINGS), help="Coupling values."
+    )
+    parser.add_argument("--n-iter", type=int, default=20, help="Community-detection repeats per grid point.")
+    parser.add_argument("--engine", default="leiden", choices=list(ENGINES), help="Community-detection engine.")
+    parser.add_argument("--no-warm-start", action="store_true", help="Start every grid point from singletons.")
+    parser.add_argument("--adaptive", action="store_true", help="Stop restarts early once converged.")
+    parser.add_argument("--patience", type=int, default=10, help="Adaptive: restarts without improvement.")
+    parser.add_argument("--agreement", type=int, default=5, help="Adaptive: restarts reaching the best quality.")
+    _add_block_arguments(parser)
+    parser.add_argument("--seed", type=int, default=42, help="Base random seed.")
+    parser.add_argument("--limit", type=int, default=None, help="Optional limit on number of files.")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of worker processes (<1: all cores).")
+    parser.add_argument("--prefetch", type=int, default=2, help="Files parsed ahead in serial runs (0: off).")
+    parser.add_argument(
+        "--file-timeout",
+        type=float,
+        default=None,
+        help="Kill a file still running after this many seconds and record it as failed.",
+    )
     return parser
 
 
-def main(argv: list[str] | None = None) -> int:
+def _sweep_main(argv: list[str]) -> int:
+    args = _build_sweep_arg_parser().parse_args(argv)
+    result = run_batch_sweep(
+        input_dir=args.input_dir,
+        output_dir=args.output_dir,
+        pattern=args.pattern,
+        sequence_type=args.sequence_type,
+        gammas=args.gammas,
+        couplings=args.couplings,
+        n_iter=args.n_iter,
+        random_state=args.seed,
+        limit=args.limit,
+        n_jobs=args.jobs,
+        engine=args.engine,
+        warm_start=not args.no_warm_start,
+        adaptive=args.adaptive,
+        patience=args.patience,
+        agreement=args.agreement,
+        dataset_dir=args.dataset_dir,
+        prefetch=args.prefetch,
+        file_timeout=args.file_timeout,
+        expected_presses_per_block=args.presses_per_block,
+        min_presses=args.min_presses,
+    )
+    print("Parameter sweep complete:")
+    print(f"- total files: {result['n_files_total']}")
+    print(f"- rows:        {result['n_rows']}")
+    print(f"- failed:      {result['n_failed']}")
+    print(f"- sweep:       {result['sweep_path']}")
+    print(f"- errors:      {result['errors_path']}")
+    return 0
+
+
+def _build_participants_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="chunking participants",
+        description="Analyse all sessions of each participant as one multilayer network.",
+    )
+    parser.add_argument("--input-dir", default="SRT", help="Directory containing participant CSV files.")
+    parser.add_argument("--output-dir", default="outputs/participants", help="Directory for participant outputs.")
+    parser.add_argument("--pattern", default="*.csv", help="Glob pattern for input files.")
+    parser.add_argument("--dataset-dir", default=None, help="Ingested Parquet dataset to read from.")
+    parser.add_argument(
+        "--sequence-type",
+        nargs="+",
+        default=["blue"],
+        choices=[*SEQUENCE_TYPES, "all"],
+        help="Sequence type(s) to analyse.",
+    )
+    parser.add_argument("--gamma", type=float, default=DEFAULT_GAMMA, help="Resolution parameter.")
+    parser.add_argument("--coupling", type=float, default=DEFAULT_COUPLING, help="Coupling between blocks.")
+    parser.add_argument(
+        "--session-coupling",
+        type=float,
+        default=None,
+        help="Coupling between the last block of a session and the first of the next (default: --coupling).",
+    )
+    parser.add_argument("--n-iter", type=int, default=100, help="Community-detection repeats.")
+    parser.add_argument("--engine", default="chain_dp", choices=list(ENGINES), help="Community-detection engine.")
+    parser.add_argument("--adaptive", action="store_true", help="Stop restarts early once converged.")
+    parser.add_argument("--patience", type=int, default=10, help="Adaptive: restarts without improvement.")
+    parser.add_argument("--agreement", type=int, default=5, help="Adaptive: restarts reaching the best quality.")
+    parser.add_argument("--time-budget", type=float, default=None, help="Seconds of restarts per participant.")
+    parser.add_argument("--consensus", action="store_true", help="Use the consensus partition of all restarts.")
+    _add_block_arguments(parser)
+    parser.add_argument("--seed", type=int, default=42, help="Base random seed.")
+    parser.add_argument("--limit", type=int, default=None, help="Optional limit on number of participants.")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of worker processes (<1: all cores).")
+    parser.add_argument(
+        "--participant-timeout",
+        type=float,
+        default=None,
+        help="Kill a participant still running after this many seconds and record it as failed.",
+    )
+    return parser
+
+
+def _participants_main(argv: list[str]) -> int:
+    args = _build_participants_arg_parser().parse_args(argv)
+    result = run_participant_batch(
+        input_dir=args.input_dir,
+        output_dir=args.output_dir,
+        pattern=args.pattern,
+        sequence_type=args.sequence_type,
+        gamma=args.gamma,
+        C=args.coupling,
+        session_coupling=args.session_coupling,
+        n_iter=args.n_iter,
+        random_state=args.seed,
+        limit=args.limit,
+        n_jobs=args.jobs,
+        engine=args.engine,
+        adaptive=args.adaptive,
+        patience=args.patience,
+        agreement=args.agreement,
+        time_budget=args.time_budget,
+        consensus=args.consensus,
+        dataset_dir=args.dataset_dir,
+        participant_timeout=args.participant_timeout,
+        expected_presses_per_block=args.presses_per_block,
+        min_presses=args.min_presses,
+    )
+    print("Participant analysis complete:")
+    print(f"- participants: {result['n_participants_total']}")
+    print(f"- rows:         {result['n_rows']}")
+    print(f"- errors:       {result['n_errors']}")
+    print(f"- summary:      {result['summary_path']}")
+    print(f"- trials:       {result['trials_path']}")
+    print(f"- sessions:     {result['sessions_path']}")
+    return 0
+
+
+def _build_merge_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="chunking merge",
+        description="Merge the outputs of sharded batch runs into the standard output files.",
+    )
+    parser.add_argument("--output-dir", default="outputs", help="Directory holding the shard_*_of_* outputs.")
+    parser.add_argument(
+        "--shard-dirs",
+        nargs="+",
+        default=None,
+        help="Shard output directories (default: <output-dir>/shard_*_of_*).",
+    )
+    return parser
+
+
+def _merge_main(argv: list[str]) -> int:
+    args = _build_merge_arg_parser().parse_args(argv)
+    try:
+        result = merge_shard_outputs(args.output_dir, shard_dirs=args.shard_dirs)
+    except (ValueError, FileNotFoundError) as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    print(f"Merged {result['n_shards']} shards:")
+    print(f"- total files:   {result['n_files_total']}")
+    print(f"- success files: {result['n_files_success']}")
+    print(f"- failed files:  {result['n_files_failed']}")
+    print(f"- summary:       {result['summary_path']}")
+    print(f"- trials:        {result['trials_path']}")
+    print(f"- errors:        {result['errors_path']}")
+    return 0
+
+
+def _build_summarize_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="chunking summarize",
+        description="Summarise the outputs of a batch run per sequence type.",
+    )
+    parser.add_argument("--output-dir", default="outputs", help="Directory holding the batch outputs.")
+    parser.add_argument("--alpha", type=float, default=0.05, help="Significance level for the p-value share.")
+    return parser
+
+
+def _summarize_main(argv: list[str]) -> int:
+    args = _build_summarize_arg_parser().parse_args(argv)
+    try:
+        result = summarize_outputs(args.output_dir, alpha=args.alpha)
+    except FileNotFoundError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    print(f"Outputs in {args.output_dir}:")
+    print(f"- analysed files: {result['n_files']} ({result['n_rows']} file x sequence rows)")
+    print(f"- failed rows:    {result['n_failed']}")
+    if not result["by_sequence"].empty:
+        print(result["by_sequence"].to_string(float_format=lambda v: f"{v:.4f}"))
+    if result["timings"] and result["timings"].get("stages"):
+        timings = result["timings"]
+        print(f"Timings: {timings['total_seconds']:.1f}s analysis over {timings['n_rows']} rows")
+        for stage, values in timings["stages"].items():
+            print(f"- {stage:<20} {values['total']:10.1f}s {values['share']:6.1%}")
+    return 0
+
+
+def _run_main(argv: list[str]) -> int:
     parser = _build_arg_parser()
     args = parser.parse_args(argv)
 
@@ -614,30 +3939,86 @@ def main(argv: list[str] | None = None) -> int:
         n_permutations=args.n_permutations,
         random_state=args.seed,
         limit=args.limit,
+        n_jobs=args.jobs,
+        engine=args.engine,
+        early_stopping=args.early_stopping,
+        alpha=args.alpha,
+        adaptive=args.adaptive,
+        patience=args.patience,
+        agreement=args.agreement,
+        time_budget=args.time_budget,
+        dataset_dir=args.dataset_dir,
+        use_cache=not args.no_cache,
+        cache_dir=args.cache_dir,
+        cache_max_bytes=parse_size(args.cache_max_size),
+        resume=args.resume,
+        profile_top=args.profile,
+        shard=args.shard,
+        output_format=args.output_format,
+        consensus=args.consensus,
+        prefetch=args.prefetch,
+        results_store=args.results_store,
+        master_table=args.master_table,
+        file_budget=args.file_budget,
+        file_timeout=args.file_timeout,
+        expected_presses_per_block=args.presses_per_block,
+        min_presses=args.min_presses,
     )
 
     print("Batch chunking analysis complete:")
     print(f"- total files:   {result['n_files_total']}")
     print(f"- success files: {result['n_files_success']}")
     print(f"- failed files:  {result['n_files_failed']}")
+    print(f"- cached files:  {result['n_files_cached']}")
+    if args.file_budget is not None or args.file_timeout is not None:
+        print(f"- over budget:   {result['n_files_budget_exhausted']}")
+        print(f"- timed out:     {result['n_files_timed_out']}")
     print(f"- summary:       {result['summary_path']}")
     print(f"- trials:        {result['trials_path']}")
     print(f"- errors:        {result['errors_path']}")
+    print(f"- timings:       {result['timings_path']}")
     print(f"- params:        {result['params_path']}")
+    if result["results_store_run_id"] is not None:
+        print(f"- results store: {args.results_store} (run {result['results_store_run_id']})")
     return 0
 
 
+def main(argv: list[str] | None = None) -> int:
+    """Command-line entry point; see `src.cli` for the subcommands."""
+    from .cli import main as cli_main
+
+    return cli_main(argv)
+
 __all__ = [
     "ChunkingParameters",
     "load_srt_file",
     "extract_ikis",
+    "extract_ikis_batch",
+    "ChainGraphFactory",
+    "chain_graph_factory",
     "build_trial_network",
     "run_multilayer_community_detection",
     "compute_single_trial_modularity",
+    "compute_chain_weights",
+    "compute_single_trial_modularity_batch",
     "compute_chunk_metrics",
+    "multilayer_modularity",
+    "module_allegiance",
+    "consensus_partition",
+    "decode_boundary_mask",
+    "unpack_trial_arrays",
     "statistical_validation",
     "run_full_analysis",
+    "order_sessions",
+    "group_participant_files",
+    "run_participant_analysis",
     "run_batch_analysis",
+    "shard_files",
+    "merge_shard_outputs",
+    "summarize_outputs",
+    "run_parameter_sweep",
+    "run_batch_sweep",
+    "run_participant_batch",
     "main",
 ]
 
@@ -0,0 +1,76 @@
+"""
+Command-line interface: `python -m src <command> [options]`.
+
+Only the standard library is imported here. A command's module is imported
+when the command runs, and the analysis modules load the graph stack
+(igraph, leidenalg, scipy) only when community detection or statistics
+actually run, so `--help`, `summarize`, `merge`, `cache`, `store` and `ingest`
+start quickly and work without those packages.
+"""
+from __future__ import annotations
+
+import sys
+from importlib import import_module
+from types import ModuleType
+
+# command -> (module, handler taking the remaining argv, one-line help)
+COMMANDS: dict[str, tuple[str, str, str]] = {
+    "run": ("src.chunking", "_run_main", "Analyse a folder of SRT files (the default command)."),
+    "sweep": ("src.chunking", "_sweep_main", "Evaluate a gamma x coupling grid per file."),
+    "participants": ("src.chunking", "_participants_main", "Analyse each participant's sessions as one network."),
+    "ingest": ("src.chunking", "_ingest_main", "Convert SRT CSV files into a typed Parquet dataset."),
+    "merge": ("src.chunking", "_merge_main", "Merge the outputs of sharded batch runs."),
+    "online": ("src.online", "_online_main", "Follow a session's CSV while it is recorded."),
+    "summarize": ("src.chunking", "_summarize_main", "Summarise the outputs of a batch run."),
+    "cache": ("src.chunking", "_cache_main", "Inspect or prune the per-file result cache."),
+    "store": ("src.results_store", "_store_main", "Import batch outputs into the results store and query it."),
+}
+DEFAULT_COMMAND = "run"
+
+
+def _usage() -> str:
+    lines = [
+        "usage: chunking [command] [options]",
+        "",
+        "SRTT chunking analysis (Wymbs/Mucha multilayer community detection).",
+        "",
+        "commands:",
+    ]
+    lines += [f"  {name:<13} {help_text}" for name, (_, _, help_text) in COMMANDS.items()]
+    lines += [
+        "",
+        f"Without a command, the options are passed to `{DEFAULT_COMMAND}`.",
+        "Run `chunking <command> --help` for the options of a command.",
+    ]
+    return "\n".join(lines)
+
+
+def _load_module(module_name: str) -> ModuleType:
+    main_module = sys.modules.get("__main__")
+    if getattr(getattr(main_module, "__spec__", None), "name", None) == module_name:
+        # `python -m src.chunking` runs the module as __main__; do not import it a second time.
+        return main_module
+    return import_module(module_name)
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in ("-h", "--help", "help"):
+        print(_usage())
+        return 0
+    if argv and argv[0] in COMMANDS:
+        command, argv = argv[0], argv[1:]
+    elif argv and not argv[0].startswith("-"):
+        print(f"chunking: unknown command {argv[0]!r}\n\n{_usage()}", file=sys.stderr)
+        return 2
+    else:
+        command = DEFAULT_COMMAND
+    module_name, handler, _ = COMMANDS[command]
+    return getattr(_load_module(module_name), handler)(argv)
+
+
+__all__ = ["COMMANDS", "main"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
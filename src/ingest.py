@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import tempfile
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from .result_cache import file_content_hash
+
+REQUIRED_COLUMNS = [
+    "BlockNumber",
+    "EventNumber",
+    "Time Since Block start",
+    "isHit",
+    "target",
+    "pressed",
+    "sequence",
+]
+NUMERIC_COLUMNS = REQUIRED_COLUMNS[:-1]
+# Columns `extract_ikis` needs; used for column projection when reading Parquet.
+ANALYSIS_COLUMNS = ["BlockNumber", "EventNumber", "Time Since Block start", "isHit", "sequence"]
+
+_FILENAME_RE = re.compile(
+    r"^(?P<participant>.+?)_(?P<date>\d{8,})_FRA_(?P<session>\d+)(?:_.*)?$",
+    flags=re.IGNORECASE,
+)
+_MANIFEST_NAME = "manifest.json"
+_DATA_DIR = "data"
+
+
+def normalize_file_name(name: str) -> str:
+    """NFC-normalise a file name so decomposed and composed umlauts compare equal."""
+    return unicodedata.normalize("NFC", name)
+
+
+def is_srt_csv(path: str | Path) -> bool:
+    """True for SRT CSV files, False for e.g. `*.csv:Zone.Identifier` alternate-stream copies."""
+    path = Path(path)
+    return path.suffix.lower() == ".csv" and ":" not in path.name
+
+
+def parse_srt_filename(filepath: str | Path) -> dict[str, Any]:
+    """
+    Parse participant, recording date and session number from an SRT file name.
+
+    `VR_ML_016_Anna_Schneider_20240129_FRA_1_fertig.csv` gives
+    participant `VR_ML_016_Anna_Schneider`, date 2024-01-29 and session 1.
+    Stray spaces around underscores are removed from the participant. Fields
+    that cannot be parsed (e.g. a mistyped date) are None.
+    """
+    stem = normalize_file_name(Path(filepath).stem)
+    match = _FILENAME_RE.match(stem)
+    if match is None:
+        return {"participant": None, "session": None, "date": None}
+    participant = re.sub(r"\s*_\s*", "_", match["participant"]).strip()
+    try:
+        recorded = datetime.strptime(match["date"], "%Y%m%d").date()
+    except ValueError:
+        recorded = None
+    return {"participant": participant, "session": int(match["session"]), "date": recorded}
+
+
+def read_srt_csv(filepath: str | Path) -> pd.DataFrame:
+    """Read one SRT CSV file and coerce key columns into numeric types."""
+    path = Path(filepath)
+    if not path.exists():
+        raise FileNotFoundError(f"SRT file not found: {path}")
+
+    return clean_srt_frame(pd.read_csv(path, sep=";", decimal=","))
+
+
+def clean_srt_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Check and type the columns of raw SRT rows, as `read_srt_csv` does.
+
+    Rows with a missing or non-numeric key value are dropped; also used for
+    the partial rows of a CSV that is still being written.
+    """
+    df.columns = [str(c).strip() for c in df.columns]
+
+    if missing := [c for c in REQUIRED_COLUMNS if c not in df.columns]:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    for col in NUMERIC_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    df["sequence"] = df["sequence"].astype(str).str.strip().str.lower()
+    df = df.dropna(subset=NUMERIC_COLUMNS + ["sequence"]).reset_index(drop=True)
+    df["BlockNumber"] = df["BlockNumber"].astype(int)
+    df["EventNumber"] = df["EventNumber"].astype(int)
+    df["isHit"] = df["isHit"].astype(int)
+    return df
+
+
+def _to_typed_table(df: pd.DataFrame, source: Path, content_hash: str) -> Any:
+    import pyarrow as pa
+
+    for col in ("target", "pressed"):
+        values = df[col].to_numpy(dtype=float)
+        if not np.array_equal(values, np.round(values)):
+            raise ValueError(f"Column {col!r} contains non-integer values.")
+    meta = parse_srt_filename(source)
+    n_rows = len(df)
+    return pa.table(
+        {
+            "BlockNumber": pa.array(df["BlockNumber"].to_numpy(), pa.int32()),
+            "EventNumber": pa.array(df["EventNumber"].to_numpy(), pa.int32()),
+            "Time Since Block start": pa.array(df["Time Since Block start"].to_numpy(dtype=float)),
+            "isHit": pa.array(df["isHit"].to_numpy(), pa.int8()),
+            "target": pa.array(df["target"].to_numpy(), pa.int16()),
+            "pressed": pa.array(df["pressed"].to_numpy(), pa.int16()),
+            "sequence": pa.array(df["sequence"].to_numpy(dtype=object), pa.string()),
+            "source_file": pa.array([normalize_file_name(source.name)] * n_rows, pa.string()),
+            "participant": pa.array([meta["participant"]] * n_rows, pa.string()),
+            "session": pa.array([meta["session"]] * n_rows, pa.int16()),
+            "date": pa.array([meta["date"]] * n_rows, pa.date32()),
+        },
+        metadata={"content_sha256": content_hash},
+    )
+
+
+class SRTDataset:
+    """
+    Parquet copy of an SRT CSV folder.
+
+    Layout: `<dataset_dir>/data/<csv stem>.parquet` holds the cleaned rows of
+    one CSV (one fragment per source file) with typed columns plus
+    `source_file`, `participant`, `session` and `date`;
+    `<dataset_dir>/manifest.json` maps each source file name to its fragment,
+    size, mtime and content hash so updates are incremental.
+    """
+
+    def __init__(self, dataset_dir: str | Path) -> None:
+        self.dataset_dir = Path(dataset_dir)
+        self.manifest_path = self.dataset_dir / _MANIFEST_NAME
+        self._manifest: dict[str, dict[str, Any]] | None = None
+
+    @property
+    def manifest(self) -> dict[str, dict[str, Any]]:
+        if self._manifest is None:
+            if self.manifest_path.exists():
+                self._manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            else:
+                self._manifest = {}
+        return self._manifest
+
+    def _write_manifest(self) -> None:
+        self.dataset_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.dataset_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=1, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_name, self.manifest_path)
+
+    def update(self, input_dir: str | Path, pattern: str = "*.csv", prune: bool = True) -> dict[str, Any]:
+        """
+        Bring the dataset in line with the CSV files in `input_dir`.
+
+        Files with unchanged size and mtime are skipped without reading them;
+        files whose content hash is unchanged only get their stat refreshed.
+        With `prune`, fragments of CSV files that no longer exist in
+        `input_dir` are removed, whether or not their names match `pattern`.
+        """
+        import pyarrow.parquet as pq
+
+        files = sorted(p for p in Path(input_dir).glob(pattern) if is_srt_csv(p))
+        data_dir = self.dataset_dir / _DATA_DIR
+        data_dir.mkdir(parents=True, exist_ok=True)
+        report: dict[str, Any] = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0, "errors": {}}
+        seen: set[str] = set()
+
+        try:
+            for path in files:
+                name = normalize_file_name(path.name)
+                seen.add(name)
+                stat = path.stat()
+                entry = self.manifest.get(name)
+                if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                    report["unchanged"] += 1
+                    continue
+                content_hash = file_content_hash(path)
+                if entry and entry["sha256"] == content_hash:
+                    entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                    report["unchanged"] += 1
+                    continue
+                try:
+                    table = _to_typed_table(read_srt_csv(path), path, content_hash)
+                except (ValueError, OSError, pd.errors.ParserError) as exc:
+                    report["errors"][name] = str(exc)
+                    continue
+                fragment = Path(_DATA_DIR) / f"{Path(name).stem}.parquet"
+                pq.write_table(table, self.dataset_dir / fragment)
+                self.manifest[name] = {
+                    "fragment": fragment.as_posix(),
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "sha256": content_hash,
+                    "n_rows": table.num_rows,
+                }
+                report["updated" if entry else "added"] += 1
+
+            if prune:
+                # Entries outside `pattern` stay as long as their CSV is still in `input_dir`.
+                present = {normalize_file_name(p.name) for p in Path(input_dir).glob("*") if is_srt_csv(p)}
+                for name in sorted(set(self.manifest) - seen - present):
+                    (self.dataset_dir / self.manifest.pop(name)["fragment"]).unlink(missing_ok=True)
+                    report["removed"] += 1
+        finally:
+            self._write_manifest()
+        return report
+
+    def fragment_path(self, filepath: str | Path) -> Path | None:
+        """
+        Fragment for `filepath` if the dataset holds an up-to-date copy of it.
+
+        A copy is up to date when the CSV no longer exists or still has the
+        size and mtime recorded at ingest time.
+        """
+        entry = self.manifest.get(normalize_file_name(Path(filepath).name))
+        if entry is None:
+            return None
+        path = Path(filepath)
+        if path.exists():
+            stat = path.stat()
+            if entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+                return None
+        return self.dataset_dir / entry["fragment"]
+
+    def load(self, filepath: str | Path, columns: list[str] | None = None) -> pd.DataFrame | None:
+        """Read the cleaned rows of one source file (memory-mapped), or None if not up to date."""
+        import pyarrow.parquet as pq
+
+        fragment = self.fragment_path(filepath)
+        if fragment is None or not fragment.exists():
+            return None
+        return pq.read_table(fragment, columns=columns, memory_map=True).to_pandas()
+
+    def to_arrow_dataset(self) -> Any:
+        """The whole dataset as a `pyarrow.dataset.Dataset` for filtered, projected scans."""
+        import pyarrow.dataset as pads
+
+        return pads.dataset(self.dataset_dir / _DATA_DIR, format="parquet")
+
+
+def ingest_srt_folder(
+    input_dir: str | Path = "SRT",
+    dataset_dir: str | Path = "outputs/srt_dataset",
+    pattern: str = "*.csv",
+    prune: bool = True,
+) -> dict[str, Any]:
+    """Convert (or incrementally update) a folder of SRT CSV files into an `SRTDataset`."""
+    return SRTDataset(dataset_dir).update(input_dir, pattern=pattern, prune=prune)
+
+
+__all__ = [
+    "ANALYSIS_COLUMNS",
+    "SRTDataset",
+    "clean_srt_frame",
+    "ingest_srt_folder",
+    "is_srt_csv",
+    "parse_srt_filename",
+    "read_srt_csv",
+]
@@ -0,0 +1,490 @@
+"""
+Online chunking analysis of an SRT session while it is being recorded.
+
+`OnlineChunkingAnalyzer` accepts rows as they arrive and adds every
+completed block as a new layer. It keeps the outlier statistics of
+`extract_ikis` as running moments and re-optimises only the newest layers,
+warm-started from the previous partition. `tail_srt_csv` follows a CSV that
+is still being written, and `replay_srt_file` feeds a finished file row by
+row (see `benchmarks/replay_online.py`).
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator
+
+import numpy as np
+import pandas as pd
+
+from .chunking import (
+    DEFAULT_COUPLING,
+    DEFAULT_GAMMA,
+    ENGINES,
+    EXPECTED_PRESSES_PER_BLOCK,
+    SEQUENCE_TYPES,
+    _import_igraph,
+    _import_leidenalg,
+    _leiden_temporal_from,
+    build_trial_network,
+    compute_chunk_metrics,
+    multilayer_modularity,
+    run_multilayer_community_detection,
+)
+from .ingest import clean_srt_frame, read_srt_csv
+
+if TYPE_CHECKING:  # pragma: no cover - annotations only
+    import igraph as ig
+
+DEFAULT_WINDOW = 8
+
+
+class RunningMoments:
+    """
+    Per-position mean and population variance of a changing set of vectors.
+
+    Vectors can be added and removed again (Welford's update and its
+    inverse), so the statistics never need a pass over all vectors.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.n = 0
+        self.mean = np.zeros(size, dtype=float)
+        self._m2 = np.zeros(size, dtype=float)
+
+    def add(self, x: np.ndarray) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean = self.mean + delta / self.n
+        self._m2 = self._m2 + delta * (x - self.mean)
+
+    def remove(self, x: np.ndarray) -> None:
+        if self.n <= 1:
+            self.__init__(self.mean.size)
+            return
+        old_mean = self.mean
+        self.n -= 1
+        self.mean = (old_mean * (self.n + 1) - x) / self.n
+        self._m2 = np.maximum(self._m2 - (x - old_mean) * (x - self.mean), 0.0)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self._m2 / self.n) if self.n else np.zeros_like(self.mean)
+
+
+def _match_labels(
+    labels: np.ndarray,
+    previous: np.ndarray,
+    weights: np.ndarray,
+    next_label: int,
+) -> tuple[np.ndarray, int]:
+    """
+    Rename the communities of a new solution after the ones they continue.
+
+    `previous` holds the earlier labels of the same cells (-1 for new
+    cells). Communities are matched one-to-one by `weights`-weighted overlap;
+    unmatched ones get fresh ids from `next_label` on. Returns the renamed
+    labels and the next free id.
+    """
+    from scipy.optimize import linear_sum_assignment
+
+    new_ids, new_codes = np.unique(labels, return_inverse=True)
+    new_codes = new_codes.reshape(labels.shape)
+    mapping = np.full(new_ids.size, -1, dtype=np.int64)
+    known = previous >= 0
+    if known.any():
+        old_ids, old_codes = np.unique(previous[known], return_inverse=True)
+        overlap = np.zeros((new_ids.size, old_ids.size), dtype=float)
+        np.add.at(overlap, (new_codes[known], old_codes), weights[known])
+        rows, cols = linear_sum_assignment(overlap, maximize=True)
+        matched = overlap[rows, cols] > 0
+        mapping[rows[matched]] = old_ids[cols[matched]]
+    unmatched = mapping < 0
+    mapping[unmatched] = next_label + np.arange(int(unmatched.sum()))
+    return mapping[new_codes], next_label + int(unmatched.sum())
+
+
+class OnlineChunkingAnalyzer:
+    """
+    Incremental multilayer chunking of one sequence type during a session.
+
+    Feed rows (typed like `read_srt_csv` output) with `add_rows`. A block is
+    complete once a row of a later block arrives (or on `finish`); rows that
+    arrive for a completed block revise it. Valid blocks are those
+    `extract_ikis` accepts, and the 3-SD outlier filter uses running
+    per-position moments, so after `finish` the layers equal
+    `extract_ikis` on the whole file.
+
+    Each update re-optimises only the layers within `window` of a new or
+    revised layer (or of a gap left by a layer the outlier filter dropped),
+    warm-started from the previous partition, with the layers on either side
+    fixed as anchors; a new block therefore costs one Leiden run on `window`
+    layers however long the session is. With `engine="chain_dp"` every
+    update is an exact re-solve of all layers, which is cheap. Community ids
+    stay stable across updates. `resolve` runs a full re-optimisation with
+    restarts, e.g. at the end of a session.
+    """
+
+    def __init__(
+        self,
+        sequence_type: str = "blue",
+        gamma: float = DEFAULT_GAMMA,
+        C: float = DEFAULT_COUPLING,
+        engine: str = "leiden",
+        window: int = DEFAULT_WINDOW,
+        random_state: int | None = None,
+        expected_presses_per_block: int = EXPECTED_PRESSES_PER_BLOCK,
+    ) -> None:
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}; expected one of {ENGINES}.")
+        if window < 1:
+            raise ValueError("window must be at least 1.")
+        self.sequence_type = sequence_type.lower().strip()
+        self.gamma = gamma
+        self.C = C
+        self.engine = engine
+        self.window = window
+        self.expected_presses_per_block = expected_presses_per_block
+        self._rng = np.random.default_rng(random_state)
+        # Load the graph stack now rather than during the first update.
+        _import_igraph()
+        if engine == "leiden":
+            _import_leidenalg()
+        import scipy.optimize  # noqa: F401
+
+        self._presses: dict[int, list[tuple[int, float]]] = {}
+        self._closed: set[int] = set()
+        self._last_block: int | None = None
+        self._valid: dict[int, np.ndarray] = {}
+        self._moments = RunningMoments(expected_presses_per_block - 1)
+        self._graphs: dict[int, ig.Graph] = {}
+
+        self.block_ids: list[int] = []
+        self._labels = np.empty((0, expected_presses_per_block - 1), dtype=np.int64)
+        self._next_label = 0
+        self.quality = float("nan")
+        self.metrics: pd.DataFrame | None = None
+        self.n_updates = 0
+
+    def add_rows(self, rows: pd.DataFrame) -> dict[str, Any] | None:
+        """Add newly recorded rows; returns an update dict when blocks were completed or revised."""
+        if rows.empty:
+            return None
+        blocks = rows["BlockNumber"].to_numpy()
+        target = (rows["isHit"].to_numpy() == 1) & (
+            rows["sequence"].astype(str).str.strip().str.lower().to_numpy() == self.sequence_type
+        )
+        events = rows["EventNumber"].to_numpy()
+        times = rows["Time Since Block start"].to_numpy(dtype=float)
+        for block, event, t in zip(blocks[target], events[target], times[target]):
+            self._presses.setdefault(int(block), []).append((int(event), float(t)))
+        last = int(blocks.max())
+        self._last_block = last if self._last_block is None else max(self._last_block, last)
+        touched = {int(b) for b in blocks[target]}
+        return self._update(touched, close_all=False)
+
+    def finish(self) -> dict[str, Any] | None:
+        """Complete the blocks still open at the end of the session."""
+        return self._update(set(), close_all=True)
+
+    def result(self) -> dict[str, Any]:
+        """Current state in the shape of the corresponding `run_full_analysis` entries."""
+        return {
+            "sequence_type": self.sequence_type,
+            "n_blocks": len(self.block_ids),
+            "block_ids": list(self.block_ids),
+            "ikis": {b: self._valid[b] for b in self.block_ids},
+            "partition_map": {b: self._labels[i].tolist() for i, b in enumerate(self.block_ids)},
+            "quality": self.quality,
+            "metrics": self.metrics,
+        }
+
+    def resolve(self, n_iter: int = 20) -> dict[str, Any]:
+        """Re-optimise all layers with `n_iter` restarts, the first warm-started from the current partition."""
+        if not self.block_ids:
+            raise ValueError(f"No valid blocks found for sequence='{self.sequence_type}'.")
+        start = time.perf_counter()
+        graphs = [self._graph(b) for b in self.block_ids]
+        _, initial = np.unique(self._labels, return_inverse=True)
+        out = run_multilayer_community_detection(
+            graphs,
+            gamma=self.gamma,
+            C=self.C,
+            n_iter=n_iter,
+            random_state=int(self._rng.integers(0, 2**31 - 1)),
+            engine=self.engine,
+            initial_memberships=initial.reshape(self._labels.shape),
+        )
+        labels = np.asarray(out["best_memberships"], dtype=np.int64)
+        labels, self._next_label = _match_labels(labels, self._labels, np.ones(labels.shape), self._next_label)
+        self._finalise(labels)
+        return self._report([], len(self.block_ids), start)
+
+    def _graph(self, block: int) -> ig.Graph:
+        if block not in self._graphs:
+            self._graphs[block] = build_trial_network(self._valid[block])
+        return self._graphs[block]
+
+    def _block_ikis(self, block: int) -> np.ndarray | None:
+        presses = sorted(self._presses.get(block, ()))
+        if len(presses) != self.expected_presses_per_block:
+            return None
+        ikis = np.diff([t for _, t in presses])
+        return ikis if np.all(ikis > 0) else None
+
+    def _kept_blocks(self) -> list[int]:
+        ids = sorted(self._valid)
+        if not ids:
+            return []
+        ikis = np.vstack([self._valid[b] for b in ids])
+        std = self._moments.std
+        z_scores = np.abs(ikis - self._moments.mean) / np.where(std == 0, np.nan, std)
+        keep = (np.nan_to_num(z_scores, nan=0.0) <= 3.0).all(axis=1)
+        return [b for b, k in zip(ids, keep) if k]
+
+    def _update(self, touched: set[int], close_all: bool) -> dict[str, Any] | None:
+        start = time.perf_counter()
+        newly_closed = {
+            b for b in self._presses if b not in self._closed and (close_all or b < self._last_block)
+        }
+        revised = touched & self._closed
+        self._closed |= newly_closed
+        changed = newly_closed | revised
+        if not changed:
+            return None
+
+        for block in changed:
+            old = self._valid.pop(block, None)
+            if old is not None:
+                self._moments.remove(old)
+                self._graphs.pop(block, None)
+            ikis = self._block_ikis(block)
+            if ikis is not None:
+                self._valid[block] = ikis
+                self._moments.add(ikis)
+
+        kept = self._kept_blocks()
+        position = {b: i for i, b in enumerate(self.block_ids)}
+        labels = np.full((len(kept), self._labels.shape[1]), -1, dtype=np.int64)
+        dirty = []
+        for i, block in enumerate(kept):
+            if block not in position or block in revised:
+                dirty.append(i)
+                continue
+            labels[i] = self._labels[position[block]]
+            # A layer whose predecessor was removed from the layers has a new neighbour.
+            predecessor = position.get(kept[i - 1], -2) if i > 0 else -1
+            if predecessor != position[block] - 1:
+                dirty.append(i)
+        if not dirty and kept == self.block_ids:
+            return self._report(sorted(newly_closed), 0, start)
+
+        self.block_ids = kept
+        if not kept:
+            self._finalise(labels)
+            return self._report(sorted(newly_closed), 0, start)
+
+        if self.engine == "chain_dp":
+            graphs = [self._graph(b) for b in kept]
+            out = run_multilayer_community_detection(graphs, gamma=self.gamma, C=self.C, engine="chain_dp")
+            solved = np.asarray(out["best_memberships"], dtype=np.int64)
+            solved, self._next_label = _match_labels(solved, labels, np.ones(labels.shape), self._next_label)
+            self._finalise(solved)
+            return self._report(sorted(newly_closed), len(kept), start)
+
+        self._fill_new_layers(labels)
+        ranges: list[tuple[int, int]] = []
+        for i in dirty:
+            lo, hi = max(0, i - self.window + 1), min(len(kept), i + self.window)
+            if ranges and lo <= ranges[-1][1]:
+                ranges[-1] = (ranges[-1][0], max(ranges[-1][1], hi))
+            else:
+                ranges.append((lo, hi))
+        for lo, hi in ranges:
+            labels[lo:hi] = self._optimise_range(labels, lo, hi)
+        self._finalise(labels)
+        return self._report(sorted(newly_closed), sum(hi - lo for lo, hi in ranges), start)
+
+    def _fill_new_layers(self, labels: np.ndarray) -> None:
+        """Start new layers from their predecessor's labels (the first known layer's at the front)."""
+        known = np.flatnonzero(labels[:, 0] >= 0)
+        if known.size == 0:
+            labels[:] = self._next_label + np.arange(labels.shape[1])
+            self._next_label += labels.shape[1]
+            return
+        labels[: known[0]] = labels[known[0]]
+        for i in range(known[0] + 1, labels.shape[0]):
+            if labels[i, 0] < 0:
+                labels[i] = labels[i - 1]
+
+    def _optimise_range(self, labels: np.ndarray, lo: int, hi: int) -> np.ndarray:
+        """Warm-started Leiden run on layers `lo..hi - 1`, with the layers on either side fixed as anchors."""
+        first, last = max(lo - 1, 0), min(hi + 1, labels.shape[0])
+        fixed = ([0] if lo > 0 else []) + ([last - first - 1] if hi < labels.shape[0] else [])
+        current = labels[first:last]
+        _, codes = np.unique(current, return_inverse=True)
+        memberships, _ = _leiden_temporal_from(
+            [self._graph(b) for b in self.block_ids[first:last]],
+            self.gamma,
+            self.C,
+            int(self._rng.integers(0, 2**31 - 1)),
+            codes.reshape(current.shape),
+            fixed_layers=fixed,
+        )
+        # Anchor cells dominate the matching, so the range continues the communities of the fixed layers.
+        weights = np.ones(current.shape)
+        weights[fixed] = current.size
+        solved, self._next_label = _match_labels(
+            np.asarray(memberships, dtype=np.int64), current, weights, self._next_label
+        )
+        return solved[lo - first : hi - first]
+
+    def _finalise(self, labels: np.ndarray) -> None:
+        self._labels = labels
+        if not self.block_ids:
+            self.quality, self.metrics = float("nan"), None
+            return
+        ikis = {b: self._valid[b] for b in self.block_ids}
+        iki_matrix = np.vstack([ikis[b] for b in self.block_ids])
+        self.quality = float(multilayer_modularity(iki_matrix, labels, self.gamma, self.C))
+        self.metrics = compute_chunk_metrics(ikis, labels)
+
+    def _report(self, blocks_added: list[int], layers_optimised: int, start: float) -> dict[str, Any]:
+        self.n_updates += 1
+        return {
+            "update": self.n_updates,
+            "blocks_added": blocks_added,
+            "n_blocks": len(self.block_ids),
+            "n_outliers": len(self._valid) - len(self.block_ids),
+            "layers_optimised": layers_optimised,
+            "quality": self.quality,
+            "metrics": self.metrics,
+            "seconds": time.perf_counter() - start,
+        }
+
+
+def replay_srt_file(
+    filepath: str | Path,
+    analyzer: OnlineChunkingAnalyzer,
+    rows_per_update: int = 1,
+) -> Iterator[dict[str, Any]]:
+    """Feed a recorded SRT file to `analyzer` `rows_per_update` rows at a time, yielding its updates."""
+    df = read_srt_csv(filepath)
+    for first in range(0, len(df), rows_per_update):
+        if (update := analyzer.add_rows(df.iloc[first : first + rows_per_update])) is not None:
+            yield update
+    if (update := analyzer.finish()) is not None:
+        yield update
+
+
+def tail_srt_csv(
+    filepath: str | Path,
+    analyzer: OnlineChunkingAnalyzer,
+    poll_interval: float = 0.5,
+    idle_timeout: float | None = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Follow an SRT CSV that is still being written and yield the analyser's updates.
+
+    Only complete lines are parsed; a partly written last line waits for the
+    next poll. Waits for the file to appear. Stops, completing the last
+    block, once no new line has arrived for `idle_timeout` seconds (never
+    if None).
+    """
+    path = Path(filepath)
+    header: str | None = None
+    offset = 0
+    partial = b""
+    last_data = time.monotonic()
+    while True:
+        chunk = b""
+        if path.exists():
+            with path.open("rb") as f:
+                f.seek(offset)
+                chunk = f.read()
+            offset += len(chunk)
+        lines = (partial + chunk).split(b"\n")
+        partial = lines.pop()
+        text = [line.decode("utf-8-sig").rstrip("\r") for line in lines]
+        text = [line for line in text if line.strip()]
+        if text:
+            last_data = time.monotonic()
+            if header is None:
+                header, text = text[0], text[1:]
+        if text:
+            rows = clean_srt_frame(pd.read_csv(io.StringIO("\n".join([header, *text])), sep=";", decimal=","))
+            if (update := analyzer.add_rows(rows)) is not None:
+                yield update
+        elif idle_timeout is not None and time.monotonic() - last_data >= idle_timeout:
+            if (update := analyzer.finish()) is not None:
+                yield update
+            return
+        else:
+            time.sleep(poll_interval)
+
+
+def _build_online_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="chunking online",
+        description="Follow an SRT CSV while it is recorded and report chunking after every block.",
+    )
+    parser.add_argument("file", help="SRT CSV file being written (or a finished one with --replay).")
+    parser.add_argument("--sequence-type", default="blue", choices=list(SEQUENCE_TYPES))
+    parser.add_argument("--gamma", type=float, default=DEFAULT_GAMMA, help="Intralayer resolution parameter.")
+    parser.add_argument("--coupling", type=float, default=DEFAULT_COUPLING, help="Interlayer coupling parameter.")
+    parser.add_argument("--engine", default="leiden", choices=list(ENGINES), help="Community-detection engine.")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="Layers re-optimised per update.")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed.")
+    parser.add_argument("--poll", type=float, default=0.5, help="Seconds between checks for new rows.")
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=None,
+        help="Finish after this many seconds without new rows (default: follow until interrupted).",
+    )
+    parser.add_argument("--replay", action="store_true", help="Replay a finished file row by row.")
+    parser.add_argument("--output", default=None, help="CSV file for the final per-trial metrics.")
+    return parser
+
+
+def _online_main(argv: list[str]) -> int:
+    args = _build_online_arg_parser().parse_args(argv)
+    analyzer = OnlineChunkingAnalyzer(
+        sequence_type=args.sequence_type,
+        gamma=args.gamma,
+        C=args.coupling,
+        engine=args.engine,
+        window=args.window,
+        random_state=args.seed,
+    )
+    if args.replay:
+        updates = replay_srt_file(args.file, analyzer)
+    else:
+        updates = tail_srt_csv(args.file, analyzer, poll_interval=args.poll, idle_timeout=args.idle_timeout)
+    try:
+        for update in updates:
+            metrics = update["metrics"]
+            latest = metrics.iloc[-1] if metrics is not None and len(metrics) else None
+            print(
+                f"[{update['update']}] blocks_added={update['blocks_added']} n_blocks={update['n_blocks']} "
+                f"outliers={update['n_outliers']} quality={update['quality']:.4f} "
+                f"last_block_chunks={int(latest['n_chunks']) if latest is not None else '-'} "
+                f"seconds={update['seconds']:.3f}"
+            )
+    except KeyboardInterrupt:
+        analyzer.finish()
+    if args.output and analyzer.metrics is not None:
+        analyzer.metrics.to_csv(args.output, index=False)
+        print(f"Wrote {args.output}", file=sys.stderr)
+    return 0
+
+
+__all__ = [
+    "OnlineChunkingAnalyzer",
+    "RunningMoments",
+    "replay_srt_file",
+    "tail_srt_csv",
+]
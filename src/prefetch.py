@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator
+
+
+@dataclass(frozen=True)
+class Prefetched:
+    """One loaded item: `value` is the result of `load(item)`, or None with `error` set."""
+
+    item: Any
+    value: Any
+    error: BaseException | None
+    seconds: float
+
+
+_DONE = object()
+
+
+class PrefetchReader:
+    """
+    Load items in a background thread, at most `depth` ahead of the consumer.
+
+    Iterating yields a `Prefetched` per item, in input order, while the
+    reader thread already loads the next ones; exceptions raised by `load`
+    are passed on in `error` rather than raised. The queue is bounded, so
+    at most `depth` loaded items wait in memory. Stopping the iteration
+    early stops the thread.
+
+    `stats()` reports the seconds spent loading (`load_seconds`), the
+    seconds the consumer waited for an item (`wait_seconds`), and the load
+    time that overlapped with the consumer's work (`hidden_seconds`).
+    """
+
+    def __init__(self, items: Iterable[Any], load: Callable[[Any], Any], depth: int = 2) -> None:
+        if depth < 1:
+            raise ValueError("depth must be at least 1.")
+        self.items = list(items)
+        self.load = load
+        self.depth = depth
+        self.load_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.n_items = 0
+
+    def _produce(self, out: queue.Queue, stop: threading.Event) -> None:
+        for item in self.items:
+            start = time.perf_counter()
+            try:
+                value, error = self.load(item), None
+            except Exception as exc:  # passed on to the consumer
+                value, error = None, exc
+            if not self._put(out, stop, Prefetched(item, value, error, time.perf_counter() - start)):
+                return
+        self._put(out, stop, _DONE)
+
+    @staticmethod
+    def _put(out: queue.Queue, stop: threading.Event, value: Any) -> bool:
+        """Block until `value` is queued; False if the consumer stopped first."""
+        while not stop.is_set():
+            try:
+                out.put(value, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def __iter__(self) -> Iterator[Prefetched]:
+        out: queue.Queue = queue.Queue(maxsize=self.depth)
+        stop = threading.Event()
+        thread = threading.Thread(target=self._produce, args=(out, stop), name="prefetch-reader", daemon=True)
+        thread.start()
+        try:
+            while True:
+                start = time.perf_counter()
+                loaded = out.get()
+                self.wait_seconds += time.perf_counter() - start
+                if loaded is _DONE:
+                    return
+                self.load_seconds += loaded.seconds
+                self.n_items += 1
+                yield loaded
+        finally:
+            stop.set()
+            thread.join()
+
+    def stats(self) -> dict[str, float]:
+        hidden = max(self.load_seconds - self.wait_seconds, 0.0)
+        return {
+            "n_items": self.n_items,
+            "depth": self.depth,
+            "load_seconds": self.load_seconds,
+            "wait_seconds": self.wait_seconds,
+            "hidden_seconds": hidden,
+            "hidden_share": hidden / self.load_seconds if self.load_seconds > 0 else 0.0,
+        }
+
+
+__all__ = ["PrefetchReader", "Prefetched"]
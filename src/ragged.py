@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, Iterator, Mapping, Sequence
+
+import numpy as np
+
+
+class RaggedArray:
+    """
+    Rows of varying length stored as one flat `values` array and row `offsets`.
+
+    Row `i` is `values[offsets[i] : offsets[i + 1]]`; `offsets` has
+    `n_rows + 1` entries, starting at 0. Rows are returned as views, so
+    slicing a row never copies. Per-row reductions are done with
+    `np.*.reduceat` on `starts`, which requires non-empty rows.
+    """
+
+    __slots__ = ("values", "offsets")
+
+    def __init__(self, values: Any, offsets: Any) -> None:
+        self.values = np.asarray(values)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        if self.offsets.ndim != 1 or self.offsets.size == 0 or self.offsets[0] != 0:
+            raise ValueError("offsets must be a 1D array starting at 0.")
+        if self.offsets[-1] != self.values.shape[0] or np.any(np.diff(self.offsets) < 0):
+            raise ValueError("offsets must be non-decreasing and end at len(values).")
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Any], dtype: Any = float) -> RaggedArray:
+        arrays = [np.asarray(row, dtype=dtype).ravel() for row in rows]
+        offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([a.size for a in arrays])
+        values = np.concatenate(arrays) if arrays else np.empty(0, dtype=dtype)
+        return cls(values, offsets)
+
+    @classmethod
+    def from_dense(cls, matrix: Any) -> RaggedArray:
+        matrix = np.asarray(matrix)
+        if matrix.ndim != 2:
+            raise ValueError("matrix must be 2D.")
+        return cls(matrix.reshape(-1), np.arange(matrix.shape[0] + 1, dtype=np.int64) * matrix.shape[1])
+
+    @classmethod
+    def concat(cls, parts: Sequence[RaggedArray]) -> RaggedArray:
+        if not parts:
+            return cls(np.empty(0), np.zeros(1, dtype=np.int64))
+        shifts = np.cumsum([0] + [p.values.shape[0] for p in parts[:-1]])
+        offsets = np.concatenate([[0]] + [p.offsets[1:] + s for p, s in zip(parts, shifts)])
+        return cls(np.concatenate([p.values for p in parts]), offsets)
+
+    def __len__(self) -> int:
+        return self.offsets.size - 1
+
+    def row(self, i: int) -> np.ndarray:
+        return self.values[self.offsets[i] : self.offsets[i + 1]]
+
+    def rows(self) -> Iterator[np.ndarray]:
+        return (self.row(i) for i in range(len(self)))
+
+    @property
+    def starts(self) -> np.ndarray:
+        return self.offsets[:-1]
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    @property
+    def width(self) -> int:
+        """Length of the longest row (0 without rows)."""
+        return int(self.lengths.max()) if len(self) else 0
+
+    @property
+    def is_uniform(self) -> bool:
+        lengths = self.lengths
+        return bool(lengths.size == 0 or (lengths == lengths[0]).all())
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.values.nbytes + self.offsets.nbytes)
+
+    def row_index(self) -> np.ndarray:
+        """Row of every value."""
+        return np.repeat(np.arange(len(self)), self.lengths)
+
+    def column_index(self) -> np.ndarray:
+        """Position of every value within its row."""
+        return np.arange(self.values.shape[0]) - np.repeat(self.starts, self.lengths)
+
+    def with_values(self, values: Any) -> RaggedArray:
+        """The same row layout holding `values` (one per element)."""
+        return RaggedArray(values, self.offsets)
+
+    def take(self, rows: Any) -> RaggedArray:
+        """A new array holding the given rows, in that order."""
+        rows = np.asarray(rows, dtype=np.int64)
+        lengths = self.lengths[rows]
+        offsets = np.zeros(rows.size + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(lengths)
+        index = np.repeat(self.starts[rows] - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return RaggedArray(self.values[index], offsets)
+
+    def dense(self) -> np.ndarray:
+        """The rows as an (n_rows, length) matrix; requires equal lengths."""
+        if not self.is_uniform:
+            raise ValueError("Rows have different lengths; use padded() instead.")
+        width = self.width
+        return self.values.reshape(len(self), width) if len(self) else np.empty((0, 0), self.values.dtype)
+
+    def padded(self, fill: Any = np.nan, width: int | None = None) -> np.ndarray:
+        """The rows left-aligned in an (n_rows, width) matrix, shorter rows padded with `fill`."""
+        width = self.width if width is None else width
+        if width < self.width:
+            raise ValueError(f"width {width} is shorter than the longest row ({self.width}).")
+        dtype = np.result_type(self.values.dtype, np.min_scalar_type(fill) if np.isscalar(fill) else fill)
+        out = np.full((len(self), width), fill, dtype=dtype)
+        out[self.row_index(), self.column_index()] = self.values
+        return out
+
+    def length_groups(self) -> list[tuple[int, np.ndarray]]:
+        """`(length, rows)` for every distinct row length, so dense code can run per group."""
+        return length_groups(self.lengths)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(n_rows={len(self)}, n_values={self.values.shape[0]}, width={self.width})"
+
+
+class RaggedIKIs(RaggedArray, Mapping[int, np.ndarray]):
+    """
+    The IKIs of a file's blocks: a `RaggedArray` with a block number per row.
+
+    Behaves as a read-only mapping from block number to that block's IKIs
+    (a view into `values`), iterated in ascending block order, so code
+    written for a `{block: ikis}` dict keeps working while the IKIs live
+    in two flat arrays.
+    """
+
+    __slots__ = ("block_ids",)
+
+    def __init__(self, values: Any, offsets: Any, block_ids: Any) -> None:
+        super().__init__(np.asarray(values, dtype=float), offsets)
+        self.block_ids = np.asarray(block_ids, dtype=np.int64)
+        if self.block_ids.shape != (len(self),):
+            raise ValueError("block_ids must have one entry per row.")
+        if np.any(np.diff(self.block_ids) <= 0):
+            raise ValueError("block_ids must be strictly increasing.")
+
+    @classmethod
+    def from_dict(cls, ikis: Mapping[int, Any]) -> RaggedIKIs:
+        if isinstance(ikis, RaggedIKIs):
+            return ikis
+        block_ids = sorted(ikis)
+        ragged = RaggedArray.from_rows((ikis[b] for b in block_ids), dtype=float)
+        return cls(ragged.values, ragged.offsets, block_ids)
+
+    @classmethod
+    def from_ragged(cls, ragged: RaggedArray, block_ids: Any) -> RaggedIKIs:
+        return cls(ragged.values, ragged.offsets, block_ids)
+
+    def __getitem__(self, block: int) -> np.ndarray:
+        i = int(np.searchsorted(self.block_ids, block))
+        if i == len(self) or self.block_ids[i] != block:
+            raise KeyError(block)
+        return self.row(i)
+
+    def __iter__(self) -> Iterator[int]:
+        return (int(b) for b in self.block_ids)
+
+    def __contains__(self, block: object) -> bool:
+        try:
+            self[block]  # type: ignore[index]
+        except (KeyError, TypeError, ValueError):
+            return False
+        return True
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return _mapping_equal(self, other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    @property
+    def nbytes(self) -> int:
+        return super().nbytes + int(self.block_ids.nbytes)
+
+    def take(self, rows: Any) -> RaggedIKIs:
+        """The given rows, which must be in ascending order so blocks stay sorted."""
+        rows = np.asarray(rows, dtype=np.int64)
+        return RaggedIKIs.from_ragged(RaggedArray.take(self, rows), self.block_ids[rows])
+
+
+def _mapping_equal(left: Mapping[int, np.ndarray], right: Mapping[Any, Any]) -> bool:
+    if len(left) != len(right) or set(left) != set(right):
+        return False
+    return all(np.array_equal(left[k], right[k]) for k in left)
+
+
+def length_groups(lengths: Any) -> list[tuple[int, np.ndarray]]:
+    """Indices of equal `lengths`, as `(length, indices)` pairs in ascending length order."""
+    lengths = np.asarray(lengths)
+    order = np.argsort(lengths, kind="stable")
+    bounds = np.flatnonzero(np.diff(lengths[order])) + 1
+    return [(int(lengths[g[0]]), g) for g in np.split(order, bounds) if g.size]
+
+
+def pad_rows(rows: Sequence[Any], fill: Any = -1, width: int | None = None) -> np.ndarray:
+    """Stack rows of varying length into an (n_rows, width) array padded with `fill`."""
+    arrays = [np.asarray(row) for row in rows]
+    longest = max((a.size for a in arrays), default=0)
+    if all(a.size == longest for a in arrays) and (width is None or width == longest):
+        return np.stack(arrays) if arrays else np.empty((0, longest))
+    return RaggedArray.from_rows(arrays, dtype=np.result_type(*arrays)).padded(fill, width)
+
+
+__all__ = ["RaggedArray", "RaggedIKIs", "length_groups", "pad_rows"]
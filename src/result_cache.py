@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+_HASH_CHUNK_BYTES = 1 << 20
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def file_content_hash(filepath: str | Path) -> str:
+    """Return the SHA-256 hex digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with Path(filepath).open("rb") as f:
+        while chunk := f.read(_HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_size(text: str | int | None) -> int | None:
+    """Parse a size such as `500M` or `2G` (binary units) into bytes."""
+    if text is None or isinstance(text, int):
+        return text
+    value = str(text).strip().upper().removesuffix("B").removesuffix("I")
+    unit = value[-1] if value and value[-1] in _SIZE_UNITS else ""
+    number = value[: len(value) - len(unit)].strip()
+    try:
+        return int(float(number) * _SIZE_UNITS[unit])
+    except ValueError as exc:
+        raise ValueError(f"Invalid size: {text!r}") from exc
+
+
+class ResultCache:
+    """
+    Content-addressed on-disk cache of per-file analysis results.
+
+    Entries live under `<cache_dir>/v<algorithm_version>/<key[:2]>/<key>.pkl`.
+    A key combines the CSV content hash with every parameter that influences
+    the result, so edited files or changed parameters never hit stale entries.
+    Entries written by another algorithm version are ignored and removed by
+    `prune`. With `max_bytes` set, the least recently used entries are evicted
+    once a write takes the cache past the limit. The cache size is measured
+    on the first write and then tracked in memory, so a write only scans the
+    entries when it has to evict.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path,
+        algorithm_version: str,
+        max_bytes: int | None = None,
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.algorithm_version = str(algorithm_version)
+        self.max_bytes = max_bytes
+        self._size_bytes: int | None = None
+
+    @property
+    def version_dir(self) -> Path:
+        return self.cache_dir / f"v{self.algorithm_version}"
+
+    def make_key(self, content_hash: str, params: dict[str, Any]) -> str:
+        payload = json.dumps(
+            {
+                "content_hash": content_hash,
+                "params": params,
+                "algorithm_version": self.algorithm_version,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.version_dir / key[:2] / f"{key}.pkl"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return the cached payload for `key`, or None on a miss or unreadable entry."""
+        path = self._entry_path(key)
+        try:
+            with path.open("rb") as f:
+                payload = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, pickle.UnpicklingError):
+            path.unlink(missing_ok=True)
+            return None
+        # Refresh the access time used for LRU eviction.
+        os.utime(path)
+        return payload
+
+    def put(self, key: str, payload: dict[str, Any]) -> None:
+        """Store `payload` atomically so an interrupted run never leaves a torn entry."""
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if self.max_bytes is not None and self._size_bytes is None:
+            self._size_bytes = sum(st.st_size for _, st in self._entries())
+        try:
+            replaced_bytes = path.stat().st_size
+        except FileNotFoundError:
+            replaced_bytes = 0
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        if self.max_bytes is not None:
+            self._size_bytes += path.stat().st_size - replaced_bytes
+            if self._size_bytes > self.max_bytes:
+                self.prune(max_bytes=self.max_bytes, remove_stale=False)
+
+    def _entries(self) -> list[tuple[Path, os.stat_result]]:
+        if not self.version_dir.exists():
+            return []
+        return [(p, p.stat()) for p in self.version_dir.glob("*/*.pkl")]
+
+    def prune(self, max_bytes: int | None = None, remove_stale: bool = True) -> dict[str, int]:
+        """
+        Remove stale-version entries and evict least recently used entries.
+
+        Returns counts of removed entries and the remaining cache size in bytes.
+        """
+        removed_stale = 0
+        if remove_stale and self.cache_dir.exists():
+            for child in self.cache_dir.iterdir():
+                if child.is_dir() and child.name.startswith("v") and child != self.version_dir:
+                    removed_stale += sum(1 for _ in child.glob("*/*.pkl"))
+                    shutil.rmtree(child, ignore_errors=True)
+            if self.version_dir.exists():
+                for tmp in self.version_dir.glob("*/*.tmp"):
+                    tmp.unlink(missing_ok=True)
+
+        entries = sorted(self._entries(), key=lambda e: e[1].st_mtime)
+        total = sum(st.st_size for _, st in entries)
+        removed_lru = 0
+        if max_bytes is not None:
+            for path, st in entries:
+                if total <= max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= st.st_size
+                removed_lru += 1
+        self._size_bytes = total
+        return {"removed_stale": removed_stale, "removed_lru": removed_lru, "size_bytes": total}
+
+    def clear(self) -> None:
+        """Delete the whole cache directory, all versions included."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self._size_bytes = None
+
+    def info(self) -> dict[str, Any]:
+        entries = self._entries()
+        mtimes = [st.st_mtime for _, st in entries]
+        return {
+            "cache_dir": str(self.cache_dir),
+            "algorithm_version": self.algorithm_version,
+            "n_entries": len(entries),
+            "size_bytes": sum(st.st_size for _, st in entries),
+            "oldest_access": time.ctime(min(mtimes)) if mtimes else None,
+            "newest_access": time.ctime(max(mtimes)) if mtimes else None,
+        }
+
+
+__all__ = ["ResultCache", "file_content_hash", "parse_size"]
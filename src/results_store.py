@@ -0,0 +1,586 @@
+"""
+Indexed, append-only store of batch results (SQLite).
+
+`ResultsStore.add_run` imports the outputs of a finished (or merged) batch
+run into four tables:
+
+  - runs: one row per imported run, with its `chunking_params.json`
+  - files: one row per SRT file name, with participant, session and
+    recording date parsed from the name and, if a master table is given,
+    the participant's attributes (cohort, paradigm, age, sex, hand, and all
+    other columns as JSON in `attributes`)
+  - summaries: the `chunking_summary` rows, keyed by (run_id, file_id, sequence_type)
+  - trials: the `chunking_trials` rows, keyed the same way
+
+Rows are only ever added. Queries use, per file and sequence, the newest run
+that analysed it unless a `run_id` is given, so re-running part of the corpus
+supersedes older results without deleting them. Columns that appear in later
+runs (e.g. new `time_*` stages) are added to the tables as needed.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
+from .ingest import normalize_file_name, parse_srt_filename
+from .result_cache import file_content_hash
+
+MASTER_SHEET = "Mastertabelle"
+MASTER_ID_COLUMN = "Studien_ID"
+# files column -> master table column
+MASTER_COLUMNS = {
+    "cohort": "Gruppe.1",
+    "paradigm": "Paradigma",
+    "timepoint": "Teilnahmezeitpunkt",
+    "age": "Alter",
+    "sex": "Geschlecht",
+    "hand": "SRTTHand",
+}
+FILE_COLUMNS = ("file_name", "participant", "session", "recorded_on", "project", "study_id", *MASTER_COLUMNS)
+RUN_PARAM_COLUMNS = (
+    "algorithm_version", "gamma", "coupling", "engine", "n_iter", "n_permutations", "random_state"
+)
+TRAJECTORY_METRICS = ("mean_q_single_trial", "mean_phi_normalized", "mean_n_chunks", "p_value_permutation")
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    output_dir TEXT NOT NULL,
+    imported_at TEXT NOT NULL,
+    content_hash TEXT NOT NULL UNIQUE,
+    {", ".join(RUN_PARAM_COLUMNS)},
+    n_files INTEGER,
+    n_failed INTEGER,
+    params TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    file_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_name TEXT NOT NULL UNIQUE,
+    participant TEXT COLLATE NOCASE,
+    session INTEGER,
+    recorded_on TEXT,
+    project TEXT,
+    study_id TEXT COLLATE NOCASE,
+    {", ".join(MASTER_COLUMNS)},
+    attributes TEXT
+);
+CREATE INDEX IF NOT EXISTS files_participant ON files (participant, session);
+CREATE INDEX IF NOT EXISTS files_study_id ON files (study_id);
+CREATE TABLE IF NOT EXISTS summaries (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    file_id INTEGER NOT NULL REFERENCES files (file_id),
+    sequence_type TEXT NOT NULL,
+    PRIMARY KEY (run_id, file_id, sequence_type)
+);
+CREATE INDEX IF NOT EXISTS summaries_file ON summaries (file_id, sequence_type, run_id);
+CREATE TABLE IF NOT EXISTS trials (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    file_id INTEGER NOT NULL REFERENCES files (file_id),
+    sequence_type TEXT NOT NULL,
+    block_number INTEGER
+);
+CREATE INDEX IF NOT EXISTS trials_file ON trials (file_id, sequence_type, run_id);
+"""
+# Stringified per-trial lists written by early versions of the batch run.
+_LEGACY_LIST_COLUMNS = {"ikis": "iki", "community_labels": "label"}
+
+
+def _quote(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _sql_type(dtype: Any) -> str:
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+
+def _sql_value(value: Any) -> Any:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    if not isinstance(value, (int, float, str, bytes)):
+        return str(value)
+    return value
+
+
+def _project(participant: str | None) -> str | None:
+    """Leading non-numeric name parts of a participant (`VR_ML_016_Anna_Schneider` -> `VR_ML`)."""
+    if not participant:
+        return None
+    parts = []
+    for part in participant.split("_"):
+        if part.isdigit():
+            break
+        parts.append(part)
+    return "_".join(parts).upper() or None
+
+
+def match_study_id(participant: str | None, study_ids: Iterable[str]) -> str | None:
+    """
+    The master-table ID a participant name from a file name starts with, if any.
+
+    `GR_01_Fr_01` matches `GR_01` and `REST_24_Stroke_04_2_Donald_Peter`
+    matches `REST_24_Stroke_04` (case-insensitive; the ID must be followed
+    by `_` or the end of the name). The longest matching ID wins.
+    """
+    return _match_prefix(participant, {sid.upper(): sid for sid in study_ids})
+
+
+def _match_prefix(participant: str | None, by_upper: Mapping[str, str]) -> str | None:
+    if not participant:
+        return None
+    parts = participant.upper().split("_")
+    for n in range(len(parts), 0, -1):
+        if (sid := by_upper.get("_".join(parts[:n]))) is not None:
+            return sid
+    return None
+
+
+def read_master_table(path: str | Path, sheet: str = MASTER_SHEET) -> pd.DataFrame:
+    """Read the participant master table (the `Mastertabelle` sheet of an Excel file, or a CSV file)."""
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Master table not found: {path}")
+    df = pd.read_csv(path) if path.suffix.lower() == ".csv" else pd.read_excel(path, sheet_name=sheet)
+    return _clean_master_table(df, str(path))
+
+
+def _clean_master_table(df: pd.DataFrame, source: str) -> pd.DataFrame:
+    if MASTER_ID_COLUMN not in df.columns:
+        raise ValueError(f"Master table {source} has no {MASTER_ID_COLUMN!r} column.")
+    df = df.assign(**{MASTER_ID_COLUMN: df[MASTER_ID_COLUMN].astype(str).str.strip()})
+    return df.drop_duplicates(MASTER_ID_COLUMN)
+
+
+def _master_attributes(row: pd.Series) -> dict[str, Any]:
+    """files columns for one master-table row; missing and `N.A.` values become None."""
+    values = {
+        str(k): _sql_value(v)
+        for k, v in row.items()
+        if not (isinstance(v, str) and v.strip().upper() in ("N.A.", "NA", ""))
+    }
+    values = {k: v for k, v in values.items() if v is not None}
+    attributes = {column: values.get(source) for column, source in MASTER_COLUMNS.items()}
+    attributes["attributes"] = json.dumps(values, ensure_ascii=False, default=str)
+    return attributes
+
+
+def _expand_legacy_lists(trials: pd.DataFrame) -> pd.DataFrame:
+    """Unpack stringified list columns (`ikis`, `community_labels`) into `iki_k` / `label_k` columns."""
+    for column, prefix in _LEGACY_LIST_COLUMNS.items():
+        if column not in trials.columns or trials[column].dtype != object:
+            continue
+        values = [json.loads(v) if isinstance(v, str) else [] for v in trials[column]]
+        width = max((len(v) for v in values), default=0)
+        expanded = pd.DataFrame(
+            [v + [None] * (width - len(v)) for v in values],
+            columns=[f"{prefix}_{i + 1}" for i in range(width)],
+            index=trials.index,
+        )
+        trials = pd.concat([trials.drop(columns=column), expanded], axis=1)
+    return trials
+
+
+class ResultsStore:
+    """
+    SQLite results store; see the module docstring for the tables.
+
+    Opening a path that does not exist creates an empty store. The store
+    can be used as a context manager, which closes the connection.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> ResultsStore:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    # -- writing -------------------------------------------------------------
+
+    def _columns(self, table: str) -> list[str]:
+        return [row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")]
+
+    def _insert_frame(self, table: str, frame: pd.DataFrame) -> None:
+        """Insert all rows of `frame`, first adding any columns the table does not have yet."""
+        if frame.empty:
+            return
+        existing = set(self._columns(table))
+        for column in frame.columns:
+            if column not in existing:
+                column_type = _sql_type(frame[column].dtype)
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {_quote(column)} {column_type}")
+        columns = ", ".join(_quote(c) for c in frame.columns)
+        placeholders = ", ".join("?" * len(frame.columns))
+        rows = frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None)
+        self.conn.executemany(
+            f"INSERT INTO {table} ({columns}) VALUES ({placeholders})",
+            ([_sql_value(v) for v in row] for row in rows),
+        )
+
+    def _file_ids(self, source_files: Iterable[str]) -> dict[str, int]:
+        """file_id per source file path, adding rows for file names not seen before."""
+        names = {source: normalize_file_name(Path(str(source)).name) for source in source_files}
+        known = dict(self.conn.execute("SELECT file_name, file_id FROM files"))
+        for name in sorted(set(names.values()) - set(known)):
+            parsed = parse_srt_filename(name)
+            self.conn.execute(
+                "INSERT INTO files (file_name, participant, session, recorded_on, project) VALUES (?, ?, ?, ?, ?)",
+                (
+                    name,
+                    parsed["participant"],
+                    parsed["session"],
+                    None if parsed["date"] is None else parsed["date"].isoformat(),
+                    _project(parsed["participant"]),
+                ),
+            )
+        known = dict(self.conn.execute("SELECT file_name, file_id FROM files"))
+        return {source: known[name] for source, name in names.items()}
+
+    def add_run(
+        self,
+        output_dir: str | Path,
+        master_table: str | Path | pd.DataFrame | None = None,
+        study_ids: Mapping[str, str] | None = None,
+    ) -> int:
+        """
+        Import the outputs of a batch run and return its `run_id`.
+
+        Reads `chunking_params.json`, `chunking_summary` and `chunking_trials`
+        (CSV or Parquet) and `chunking_errors.csv` from `output_dir`. Importing
+        outputs whose parameters and summary table are unchanged returns the
+        existing run instead of adding a copy. With `master_table`, the
+        attributes of all files are (re)joined, see `attach_master_table`.
+        """
+        from .chunking import _read_output_table
+
+        out_path = Path(output_dir)
+        params_path = out_path / "chunking_params.json"
+        if not params_path.exists():
+            raise FileNotFoundError(f"No chunking_params.json in {out_path}.")
+        params = json.loads(params_path.read_text(encoding="utf-8"))
+        summary_sources = [out_path / "chunking_summary.csv"]
+        if not summary_sources[0].exists():
+            summary_sources = sorted((out_path / "chunking_summary.parquet").glob("part-*.parquet"))
+        content_hash = file_content_hash(params_path) + "".join(
+            file_content_hash(p) for p in summary_sources if p.exists()
+        )
+
+        existing = self.conn.execute("SELECT run_id FROM runs WHERE content_hash = ?", (content_hash,)).fetchone()
+        if existing is not None:
+            run_id = int(existing[0])
+        else:
+            summary = _read_output_table(out_path, "chunking_summary")
+            trials = _read_output_table(out_path, "chunking_trials") if (
+                (out_path / "chunking_trials.csv").exists() or (out_path / "chunking_trials.parquet").is_dir()
+            ) else pd.DataFrame()
+            errors_path = out_path / "chunking_errors.csv"
+            try:
+                n_failed = len(pd.read_csv(errors_path)) if errors_path.exists() else 0
+            except pd.errors.EmptyDataError:
+                n_failed = 0
+            with self.conn:
+                cursor = self.conn.execute(
+                    f"INSERT INTO runs (output_dir, imported_at, content_hash, {', '.join(RUN_PARAM_COLUMNS)}, "
+                    f"n_files, n_failed, params) VALUES ({', '.join('?' * (len(RUN_PARAM_COLUMNS) + 6))})",
+                    (
+                        str(out_path.resolve()),
+                        datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                        content_hash,
+                        *(_sql_value(params.get(c)) for c in RUN_PARAM_COLUMNS),
+                        int(summary["source_file"].nunique()) if not summary.empty else 0,
+                        n_failed,
+                        json.dumps(params),
+                    ),
+                )
+                run_id = int(cursor.lastrowid)
+                for table, frame in (("summaries", summary), ("trials", _expand_legacy_lists(trials))):
+                    if frame.empty:
+                        continue
+                    file_ids = self._file_ids(frame["source_file"].unique())
+                    if "sequence_type" not in frame.columns:
+                        frame = frame.assign(sequence_type=params.get("sequence_type", "blue"))
+                    keyed = frame.drop(columns="source_file").assign(
+                        run_id=run_id, file_id=frame["source_file"].map(file_ids)
+                    )
+                    self._insert_frame(table, keyed)
+        if master_table is not None or study_ids is not None:
+            self.attach_master_table(master_table, study_ids=study_ids)
+        return run_id
+
+    def attach_master_table(
+        self,
+        master_table: str | Path | pd.DataFrame | None,
+        study_ids: Mapping[str, str] | None = None,
+    ) -> int:
+        """
+        Join master-table attributes onto the files table; returns the number of matched files.
+
+        A file's `study_id` comes from `study_ids` (participant name ->
+        `Studien_ID`, for names that do not start with their ID, such as the
+        `VR_ML_<nnn>_<name>` files) or else from `match_study_id`. Files
+        without a matching row keep empty attributes.
+        """
+        if master_table is None:
+            master = pd.DataFrame(columns=[MASTER_ID_COLUMN])
+        elif isinstance(master_table, pd.DataFrame):
+            master = _clean_master_table(master_table, "frame")
+        else:
+            master = read_master_table(master_table)
+        rows = {row[MASTER_ID_COLUMN]: _master_attributes(row) for _, row in master.iterrows()}
+        explicit = {k.upper(): v for k, v in (study_ids or {}).items()}
+        by_upper = {sid.upper(): sid for sid in rows}
+
+        updates = []
+        for file_id, participant in self.conn.execute("SELECT file_id, participant FROM files").fetchall():
+            sid = explicit.get((participant or "").upper()) or _match_prefix(participant, by_upper)
+            attributes = rows.get(sid, dict.fromkeys([*MASTER_COLUMNS, "attributes"]))
+            updates.append((sid, *attributes.values(), file_id))
+        with self.conn:
+            self.conn.executemany(
+                f"UPDATE files SET study_id = ?, {', '.join(f'{c} = ?' for c in (*MASTER_COLUMNS, 'attributes'))} "
+                "WHERE file_id = ?",
+                updates,
+            )
+        return sum(u[0] is not None and u[0] in rows for u in updates)
+
+    # -- queries -------------------------------------------------------------
+
+    def _query(self, sql: str, params: Iterable[Any] = ()) -> pd.DataFrame:
+        cursor = self.conn.execute(sql, tuple(params))
+        return pd.DataFrame.from_records(cursor.fetchall(), columns=[d[0] for d in cursor.description])
+
+    def _check_columns(self, table: str, columns: Iterable[str]) -> list[str]:
+        columns = list(columns)
+        if unknown := [c for c in columns if c not in self._columns(table)]:
+            raise ValueError(f"Unknown {table} column(s): {unknown}")
+        return columns
+
+    @staticmethod
+    def _run_clause(alias: str, table: str, run_id: int | None) -> tuple[str, list[Any]]:
+        """Restrict `alias` rows to `run_id`, or to the newest run per file and sequence."""
+        if run_id is not None:
+            return f"{alias}.run_id = ?", [run_id]
+        return (
+            f"{alias}.run_id = (SELECT MAX(x.run_id) FROM {table} x "
+            f"WHERE x.file_id = {alias}.file_id AND x.sequence_type = {alias}.sequence_type)",
+            [],
+        )
+
+    def runs(self) -> pd.DataFrame:
+        """One row per imported run (without the full parameter JSON)."""
+        return self._query(
+            f"SELECT run_id, output_dir, imported_at, {', '.join(RUN_PARAM_COLUMNS)}, n_files, n_failed "
+            "FROM runs ORDER BY run_id"
+        )
+
+    def files(self, participant: str | None = None) -> pd.DataFrame:
+        """The files table, optionally for one participant (file-name participant or `Studien_ID`)."""
+        where, params = ("", [])
+        if participant is not None:
+            where, params = "WHERE participant = ? OR study_id = ?", [participant, participant]
+        return self._query(
+            f"SELECT file_id, {', '.join(FILE_COLUMNS)} FROM files {where} "
+            "ORDER BY participant, recorded_on, session",
+            params,
+        )
+
+    def summaries(
+        self,
+        sequence_type: str | None = "blue",
+        participant: str | None = None,
+        run_id: int | None = None,
+        metrics: Iterable[str] | None = None,
+    ) -> pd.DataFrame:
+        """
+        Summary rows joined with their file columns, ordered by participant and recording date.
+
+        `metrics` selects summary columns (default: all). `participant`
+        matches the file-name participant or the `Studien_ID`.
+        """
+        columns = [c for c in self._columns("summaries") if c not in ("run_id", "file_id", "sequence_type")]
+        if metrics is not None:
+            columns = self._check_columns("summaries", metrics)
+        run_clause, params = self._run_clause("s", "summaries", run_id)
+        where = [run_clause]
+        if sequence_type is not None:
+            where.append("s.sequence_type = ?")
+            params.append(sequence_type)
+        if participant is not None:
+            where.append("(f.participant = ? OR f.study_id = ?)")
+            params += [participant, participant]
+        return self._query(
+            f"SELECT s.run_id, s.sequence_type, {', '.join(f'f.{c}' for c in FILE_COLUMNS)}"
+            f"{''.join(f', s.{_quote(c)}' for c in columns)} "
+            f"FROM summaries s JOIN files f USING (file_id) WHERE {' AND '.join(where)} "
+            "ORDER BY f.participant, f.recorded_on, f.session",
+            params,
+        )
+
+    def participant_trajectory(
+        self,
+        participant: str,
+        sequence_type: str = "blue",
+        metrics: Iterable[str] = TRAJECTORY_METRICS,
+        run_id: int | None = None,
+    ) -> pd.DataFrame:
+        """One participant's summary metrics per session, in recording order."""
+        return self.summaries(sequence_type, participant=participant, run_id=run_id, metrics=metrics)
+
+    def trials(
+        self,
+        participant: str | None = None,
+        session: int | None = None,
+        sequence_type: str | None = "blue",
+        run_id: int | None = None,
+    ) -> pd.DataFrame:
+        """Per-trial rows with participant, session and recording date, in block order per file."""
+        columns = [c for c in self._columns("trials") if c not in ("run_id", "file_id", "sequence_type")]
+        run_clause, params = self._run_clause("t", "trials", run_id)
+        where = [run_clause]
+        for clause, value in (
+            ("t.sequence_type = ?", sequence_type),
+            ("(f.participant = ? OR f.study_id = ?)", participant),
+            ("f.session = ?", session),
+        ):
+            if value is not None:
+                where.append(clause)
+                params += [value] * clause.count("?")
+        return self._query(
+            "SELECT t.run_id, t.sequence_type, f.file_name, f.participant, f.session, f.recorded_on"
+            f"{''.join(f', t.{_quote(c)}' for c in columns)} "
+            f"FROM trials t JOIN files f USING (file_id) WHERE {' AND '.join(where)} "
+            "ORDER BY f.participant, f.recorded_on, f.session, t.rowid",
+            params,
+        )
+
+    def group_comparison(
+        self,
+        metric: str = "mean_q_single_trial",
+        by: str | Iterable[str] = "cohort",
+        sequence_type: str = "blue",
+        session: int | None = None,
+        run_id: int | None = None,
+    ) -> pd.DataFrame:
+        """
+        Describe one summary metric per group of files.
+
+        `by` names files columns (e.g. `cohort`, `project`, `session`).
+        Returns n_files, n_participants, mean, std, median, min and max per
+        group (participants are counted by `study_id` where known); files
+        without a group value form no group.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        self._check_columns("files", by)
+        self._check_columns("summaries", [metric])
+        run_clause, params = self._run_clause("s", "summaries", run_id)
+        where = [run_clause, "s.sequence_type = ?", *(f"f.{c} IS NOT NULL" for c in by)]
+        params.append(sequence_type)
+        if session is not None:
+            where.append("f.session = ?")
+            params.append(session)
+        rows = self._query(
+            f"SELECT {', '.join(f'f.{c}' for c in by)}, COALESCE(f.study_id, f.participant) AS participant, "
+            f"s.{_quote(metric)} AS value "
+            f"FROM summaries s JOIN files f USING (file_id) WHERE {' AND '.join(where)}",
+            params,
+        )
+        groups = rows.groupby(by)
+        described = groups["value"].agg(["size", "mean", "std", "median", "min", "max"])
+        described.insert(1, "n_participants", groups["participant"].nunique())
+        return described.rename(columns={"size": "n_files"})
+
+
+def _build_store_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="chunking store",
+        description="Import batch outputs into the indexed results store and query it.",
+    )
+    parser.add_argument("--db", default="outputs/results.sqlite", help="Results store file.")
+    actions = parser.add_subparsers(dest="action", required=True)
+    add = actions.add_parser("add", help="Import the outputs of a batch run.")
+    add.add_argument("output_dirs", nargs="+", help="Batch output directories.")
+    add.add_argument("--master-table", default=None, help="Participant master table (xlsx or csv).")
+    add.add_argument(
+        "--study-ids",
+        default=None,
+        help="CSV with columns participant,Studien_ID for names that do not start with their ID.",
+    )
+    actions.add_parser("runs", help="List imported runs.")
+    trajectory = actions.add_parser("trajectory", help="Summary metrics of one participant per session.")
+    trajectory.add_argument("participant", help="Participant name from the file names, or Studien_ID.")
+    trajectory.add_argument("--sequence-type", default="blue")
+    trajectory.add_argument("--run-id", type=int, default=None)
+    compare = actions.add_parser("compare", help="Compare a summary metric between groups of files.")
+    compare.add_argument("--metric", default="mean_q_single_trial")
+    compare.add_argument("--by", nargs="+", default=["cohort"], help="files columns to group by.")
+    compare.add_argument("--sequence-type", default="blue")
+    compare.add_argument("--session", type=int, default=None)
+    compare.add_argument("--run-id", type=int, default=None)
+    return parser
+
+
+def _store_main(argv: list[str]) -> int:
+    args = _build_store_arg_parser().parse_args(argv)
+    try:
+        with ResultsStore(args.db) as store:
+            if args.action == "add":
+                study_ids = None
+                if args.study_ids:
+                    mapping = pd.read_csv(args.study_ids, dtype=str)
+                    study_ids = dict(zip(mapping["participant"], mapping[MASTER_ID_COLUMN]))
+                for output_dir in args.output_dirs:
+                    run_id = store.add_run(output_dir, master_table=args.master_table, study_ids=study_ids)
+                    print(f"{output_dir}: run {run_id}")
+                table = store.runs()
+            elif args.action == "runs":
+                table = store.runs()
+            elif args.action == "trajectory":
+                table = store.participant_trajectory(
+                    args.participant, sequence_type=args.sequence_type, run_id=args.run_id
+                )
+            else:
+                table = store.group_comparison(
+                    args.metric,
+                    by=args.by,
+                    sequence_type=args.sequence_type,
+                    session=args.session,
+                    run_id=args.run_id,
+                )
+    except (ValueError, FileNotFoundError) as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    print(table.to_string(float_format=lambda v: f"{v:.4f}") if not table.empty else "(no rows)")
+    return 0
+
+
+__all__ = [
+    "FILE_COLUMNS",
+    "MASTER_COLUMNS",
+    "TRAJECTORY_METRICS",
+    "ResultsStore",
+    "match_study_id",
+    "read_master_table",
+]
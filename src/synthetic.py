@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
+from .ingest import REQUIRED_COLUMNS
+
+# Target keys of the three SRT sequences, as recorded in the corpus.
+SEQUENCE_PATTERNS: dict[str, tuple[int, ...]] = {
+    "blue": (2, 3, 1, 4, 3, 1, 2, 4),
+    "green": (3, 4, 2, 1, 3, 2, 4, 1),
+    "yellow": (4, 3, 1, 4, 3, 1, 4, 2),
+}
+N_KEYS = 4
+
+
+def generate_srt_frame(
+    n_blocks: int = 120,
+    sequences: Iterable[str] = ("blue", "green", "yellow"),
+    error_rate: float = 0.01,
+    chunk_boundaries: Iterable[int] | Mapping[str, Iterable[int]] = (4,),
+    within_iki: float = 0.35,
+    boundary_iki: float = 0.7,
+    jitter: float = 0.15,
+    learning: float = 0.3,
+    random_state: int | None = None,
+    sequence_lengths: Iterable[int] | None = None,
+) -> pd.DataFrame:
+    """
+    Simulate one participant's SRT session.
+
+    Each block is one run through a randomly drawn sequence (8 presses).
+    Chunk structure is planted through the inter-key intervals: IKI `i`
+    (1-based, between presses `i` and `i + 1`) is drawn around
+    `boundary_iki` when `i` is in `chunk_boundaries` and around `within_iki`
+    otherwise, with log-normal noise of scale `jitter`. `chunk_boundaries`
+    may be one set for all sequences or a mapping per sequence. Both interval
+    means shrink by up to `learning` (a fraction) from the first to the last
+    block. Each press misses with probability `error_rate` (`isHit == 0`, a
+    wrong key in `pressed`).
+
+    With `sequence_lengths`, each block's number of presses is drawn
+    uniformly from these values instead (the 8-key pattern repeats for
+    longer sequences, and IKI positions beyond 7 are boundaries only if
+    listed in `chunk_boundaries`). Without it the output is unchanged.
+
+    Returns a frame with the SRT CSV columns and dtypes of `read_srt_csv`.
+    """
+    sequences = [s.lower() for s in sequences]
+    if unknown := [s for s in sequences if s not in SEQUENCE_PATTERNS]:
+        raise ValueError(f"Unknown sequence(s) {unknown}; expected {list(SEQUENCE_PATTERNS)}.")
+    if n_blocks < 1:
+        raise ValueError("n_blocks must be positive.")
+    lengths_choice = None if sequence_lengths is None else np.array(sorted(set(sequence_lengths)), dtype=int)
+    if lengths_choice is not None and (lengths_choice.size == 0 or lengths_choice.min() < 2):
+        raise ValueError("sequence_lengths must hold lengths of at least 2 presses.")
+    if isinstance(chunk_boundaries, Mapping):
+        boundaries = {s: set(chunk_boundaries.get(s, ())) for s in sequences}
+    else:
+        shared = set(chunk_boundaries)
+        boundaries = {s: shared for s in sequences}
+
+    rng = np.random.default_rng(random_state)
+    n_presses = len(SEQUENCE_PATTERNS["blue"]) if lengths_choice is None else int(lengths_choice.max())
+    block_sequences = rng.choice(sequences, size=n_blocks)
+    speedup = 1.0 - learning * np.linspace(0.0, 1.0, n_blocks)
+
+    ikis = np.empty((n_blocks, n_presses - 1))
+    for s in sequences:
+        rows = block_sequences == s
+        means = np.array(
+            [boundary_iki if i + 1 in boundaries[s] else within_iki for i in range(n_presses - 1)]
+        )
+        ikis[rows] = means[None, :] * speedup[rows, None]
+    ikis *= rng.lognormal(mean=0.0, sigma=jitter, size=ikis.shape)
+    first_press = rng.uniform(3.5, 6.0, size=(n_blocks, 1))
+    times = np.hstack([first_press, first_press + np.cumsum(ikis, axis=1)])
+
+    targets = np.array([np.resize(SEQUENCE_PATTERNS[s], n_presses) for s in block_sequences])
+    hits = rng.random((n_blocks, n_presses)) >= error_rate
+    wrong_offset = rng.integers(1, N_KEYS, size=targets.shape)
+    pressed = np.where(hits, targets, (targets - 1 + wrong_offset) % N_KEYS + 1)
+    # Drawn last so fixed-length frames keep their random stream.
+    if lengths_choice is None:
+        block_lengths = np.full(n_blocks, n_presses)
+    else:
+        block_lengths = rng.choice(lengths_choice, size=n_blocks)
+    kept = np.arange(n_presses)[None, :] < block_lengths[:, None]
+
+    return pd.DataFrame(
+        {
+            "BlockNumber": np.repeat(np.arange(1, n_blocks + 1), block_lengths),
+            "EventNumber": np.arange(1, int(block_lengths.sum()) + 1),
+            "Time Since Block start": times[kept],
+            "isHit": hits[kept].astype(int),
+            "target": targets[kept],
+            "pressed": pressed[kept],
+            "sequence": np.repeat(block_sequences, block_lengths),
+        }
+    )[REQUIRED_COLUMNS]
+
+
+def write_srt_csv(df: pd.DataFrame, path: str | Path) -> Path:
+    """Write a frame in the SRT CSV format (`;`-separated, comma decimals, CRLF)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df[REQUIRED_COLUMNS].to_csv(
+        path,
+        sep=";",
+        decimal=",",
+        float_format="%.6f",
+        index=False,
+        lineterminator="\r\n",
+        encoding="utf-8",
+    )
+    return path
+
+
+def generate_srt_corpus(
+    output_dir: str | Path,
+    n_files: int = 10,
+    n_blocks: int | tuple[int, int] = 120,
+    random_state: int | None = 0,
+    sessions_per_participant: int = 1,
+    **frame_options,
+) -> list[Path]:
+    """
+    Write `n_files` synthetic SRT CSV files to `output_dir`.
+
+    `n_blocks` may be a (low, high) range to vary file sizes. File names
+    follow the corpus convention (`SYN_<nnn>_Synthetic_<date>_FRA_<session>_fertig.csv`)
+    so `parse_srt_filename` recognises them. With `sessions_per_participant`
+    above 1, consecutive files are sessions 1, 2, ... of the same participant,
+    recorded on consecutive days. Remaining options, such as
+    `sequence_lengths`, are passed to `generate_srt_frame`.
+    """
+    if sessions_per_participant < 1:
+        raise ValueError("sessions_per_participant must be at least 1.")
+    rng = np.random.default_rng(random_state)
+    paths = []
+    for i in range(n_files):
+        blocks = int(rng.integers(n_blocks[0], n_blocks[1] + 1)) if isinstance(n_blocks, tuple) else n_blocks
+        df = generate_srt_frame(n_blocks=blocks, random_state=int(rng.integers(0, 2**31 - 1)), **frame_options)
+        if sessions_per_participant == 1:
+            name = f"SYN_{i + 1:03d}_Synthetic_20250101_FRA_{i % 7 + 1}_fertig.csv"
+        else:
+            participant, session = divmod(i, sessions_per_participant)
+            name = f"SYN_{participant + 1:03d}_Synthetic_202501{session + 1:02d}_FRA_{session + 1}_fertig.csv"
+        paths.append(write_srt_csv(df, Path(output_dir) / name))
+    return paths
+
+
+__all__ = [
+    "SEQUENCE_PATTERNS",
+    "generate_srt_corpus",
+    "generate_srt_frame",
+    "write_srt_csv",
+]
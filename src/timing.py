@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+import numpy as np
+
+# Stages of `run_full_analysis`, in pipeline order.
+STAGES = (
+    "load",
+    "extract_ikis",
+    "build_networks",
+    "community_detection",
+    "chunk_metrics",
+    "null_model",
+)
+
+
+class StageTimer:
+    """
+    Accumulate wall-clock seconds per named stage plus integer counters.
+
+    Stages may be entered repeatedly; their times add up. `as_row` flattens
+    everything into `time_<stage>` / `n_<counter>` columns for a summary row.
+    """
+
+    def __init__(self) -> None:
+        self.seconds: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+
+    def add(self, name: str, seconds: float) -> None:
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counts[name] = self.counts.get(name, 0) + int(n)
+
+    def as_row(self) -> dict[str, float | int]:
+        row: dict[str, float | int] = {f"time_{s}": self.seconds.get(s, 0.0) for s in STAGES}
+        row.update({f"time_{s}": v for s, v in self.seconds.items() if s not in STAGES})
+        row["time_total"] = sum(self.seconds.values())
+        row.update({f"n_{name}": value for name, value in self.counts.items()})
+        return row
+
+
+def summarize_timings(rows: list[dict[str, Any]], top: int = 10) -> dict[str, Any]:
+    """
+    Aggregate per-file `StageTimer.as_row` rows for `chunking_timings.json`.
+
+    Reports total, mean, median, p95 and max seconds and the share of the
+    summed total per stage, counter totals, and the `top` slowest rows
+    (identified by their `source_file` and `sequence_type`).
+    """
+    if not rows:
+        return {"n_rows": 0, "stages": {}, "counts": {}, "slowest": []}
+    time_columns = [c for c in rows[0] if c.startswith("time_") and c != "time_total"]
+    totals = np.array([r.get("time_total", 0.0) for r in rows], dtype=float)
+    grand_total = float(totals.sum())
+    stages = {}
+    for column in time_columns:
+        values = np.array([r.get(column, 0.0) for r in rows], dtype=float)
+        stages[column.removeprefix("time_")] = {
+            "total": float(values.sum()),
+            "mean": float(values.mean()),
+            "median": float(np.median(values)),
+            "p95": float(np.percentile(values, 95)),
+            "max": float(values.max()),
+            "share": float(values.sum() / grand_total) if grand_total > 0 else 0.0,
+        }
+    count_columns = [c for c in rows[0] if c.startswith("n_")]
+    slowest = sorted(rows, key=lambda r: r.get("time_total", 0.0), reverse=True)[:top]
+    return {
+        "n_rows": len(rows),
+        "total_seconds": grand_total,
+        "stages": stages,
+        "counts": {c.removeprefix("n_"): int(sum(r.get(c, 0) for r in rows)) for c in count_columns},
+        "slowest": [
+            {
+                "source_file": r.get("source_file"),
+                "sequence_type": r.get("sequence_type"),
+                "time_total": r.get("time_total", 0.0),
+            }
+            for r in slowest
+        ],
+    }
+
+
+__all__ = ["STAGES", "StageTimer", "summarize_timings"]
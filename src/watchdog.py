@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import multiprocessing
+import time
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Iterable, Iterator
+
+
+@dataclass(frozen=True)
+class Watched:
+    """One finished item: `value` is `fn(item)`, or None with `error` set (a `TimeoutError` if killed)."""
+
+    item: Any
+    value: Any
+    error: BaseException | None
+    seconds: float
+
+
+def _serve(conn: Connection, fn: Callable[[Any], Any]) -> None:
+    """Worker loop: call `fn` on every received item and send back (ok, value or error message)."""
+    while True:
+        try:
+            item = conn.recv()
+        except EOFError:
+            return
+        if item is None:
+            return
+        try:
+            conn.send((True, fn(item)))
+        except Exception as exc:  # passed on to the parent
+            conn.send((False, f"{type(exc).__name__}: {exc}"))
+
+
+class _Worker:
+    def __init__(self, context: Any, fn: Callable[[Any], Any]) -> None:
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child_conn, fn), name="watchdog-worker", daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.item: Any = None
+        self.started = 0.0
+        self.busy = False
+
+    def submit(self, item: Any) -> None:
+        self.item, self.started, self.busy = item, time.perf_counter(), True
+        self.conn.send(item)
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class WatchdogPool:
+    """
+    Run `fn` on items in worker processes and kill any call that exceeds `timeout` seconds.
+
+    Up to `n_workers` long-lived worker processes each take one item at a
+    time. A call that is still running after `timeout` seconds has its
+    worker killed, as a hung C extension cannot be interrupted any other
+    way, and the item is reported with a `TimeoutError`; a new worker is
+    started for the next item. A worker that dies is reported with a
+    `RuntimeError`, and exceptions raised by `fn` come back as a
+    `RuntimeError` carrying their message. `fn` and the items must be
+    picklable.
+
+    Workers are started from a fork server (spawned where there is none),
+    so they are safe to start while other threads, such as a prefetch
+    reader, are running. `preload` names modules the fork server imports
+    once, so replacement workers start quickly.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[Any], Any],
+        timeout: float,
+        n_workers: int = 1,
+        preload: Iterable[str] = (),
+    ) -> None:
+        if timeout <= 0:
+            raise ValueError("timeout must be positive.")
+        if n_workers < 1:
+            raise ValueError("n_workers must be at least 1.")
+        self.fn = fn
+        self.timeout = float(timeout)
+        self.n_workers = n_workers
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self.context = multiprocessing.get_context(method)
+        if method == "forkserver" and preload:
+            self.context.set_forkserver_preload(list(preload))
+        self.n_timeouts = 0
+        self.n_crashes = 0
+
+    def imap_unordered(self, items: Iterable[Any]) -> Iterator[Watched]:
+        """Yield a `Watched` per item in completion order."""
+        pending = iter(items)
+        workers: list[_Worker] = []
+        exhausted = False
+        try:
+            while True:
+                idle = [w for w in workers if not w.busy]
+                while not exhausted and (idle or len(workers) < self.n_workers):
+                    try:
+                        item = next(pending)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if idle:
+                        worker = idle.pop()
+                    else:
+                        worker = _Worker(self.context, self.fn)
+                        workers.append(worker)
+                    worker.submit(item)
+                busy = [w for w in workers if w.busy]
+                if not busy:
+                    return
+                now = time.perf_counter()
+                next_deadline = min(w.started + self.timeout for w in busy)
+                ready = wait([w.conn for w in busy], timeout=max(next_deadline - now, 0.0))
+                for worker in busy:
+                    seconds = time.perf_counter() - worker.started
+                    if worker.conn in ready:
+                        try:
+                            ok, value = worker.conn.recv()
+                        except (EOFError, OSError):
+                            self.n_crashes += 1
+                            worker.kill()
+                            error = RuntimeError(f"Worker process died (exit code {worker.process.exitcode}).")
+                            workers.remove(worker)
+                            yield Watched(worker.item, None, error, seconds)
+                            continue
+                        worker.busy = False
+                        if ok:
+                            yield Watched(worker.item, value, None, seconds)
+                        else:
+                            yield Watched(worker.item, None, RuntimeError(value), seconds)
+                    elif seconds >= self.timeout:
+                        self.n_timeouts += 1
+                        worker.kill()
+                        workers.remove(worker)
+                        error = TimeoutError(f"Timed out after {self.timeout:g}s; killed by the watchdog.")
+                        yield Watched(worker.item, None, error, seconds)
+        finally:
+            for worker in workers:
+                if worker.busy:
+                    worker.kill()
+                else:
+                    worker.stop()
+
+
+__all__ = ["Watched", "WatchdogPool"]
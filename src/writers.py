@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+
+class ReorderBuffer:
+    """
+    Release items in index order although they arrive in completion order.
+
+    `push(index, item)` returns the items that are now ready: the pushed one
+    and any buffered successors, once every lower index has been pushed.
+    Only items ahead of the next missing index are held in memory.
+    """
+
+    def __init__(self, start: int = 0) -> None:
+        self.next_index = start
+        self._pending: dict[int, Any] = {}
+
+    def push(self, index: int, item: Any) -> list[Any]:
+        if index < self.next_index or index in self._pending:
+            raise ValueError(f"Index {index} was already pushed.")
+        self._pending[index] = item
+        ready = []
+        while self.next_index in self._pending:
+            ready.append(self._pending.pop(self.next_index))
+            self.next_index += 1
+        return ready
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+class CsvAppendWriter:
+    """
+    Write a CSV file frame by frame.
+
+    The header comes from the first frame; later frames must not add
+    columns. Every `write` appends whole rows and flushes, so the file is a
+    valid CSV of all rows written so far at any time. The result is
+    identical to concatenating the frames and writing them at once;
+    without any rows an empty file is written, like `pd.DataFrame().to_csv`.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.columns: list[str] | None = None
+        self.n_rows = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.unlink(missing_ok=True)
+
+    def write(self, frame: pd.DataFrame) -> None:
+        if self.columns is None:
+            self.columns = [str(c) for c in frame.columns]
+            header = True
+        else:
+            if extra := [c for c in frame.columns if c not in self.columns]:
+                raise ValueError(f"Columns {extra} are not in the header of {self.path}.")
+            frame = frame.reindex(columns=self.columns)
+            header = False
+        with self.path.open("a", encoding="utf-8", newline="") as f:
+            frame.to_csv(f, index=False, header=header)
+            f.flush()
+        self.n_rows += len(frame)
+
+    def close(self) -> None:
+        if self.columns is None:
+            pd.DataFrame().to_csv(self.path, index=False)
+
+    def __enter__(self) -> CsvAppendWriter:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class ParquetPartWriter:
+    """
+    Write a Parquet dataset directory as a sequence of part files.
+
+    Frames are buffered and written as `part-<nnnnn>.parquet` once at least
+    `rows_per_part` rows are pending (and on `close`). Each part is a
+    complete Parquet file, moved into place atomically, so the directory can
+    be read with `pd.read_parquet` at any time; parts sort in write order.
+    All parts share the schema of the first frame.
+    """
+
+    def __init__(self, path: str | Path, rows_per_part: int = 100_000) -> None:
+        self.path = Path(path)
+        self.rows_per_part = rows_per_part
+        self.n_rows = 0
+        self.n_parts = 0
+        self._schema: Any = None
+        self._buffer: list[pd.DataFrame] = []
+        self._buffered_rows = 0
+        self.path.mkdir(parents=True, exist_ok=True)
+        for stale in self.path.glob("part-*.parquet"):
+            stale.unlink()
+
+    def write(self, frame: pd.DataFrame) -> None:
+        self._buffer.append(frame)
+        self._buffered_rows += len(frame)
+        self.n_rows += len(frame)
+        if self._buffered_rows >= self.rows_per_part:
+            self.flush()
+
+    def flush(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        frames = [f for f in self._buffer if len(f)]
+        self._buffer, self._buffered_rows = [], 0
+        if not frames:
+            return
+        table = pa.Table.from_pandas(pd.concat(frames, ignore_index=True), preserve_index=False)
+        if self._schema is None:
+            self._schema = table.schema
+        else:
+            table = table.select(self._schema.names).cast(self._schema)
+        fd, tmp_name = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        os.close(fd)
+        try:
+            pq.write_table(table, tmp_name)
+            os.replace(tmp_name, self.path / f"part-{self.n_parts:05d}.parquet")
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self.n_parts += 1
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> ParquetPartWriter:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class LogWriter:
+    """
+    Append timestamped lines to a log file through one open handle.
+
+    Lines are buffered and flushed at most every `flush_interval` seconds
+    (and on `flush` / `close`), instead of opening the file per message.
+    With `append=False` an existing log is replaced.
+    """
+
+    def __init__(self, path: str | Path, append: bool = True, flush_interval: float = 1.0) -> None:
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("a" if append else "w", encoding="utf-8")
+        self._last_flush = time.monotonic()
+
+    def write(self, message: str) -> None:
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+        self._file.write(f"[{timestamp}] {message}\n")
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        self._file.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> LogWriter:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class TableWriters:
+    """Write the same frames to every configured format (`"csv"` and/or `"parquet"`)."""
+
+    def __init__(self, csv_path: str | Path | None, parquet_path: str | Path | None = None) -> None:
+        self.writers: list[CsvAppendWriter | ParquetPartWriter] = []
+        if csv_path is not None:
+            self.writers.append(CsvAppendWriter(csv_path))
+        if parquet_path is not None:
+            self.writers.append(ParquetPartWriter(parquet_path))
+
+    def write(self, frame: pd.DataFrame) -> None:
+        for writer in self.writers:
+            writer.write(frame)
+
+    def close(self) -> None:
+        for writer in self.writers:
+            writer.close()
+
+
+__all__ = ["CsvAppendWriter", "LogWriter", "ParquetPartWriter", "ReorderBuffer", "TableWriters"]